@@ -0,0 +1,909 @@
+"""Kripto Takip Pro - arayüzden bağımsız alarm motoru.
+
+Fiyat takibi, alarm değerlendirmesi ve kalıcı saklama burada yapılır.
+Tk penceresi bu motorun istemcilerinden yalnızca biridir; sunucularda
+ekran olmadan çalıştırmak için:
+
+    python -m alarm_engine --db crypto_alerts.db
+
+Veriler SQLite'ta tutulur; ilk açılışta mevcut crypto_alarms.json ve
+crypto_watchlist.json dosyaları bir kez içe aktarılır. Çekilen her fiyat
+price_history.bin içindeki coin başına halka tamponlara da kaydedilir.
+
+Yoklama coin bazında zamanlanır: fiyatı eşiğine yakın ya da oynak
+coinler daha sık, uzak olanlar daha seyrek çekilir (poll_scheduler).
+--stream-url ile bir SSE fiyat akışı verilirse gelen her fiyat hemen
+değerlendirilir; yoklama yalnızca yedek olarak, seyrek yapılır.
+
+Fiyatlar her zaman tek istekte USD olarak çekilir. EUR, TRY ya da BTC
+cinsinden alarmlar için karşılıklar önbellekteki döviz kurlarıyla
+(fx_rates) hesaplanır ve her alarm kendi para biriminde değerlendirilir.
+
+Alarm ve izleme listesi durumunu yalnızca motor thread'i değiştirir; arayüz
+ve diğer thread'ler komut gönderir, anlık görüntü okur ve olay dinler.
+"""
+import argparse
+import bisect
+import logging
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from types import MappingProxyType
+from typing import NamedTuple
+
+from alarm_store import DB_FILE, JsonStore, SqliteStore
+from alarm_types import (
+    TYPE_FROM_CREATED, TYPE_PRICE, WindowIndex, alarm_currency, alarm_thresholds, alarm_type,
+)
+from coingecko import PRICE_CHUNK_SIZE, CoinGeckoClient, get_client
+import metrics
+from fx_rates import BASE_CURRENCY, FxRates, currency_symbol
+from poll_scheduler import POLL_BUDGET, PollScheduler
+from price_cache import PriceCache
+from price_history import HISTORY_FILE, PriceHistory
+from price_stream import PriceStream
+from providers import HEDGE_PERCENTILE, HedgedProvider
+from rate_limiter import PRIORITY_ALARM, backoff_delay
+from vector_eval import HAVE_NUMPY, VectorIndex
+
+
+ALARMS_FILE = 'crypto_alarms.json'
+WATCHLIST_FILE = 'crypto_watchlist.json'
+
+CHECK_INTERVAL = 30  # saniye; eşik bilgisi olmayan coinler için yoklama aralığı
+SUMMARY_LIMIT = 15  # özet bildirimde listelenecek en fazla alarm
+ERROR_INTERVAL = 60  # hata sonrası en uzun bekleme
+STREAM_POLL_INTERVAL = 300  # akış bağlıyken yedek yoklama aralığı
+STREAM_HISTORY_SPACING = 10  # akış fiyatları geçmişe coin başına en sık bu aralıkla yazılır
+STOP_TIMEOUT = 5  # stop() kuyruktaki komutları en fazla bu kadar bekler
+
+# 'index': coin başına sıralı eşikler (bisect), 'vector': NumPy sütun dizileri
+EVALUATION_MODES = ('index', 'vector')
+
+CYCLE_SECONDS = metrics.histogram('alarm_cycle_seconds', "Alarm kontrol süresi (fiyat çekme dahil)",
+                                  ('source',))
+ALARMS_EVALUATED = metrics.counter('alarms_evaluated_total', "Bir fiyatla değerlendirilen aktif alarmlar",
+                                   ('source',))
+ALARMS_TRIGGERED = metrics.counter('alarms_triggered_total', "Tetiklenen alarmlar")
+ACTIVE_ALARMS = metrics.gauge('alarms_active', "Aktif (henüz tetiklenmemiş) alarmlar")
+COMMAND_QUEUE_DEPTH = metrics.gauge('engine_command_queue_depth', "Motor thread'ini bekleyen komutlar")
+
+# add_listener() olayları
+EVENT_ALARMS = 'alarms'  # alarm eklendi, silindi ya da tetiklendi
+EVENT_WATCHLIST = 'watchlist'  # izleme listesi değişti
+EVENT_TRIGGERED = 'triggered'  # bir turda tetiklenenler, [(alarm, price), ...]
+
+logger = logging.getLogger(__name__)
+
+
+def format_price(price, currency=BASE_CURRENCY):
+    """Fiyat formatlama"""
+    if currency == 'btc':
+        return f"{price:.8f}".rstrip('0').rstrip('.')
+    if price >= 1:
+        return f"{price:,.2f}"
+    else:
+        return f"{price:.6f}".rstrip('0').rstrip('.')
+
+
+def format_money(price, currency=BASE_CURRENCY):
+    """Para birimi simgesiyle fiyat"""
+    return f"{currency_symbol(currency)}{format_price(price, currency)}"
+
+
+def play_notification_sound(is_positive=True):
+    """Cross-platform bildirim sesi"""
+    # Yalnızca ses çalınırken gerekli; açılışta içe aktarılmaz
+    import platform
+    import subprocess
+
+    try:
+        system = platform.system()
+
+        if system == "Darwin":  # macOS
+            sound_file = "/System/Library/Sounds/Glass.aiff" if is_positive else "/System/Library/Sounds/Basso.aiff"
+            subprocess.run(["afplay", sound_file], check=False)
+
+        elif system == "Windows":
+            import winsound
+            if is_positive:
+                winsound.Beep(1000, 300)
+            else:
+                winsound.Beep(500, 300)
+
+        elif system == "Linux":
+            subprocess.run(["paplay", "/usr/share/sounds/alsa/Front_Left.wav"], check=False)
+
+    except Exception as e:
+        print(f"Ses çalma hatası: {e}")
+        try:
+            print("\a")  # Terminal bell
+        except:
+            pass
+
+
+CONDITION_ARROWS = {'above': "🔺", 'below': "🔻", 'either': "↕️"}
+CONDITION_SIGNS = {'above': "+", 'below': "-", 'either': "±"}
+CONDITION_VERBS = {'above': "yükseldi", 'below': "düştü", 'either': "hareket etti"}
+
+
+def target_text(alarm):
+    """Alarm hedefinin kısa metni"""
+    kind = alarm_type(alarm)
+    currency = alarm_currency(alarm)
+    if kind == TYPE_PRICE:
+        return format_money(alarm['target_price'], currency)
+    change = f"{CONDITION_SIGNS[alarm['condition']]}%{alarm['percent']:g}"
+    if kind == TYPE_FROM_CREATED:
+        return f"{change} ({format_money(alarm['base_price'], currency)} fiyatından)"
+    return f"{change} / {alarm['window_minutes']} dk"
+
+
+def alarm_message(alarm, price):
+    """Tetiklenen alarm için bildirim metni"""
+    kind = alarm_type(alarm)
+    currency = alarm_currency(alarm)
+    if kind == TYPE_PRICE:
+        condition_text = "hedefin üstüne çıktı" if alarm['condition'] == 'above' else "hedefin altına indi"
+        target_line = f"Hedef Fiyat: {format_money(alarm['target_price'], currency)}"
+    else:
+        verb = CONDITION_VERBS[alarm['condition']]
+        if kind == TYPE_FROM_CREATED:
+            condition_text = f"oluşturulduğu fiyattan %{alarm['percent']:g} {verb}"
+            target_line = f"Başlangıç Fiyatı: {format_money(alarm['base_price'], currency)}"
+        else:
+            condition_text = f"{alarm['window_minutes']} dakika içinde %{alarm['percent']:g} {verb}"
+            target_line = f"Hedef: {target_text(alarm)}"
+    return (f"🔔 ALARM TETİKLENDİ!\n\n"
+            f"{alarm['crypto_name']} {condition_text}!\n\n"
+            f"{target_line}\n"
+            f"Güncel Fiyat: {format_money(price, currency)}")
+
+
+def is_rise(alarm, price):
+    """Tetiklenme yükselişle mi oldu; 'either' için başlangıç fiyatına bakılır"""
+    if alarm['condition'] == 'either':
+        return price >= alarm.get('base_price', 0)
+    return alarm['condition'] == 'above'
+
+
+def batch_message(triggered, limit=SUMMARY_LIMIT):
+    """Bir kontrol turunda tetiklenen alarmlar için tek özet metni"""
+    if len(triggered) == 1:
+        return alarm_message(*triggered[0])
+
+    lines = [f"🔔 {len(triggered)} ALARM TETİKLENDİ!", ""]
+    for alarm, price in triggered[:limit]:
+        arrow = CONDITION_ARROWS[alarm['condition']]
+        lines.append(f"{arrow} {alarm['crypto_name']}: "
+                     f"Hedef {target_text(alarm)} • "
+                     f"Güncel {format_money(price, alarm_currency(alarm))}")
+    if len(triggered) > limit:
+        lines.append(f"... ve {len(triggered) - limit} alarm daha")
+    return "\n".join(lines)
+
+
+class AlarmIndex:
+    """Aktif alarmlar için kripto ve para birimi bazlı sıralı eşik indeksi.
+
+    Her (kripto, para birimi) için 'above' ve 'below' eşikleri sıralı
+    tutulur; bir fiyat geldiğinde geçilen alarmlar bisect + dilim ile
+    bulunur. Maliyet toplam alarm sayısına değil, tetiklenen alarm sayısına
+    bağlıdır. Oluşturma fiyatına göre yüzde alarmları da eşiğe çevrilir;
+    'either' iki eşiktir.
+    """
+
+    def __init__(self, alarms=None):
+        self._lock = threading.RLock()
+        # (crypto_id, currency) -> {'above': ([fiyatlar], [alarmlar]), 'below': (...)}
+        self._coins = {}
+        # crypto_id -> {currency, ...}
+        self._currencies = {}
+        # (crypto_id, currency) -> aktif alarm sayısı ('either' tek sayılır)
+        self._counts = {}
+        # alarm_id -> ((crypto_id, currency), [(condition, target_price), ...])
+        self._entries = {}
+        if alarms:
+            self.rebuild(alarms)
+
+    def rebuild(self, alarms):
+        with self._lock:
+            self._coins = {}
+            self._currencies = {}
+            self._counts = {}
+            self._entries = {}
+            for alarm in alarms:
+                self.add(alarm)
+
+    def add(self, alarm):
+        with self._lock:
+            # Aynı id'li eski kayıt, yenisi tetiklenmiş olsa da çıkarılır
+            if alarm['id'] in self._entries:
+                self.remove(alarm['id'])
+            if alarm.get('triggered', False):
+                return
+            thresholds = alarm_thresholds(alarm)
+            if not thresholds:
+                return
+            key = (alarm['crypto_id'], alarm_currency(alarm))
+            sides = self._coins.setdefault(key, {
+                'above': ([], []),
+                'below': ([], []),
+            })
+            self._currencies.setdefault(key[0], set()).add(key[1])
+            self._counts[key] = self._counts.get(key, 0) + 1
+            for condition, target in thresholds:
+                prices, items = sides[condition]
+                pos = bisect.bisect_right(prices, target)
+                prices.insert(pos, target)
+                items.insert(pos, alarm)
+            self._entries[alarm['id']] = (key, thresholds)
+
+    def remove(self, alarm_id):
+        with self._lock:
+            entry = self._entries.pop(alarm_id, None)
+            if entry is None:
+                return
+            key, thresholds = entry
+            sides = self._coins[key]
+            for condition, target in thresholds:
+                prices, items = sides[condition]
+                pos = bisect.bisect_left(prices, target)
+                while pos < len(prices) and prices[pos] == target:
+                    if items[pos]['id'] == alarm_id:
+                        del prices[pos]
+                        del items[pos]
+                        break
+                    pos += 1
+            self._counts[key] -= 1
+            if not sides['above'][0] and not sides['below'][0]:
+                del self._coins[key]
+                del self._counts[key]
+                currencies = self._currencies[key[0]]
+                currencies.discard(key[1])
+                if not currencies:
+                    del self._currencies[key[0]]
+
+    def crossed(self, crypto_id, price, currency='usd'):
+        """Verilen fiyatla tetiklenen alarmları döndür"""
+        with self._lock:
+            sides = self._coins.get((crypto_id, currency))
+            if not sides:
+                return []
+            above_prices, above_items = sides['above']
+            below_prices, below_items = sides['below']
+            # above: target <= fiyat, below: target >= fiyat
+            hits = above_items[:bisect.bisect_right(above_prices, price)]
+            hits += below_items[bisect.bisect_left(below_prices, price):]
+            return hits
+
+    def evaluate(self, price_data):
+        """Fiyat anlık görüntüsüyle tetiklenen (alarm, fiyat) çiftleri.
+
+        Her alarm kendi para birimindeki fiyatla karşılaştırılır; price_data
+        bilgileri bu para birimlerini içermelidir (FxRates.expand).
+        """
+        triggered = []
+        with self._lock:
+            for crypto_id, info in price_data.items():
+                for currency in self._currencies.get(crypto_id, ()):
+                    price = (info or {}).get(currency)
+                    if not price:
+                        continue
+                    triggered.extend((alarm, price) for alarm in self.crossed(crypto_id, price, currency))
+        return triggered
+
+    def evaluated_count(self, price_data):
+        """evaluate(price_data)'nın fiyatla karşılaştırdığı aktif alarm sayısı"""
+        count = 0
+        with self._lock:
+            for crypto_id, info in price_data.items():
+                for currency in self._currencies.get(crypto_id, ()):
+                    if (info or {}).get(currency):
+                        count += self._counts[(crypto_id, currency)]
+        return count
+
+    def nearest_distances(self, price_data):
+        """Coin başına en yakın geçilmemiş eşiğe göreli uzaklık, |ln(eşik / fiyat)|"""
+        distances = {}
+        with self._lock:
+            for crypto_id, info in price_data.items():
+                for currency in self._currencies.get(crypto_id, ()):
+                    price = (info or {}).get(currency)
+                    if not price:
+                        continue
+                    sides = self._coins[(crypto_id, currency)]
+                    targets = []
+                    above_prices = sides['above'][0]
+                    pos = bisect.bisect_right(above_prices, price)
+                    if pos < len(above_prices):
+                        targets.append(above_prices[pos])
+                    below_prices = sides['below'][0]
+                    pos = bisect.bisect_left(below_prices, price)
+                    if pos > 0:
+                        targets.append(below_prices[pos - 1])
+                    for target in targets:
+                        if target > 0:
+                            distance = abs(math.log(target / price))
+                            distances[crypto_id] = min(distance, distances.get(crypto_id, distance))
+        return distances
+
+    def crypto_ids(self):
+        with self._lock:
+            return list(self._currencies)
+
+    def currencies(self):
+        with self._lock:
+            return {currency for _, currency in self._coins}
+
+    def has_alarm(self, crypto_id):
+        with self._lock:
+            return crypto_id in self._currencies
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def create_alarm_index(alarms, mode='index'):
+    """Değerlendirme moduna göre alarm indeksi oluştur"""
+    if mode not in EVALUATION_MODES:
+        raise ValueError(f"bilinmeyen değerlendirme modu: {mode}")
+    if mode == 'vector':
+        if HAVE_NUMPY:
+            return VectorIndex(alarms)
+        logger.warning("numpy kurulu değil, index değerlendirmesine dönülüyor")
+    return AlarmIndex(alarms)
+
+
+class EngineState(NamedTuple):
+    """Motor durumunun değişmez anlık görüntüsü.
+
+    Kayıtlar sözlüktür ama motor yayımladığı bir kaydı hiç değiştirmez;
+    değişiklikte yeni sözlük koyar. Okuyanlar da değiştirmemelidir.
+    """
+    watchlist: tuple
+    alarms: tuple
+    stats: MappingProxyType
+    watchlist_currency: str
+
+
+class AlarmEngine:
+    """İzleme listesi ve alarmları yöneten, Tk gerektirmeyen motor.
+
+    Durumu yalnızca motor thread'i değiştirir: ekleme, silme, para birimi
+    değişikliği ve fiyat değerlendirmesi submit() ile tek bir komut
+    kuyruğuna girer ve sırayla çalışır. Okuyanlar snapshot() ile değişmez
+    bir görüntü alır; değişiklikler add_listener() dinleyicilerine olay
+    olarak bildirilir. Fiyat çekme ve kur çevirme komut kuyruğunun
+    dışında, çağıran thread'de yapılır.
+    """
+
+    def __init__(self, store=None, interval=CHECK_INTERVAL, sound=True, provider=None,
+                 history=None, evaluation_mode='index', stream_url=None,
+                 poll_budget=POLL_BUDGET):
+        self.provider = provider or get_client()
+        self.history = history if history is not None else PriceHistory()
+        self.prices = PriceCache(self.provider, history=self.history)
+        self.fx = FxRates(self.provider)
+        self.store = store or open_store()
+        self.interval = interval
+        self.sound = sound
+
+        # Motor thread'i değiştirirken tutulur; okuyanlar anlık görüntüyü bununla kurar
+        self._lock = threading.Lock()
+        self._watchlist = {item['id']: item for item in self.store.load_watchlist()}
+        self._alarms = {alarm['id']: alarm for alarm in self.store.load_alarms()}
+        # Liste düzeyinde tek ayar; eski kayıtlarda satırlardaki 'currency' alanından
+        legacy = next(iter(self._watchlist.values()), {}).get('currency', BASE_CURRENCY)
+        self._watchlist_currency = self.store.get_setting('watchlist_currency', legacy)
+        self._state = None
+        alarms = list(self._alarms.values())
+        self.alarm_index = create_alarm_index(alarms, evaluation_mode)
+        self.evaluation_mode = 'vector' if isinstance(self.alarm_index, VectorIndex) else 'index'
+        self.window_index = WindowIndex(alarms, history=self.history)
+        self.scheduler = PollScheduler(base_interval=interval, budget=poll_budget,
+                                       history=self.history)
+        # İzlenen / aktif / tetiklenen sayaçları, değişikliklerle birlikte güncellenir
+        self.stats = {
+            'watched': len(self._watchlist),
+            'active': sum(1 for a in alarms if not a.get('triggered', False)),
+            'triggered': sum(1 for a in alarms if a.get('triggered', False)),
+        }
+        ACTIVE_ALARMS.set(self.stats['active'])
+
+        self._commands = queue.Queue()
+        self._command_thread = None
+        self._listeners = []
+
+        self.monitoring_active = False
+        self._monitor_thread = None
+        # Yoklama beklemesini erken bitirmek için (akış koptu, yeni alarm, stop())
+        self._wake = threading.Event()
+        self.stream = None
+        if stream_url:
+            self.stream = PriceStream(stream_url, self.handle_ticks,
+                                      ids=self.alarm_crypto_ids,
+                                      on_state=self._on_stream_state)
+
+    # Komut kuyruğu
+    def submit(self, func, *args):
+        """func(*args)'ı motor thread'inde sırayla çalıştır; Future döndür.
+
+        Motor thread'i başlatılmamışsa (--once, benchmark) ya da çağıran
+        zaten odur, komut hemen burada çalışır.
+        """
+        future = Future()
+        thread = self._command_thread
+        if thread is None or threading.current_thread() is thread:
+            self._run_command(future, func, args)
+        else:
+            COMMAND_QUEUE_DEPTH.inc()
+            self._commands.put((future, func, args))
+        return future
+
+    def call(self, func, *args):
+        """submit() ve sonucu bekle; hata çağırana aktarılır"""
+        return self.submit(func, *args).result()
+
+    def _run_command(self, future, func, args):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            logger.exception("Motor komutu başarısız: %s", func.__name__)
+            future.set_exception(e)
+
+    def _process_commands(self):
+        while True:
+            item = self._commands.get()
+            if item is None:
+                break
+            COMMAND_QUEUE_DEPTH.dec()
+            self._run_command(*item)
+
+    def start_commands(self):
+        if self._command_thread is None:
+            self._command_thread = threading.Thread(target=self._process_commands, daemon=True,
+                                                    name="alarm-engine")
+            self._command_thread.start()
+
+    # Anlık görüntü ve olaylar
+    def snapshot(self):
+        """Değişmez EngineState; son değişiklikten sonraki ilk okumada kurulur"""
+        state = self._state
+        if state is None:
+            with self._lock:
+                state = self._state
+                if state is None:
+                    state = self._state = EngineState(
+                        tuple(self._watchlist.values()),
+                        tuple(self._alarms.values()),
+                        MappingProxyType(dict(self.stats)),
+                        self._watchlist_currency,
+                    )
+        return state
+
+    @property
+    def watchlist(self):
+        return self.snapshot().watchlist
+
+    @property
+    def alarms(self):
+        return self.snapshot().alarms
+
+    def get_stats(self):
+        return dict(self.snapshot().stats)
+
+    def add_listener(self, callback):
+        """callback(event, payload) motor thread'inde çağrılır; kısa sürmeli.
+
+        EVENT_ALARMS ve EVENT_WATCHLIST yükü None'dır, EVENT_TRIGGERED bir
+        turda tetiklenen [(alarm, price), ...] listesini taşır.
+        """
+        self._listeners.append(callback)
+
+    def add_trigger_listener(self, callback):
+        """callback(triggered) her kontrol turunda bir kez, [(alarm, price), ...] ile çağrılır"""
+        def on_event(event, payload):
+            if event == EVENT_TRIGGERED:
+                callback(payload)
+
+        self.add_listener(on_event)
+
+    def _publish(self, event, payload=None):
+        for callback in self._listeners:
+            try:
+                callback(event, payload)
+            except Exception as e:
+                logger.error("Motor dinleyici hatası (%s): %s", event, e)
+
+    def _count_alarm(self, alarm, delta):
+        key = 'triggered' if alarm.get('triggered', False) else 'active'
+        self.stats[key] += delta
+        ACTIVE_ALARMS.set(self.stats['active'])
+
+    # İzleme listesi
+    def is_watched(self, crypto_id):
+        with self._lock:
+            return crypto_id in self._watchlist
+
+    def add_to_watchlist(self, crypto_data):
+        return self.submit(self._add_watch, dict(crypto_data))
+
+    def _add_watch(self, item):
+        with self._lock:
+            self._watchlist[item['id']] = item
+            self.stats['watched'] = len(self._watchlist)
+            self._state = None
+        self.store.insert_watch(item)
+        self._publish(EVENT_WATCHLIST)
+
+    def watchlist_currency(self):
+        """İzleme listesinin gösterim para birimi"""
+        return self.snapshot().watchlist_currency
+
+    def set_watchlist_currency(self, currency):
+        return self.submit(self._set_watchlist_currency, currency)
+
+    def _set_watchlist_currency(self, currency):
+        with self._lock:
+            if currency == self._watchlist_currency:
+                return
+            self._watchlist_currency = currency
+            self._state = None
+        self.store.set_setting('watchlist_currency', currency)
+        self._publish(EVENT_WATCHLIST)
+
+    def remove_from_watchlist(self, crypto_id):
+        return self.submit(self._remove_watch, crypto_id)
+
+    def _remove_watch(self, crypto_id):
+        with self._lock:
+            if self._watchlist.pop(crypto_id, None) is None:
+                return
+            self.stats['watched'] = len(self._watchlist)
+            self._state = None
+        self.store.delete_watch(crypto_id)
+        self._publish(EVENT_WATCHLIST)
+
+    # Alarmlar
+    def find_alarm(self, alarm_id):
+        with self._lock:
+            return self._alarms.get(alarm_id)
+
+    def active_alarms(self):
+        return [a for a in self.alarms if not a.get('triggered', False)]
+
+    def triggered_alarms(self):
+        return [a for a in self.alarms if a.get('triggered', False)]
+
+    def has_active_alarm(self, crypto_id):
+        return self.alarm_index.has_alarm(crypto_id) or self.window_index.has_alarm(crypto_id)
+
+    def add_alarm(self, alarm):
+        return self.submit(self._add_alarm, dict(alarm))
+
+    def _add_alarm(self, alarm):
+        with self._lock:
+            previous = self._alarms.get(alarm['id'])
+            if previous is not None:
+                self._count_alarm(previous, -1)
+            self._alarms[alarm['id']] = alarm
+            self.alarm_index.add(alarm)
+            self.window_index.add(alarm)
+            self._count_alarm(alarm, 1)
+            self._state = None
+        self.store.insert_alarm(alarm)
+        self._publish(EVENT_ALARMS)
+        if self.stream is not None and alarm['crypto_id'] not in self.stream.subscribed:
+            self.stream.reconnect()
+        self._wake.set()  # yeni coin hemen zamanlanıp yoklansın
+
+    def remove_alarm(self, alarm_id):
+        return self.submit(self._remove_alarm, alarm_id)
+
+    def _remove_alarm(self, alarm_id):
+        with self._lock:
+            alarm = self._alarms.pop(alarm_id, None)
+            if alarm is None:
+                return
+            self.alarm_index.remove(alarm_id)
+            self.window_index.remove(alarm_id)
+            self._count_alarm(alarm, -1)
+            self._state = None
+        self.store.delete_alarm(alarm_id)
+        self._publish(EVENT_ALARMS)
+
+    # Fiyat takibi
+    def alarm_crypto_ids(self):
+        return list(dict.fromkeys(self.alarm_index.crypto_ids() + self.window_index.crypto_ids()))
+
+    def alarm_currencies(self):
+        return self.alarm_index.currencies() | self.window_index.currencies()
+
+    def convert_prices(self, price_data, currencies, load=True):
+        """USD fiyatlarına istenen para birimlerindeki karşılıkları ekle.
+
+        Kurlar henüz yoksa FxRates.ensure() yükler (arka plan yenilemesi
+        varsa onu bekler, hatadan sonra bir süre denemez); kur yoksa
+        yalnızca USD kalır ve o para birimindeki alarmlar bu tur
+        değerlendirilmez. load=False yalnızca eldeki kurları kullanır
+        (akış thread'i kur yüklemesini beklememeli).
+        """
+        currencies = set(currencies) - {BASE_CURRENCY}
+        if not currencies:
+            return price_data
+        if load:
+            try:
+                self.fx.ensure()
+            except Exception as e:
+                logger.warning("Döviz kurları alınamadı: %s", e)
+        return self.fx.expand(price_data, currencies)
+
+    def check_alarms(self, crypto_ids=None):
+        """Alarmları (verilirse yalnızca bu coinler için) kontrol et, tetiklenenleri döndür.
+
+        Fiyatlar çağıran thread'de çekilir; yalnızca değerlendirme motor
+        thread'inde yapılır ve beklenir.
+        """
+        if crypto_ids is None:
+            crypto_ids = self.alarm_crypto_ids()
+        if not crypto_ids:
+            return []
+
+        price_data = {}
+        distances = {}
+        failed = ()
+        try:
+            with CYCLE_SECONDS.time(source='poll'):
+                # Sık yoklanan coinler için önbellekteki eski fiyat yetmez
+                price_data = self.prices.get_prices(crypto_ids, max_age=self.scheduler.min_interval,
+                                                    priority=PRIORITY_ALARM)
+                failed = price_data.failed
+                if failed:
+                    logger.warning("%d coinin fiyatı alınamadı, kısa aralıkla tekrar denenecek",
+                                   len(failed))
+                price_data = self.convert_prices(price_data, self.alarm_currencies())
+                triggered = self.call(self._evaluate, price_data, 'poll')
+            # Tetiklenenler indeksten çıktıktan sonra kalan eşiklere göre zamanla
+            distances = self.alarm_index.nearest_distances(price_data)
+        finally:
+            # take() coinleri heap'ten çıkardı; hata olsa da yeniden zamanlanmalı
+            self.scheduler.update(crypto_ids, price_data, distances, failed=failed)
+        return [alarm for alarm, _ in triggered]
+
+    def poll_due(self):
+        """Vadesi gelen coinleri tek toplu istekle yokla; sonraki beklemeyi döndür"""
+        if self.stream is not None and self.stream.connected:
+            self.check_alarms()
+            return STREAM_POLL_INTERVAL
+
+        self.scheduler.sync(self.alarm_crypto_ids())
+        crypto_ids = self.scheduler.take(limit=PRICE_CHUNK_SIZE)
+        if crypto_ids:
+            self.check_alarms(crypto_ids)
+
+        next_due = self.scheduler.next_due()
+        if next_due is None:
+            return self.interval
+        return max(0.0, next_due - time.monotonic())
+
+    def handle_ticks(self, price_data):
+        """Akıştan gelen fiyatlar: önbelleğe ve geçmişe yaz, yalnızca bu coinleri değerlendir"""
+        received = time.perf_counter()
+        merged = {}
+        for crypto_id, info in price_data.items():
+            # Akış yalnızca fiyat gönderebilir; 24s değişim ve market cap korunur
+            merged[crypto_id] = {**self.prices.peek(crypto_id), **(info or {})}
+        self.prices.store(merged)
+        self.prices.record(price_data, min_spacing=STREAM_HISTORY_SPACING)
+        # Kurlar arka planda ve yoklamada yüklenir; akış okuyucusu beklemez
+        self.submit(self._evaluate_ticks,
+                    self.convert_prices(merged, self.alarm_currencies(), load=False), received)
+
+    def _evaluate_ticks(self, price_data, received):
+        # Süre kuyrukta bekleme dahil, fiyatın gelişinden itibaren ölçülür
+        self._evaluate(price_data, 'stream')
+        CYCLE_SECONDS.observe(time.perf_counter() - received, source='stream')
+
+    def _evaluate(self, price_data, source):
+        """Fiyatlarla iki indeksi değerlendir, tetiklenenleri tek turda işle (motor thread'i)"""
+        # Yalnızca bu fiyatlardaki coinlerin alarmları sayılır (tek coinlik akış fiyatı
+        # tüm indeksi değerlendirmiş sayılmasın)
+        ALARMS_EVALUATED.inc(self.alarm_index.evaluated_count(price_data)
+                             + self.window_index.evaluated_count(price_data), source=source)
+        triggered = self.alarm_index.evaluate(price_data)
+        triggered += self.window_index.evaluate(price_data)
+        return self._trigger_batch(triggered) if triggered else []
+
+    def _on_stream_state(self, connected):
+        if not connected:
+            self._wake.set()  # akış koptu, hemen yoklamaya dön
+
+    def _trigger_batch(self, triggered):
+        """Turdaki tüm tetiklenmeler: tek kayıt, tek ses, tek bildirim"""
+        triggered_at = datetime.now().isoformat()
+        fired = []
+        with self._lock:
+            for alarm, price in triggered:
+                current = self._alarms.get(alarm['id'])
+                # Bu arada silinmiş ya da aynı turda zaten tetiklenmiş alarm atlanır
+                if current is None or current.get('triggered', False):
+                    continue
+                updated = {**current, 'triggered': True, 'triggered_at': triggered_at,
+                           'triggered_price': price}
+                self._alarms[alarm['id']] = updated
+                self.alarm_index.remove(alarm['id'])
+                self.window_index.remove(alarm['id'])
+                self._count_alarm(current, -1)
+                self._count_alarm(updated, 1)
+                fired.append((updated, price))
+            if not fired:
+                return []
+            self._state = None
+        self.store.update_alarms([alarm for alarm, _ in fired])
+        ALARMS_TRIGGERED.inc(len(fired))
+
+        if self.sound:
+            # Ses çalma birkaç yüz ms sürebilir; motor thread'ini bekletmesin
+            threading.Thread(
+                target=play_notification_sound,
+                args=(any(is_rise(alarm, price) for alarm, price in fired),),
+                daemon=True,
+            ).start()
+
+        self._publish(EVENT_ALARMS)
+        self._publish(EVENT_TRIGGERED, fired)
+        return fired
+
+    def monitor_prices(self):
+        """Takip döngüsü; stop() çağrılana kadar çalışır"""
+        self.monitoring_active = True
+        errors = 0
+        while self.monitoring_active:
+            # Yoklamadan önce temizlenir: yoklama sırasında gelen uyandırma
+            # (akış koptu, yeni coin) kaybolmaz, bir sonraki beklemeyi keser
+            self._wake.clear()
+            try:
+                delay = self.poll_due()
+                errors = 0
+            except Exception as e:
+                errors += 1
+                delay = max(self.provider.blocked_for(),
+                            backoff_delay(errors, base=5, cap=ERROR_INTERVAL))
+                logger.error("Takip hatası: %s (%.0f sn sonra yeniden denenecek)", e, delay)
+            self._wake.wait(delay)
+
+    def start(self):
+        """Motor thread'ini, takibi (ve varsa fiyat akışını) arka planda başlat"""
+        self.start_commands()
+        self.fx.start_background_refresh()
+        self.start_stream()
+        self._monitor_thread = threading.Thread(target=self.monitor_prices, daemon=True,
+                                                name="alarm-monitor")
+        self._monitor_thread.start()
+        return self._monitor_thread
+
+    def start_stream(self):
+        if self.stream is not None and not self.stream.connected:
+            self.stream.start()
+
+    def stop(self):
+        self.monitoring_active = False
+        self._wake.set()
+        if self.stream is not None:
+            self.stream.stop()
+        thread = self._command_thread
+        if thread is not None:
+            # Kuyruktaki komutlar (bekleyen kayıtlar) bitsin
+            self._commands.put(None)
+            thread.join(timeout=STOP_TIMEOUT)
+            self._command_thread = None
+        self.history.flush()
+
+
+def open_store(db_path=DB_FILE, alarms_file=ALARMS_FILE, watchlist_file=WATCHLIST_FILE):
+    """SQLite deposunu aç; ilk açılışta JSON dosyalarını içe aktar"""
+    store = SqliteStore(db_path)
+    store.import_json(alarms_file, watchlist_file)
+    return store
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m alarm_engine",
+        description="Kripto Takip Pro alarm motorunu arayüz olmadan çalıştır",
+    )
+    parser.add_argument("--db", default=DB_FILE, help="SQLite veritabanı")
+    parser.add_argument("--alarms", default=ALARMS_FILE,
+                        help="alarm JSON dosyası (ilk açılışta içe aktarılır)")
+    parser.add_argument("--watchlist", default=WATCHLIST_FILE,
+                        help="izleme listesi JSON dosyası (ilk açılışta içe aktarılır)")
+    parser.add_argument("--json", action="store_true",
+                        help="SQLite yerine doğrudan JSON dosyalarını kullan")
+    parser.add_argument("--history", default=HISTORY_FILE,
+                        help="fiyat geçmişi dosyası (mmap halka tamponları)")
+    parser.add_argument("--interval", type=float, default=CHECK_INTERVAL,
+                        help="eşik bilgisi olmayan coinler için yoklama aralığı (saniye)")
+    parser.add_argument("--poll-budget", type=float, default=POLL_BUDGET,
+                        help="dakikada en fazla toplu fiyat isteği")
+    parser.add_argument("--eval-mode", choices=EVALUATION_MODES, default='index',
+                        help="alarm değerlendirme yöntemi (vector için numpy gerekir)")
+    parser.add_argument("--stream-url",
+                        help="SSE fiyat akışı adresi; verilirse yoklama yalnızca yedektir")
+    parser.add_argument("--secondary-api",
+                        help="ikincil (hedge) CoinGecko uyumlu API adresi")
+    parser.add_argument("--hedge-percentile", type=float, default=HEDGE_PERCENTILE,
+                        help="birincilin bu gecikme yüzdeliği aşılınca ikinciye de sor")
+    parser.add_argument("--metrics-port", type=int,
+                        help="Prometheus metriklerini bu porttan sun (127.0.0.1)")
+    parser.add_argument("--metrics-log-interval", type=float, default=metrics.LOG_INTERVAL,
+                        help="metrik özetini log'a yazma aralığı (saniye, 0 kapalı)")
+    parser.add_argument("--once", action="store_true", help="tek kontrol yap ve çık")
+    parser.add_argument("--no-sound", action="store_true", help="bildirim sesini kapat")
+    parser.add_argument("--log-level", default="INFO")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=args.log_level.upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    if args.json:
+        store = JsonStore(args.alarms, args.watchlist)
+    else:
+        store = open_store(args.db, args.alarms, args.watchlist)
+
+    provider = get_client()
+    if args.secondary_api:
+        provider = HedgedProvider(provider, CoinGeckoClient(base_url=args.secondary_api),
+                                  percentile=args.hedge_percentile)
+
+    engine = AlarmEngine(
+        store=store,
+        provider=provider,
+        interval=args.interval,
+        sound=not args.no_sound,
+        history=PriceHistory(args.history),
+        evaluation_mode=args.eval_mode,
+        stream_url=args.stream_url,
+        poll_budget=args.poll_budget,
+    )
+
+    def log_trigger(triggered):
+        for alarm, price in triggered:
+            lines = alarm_message(alarm, price).splitlines()
+            logger.info(" | ".join(line for line in lines[1:] if line))
+        logger.info("Bu turda %d alarm tetiklendi", len(triggered))
+
+    engine.add_trigger_listener(log_trigger)
+    if args.metrics_port is not None:
+        metrics.MetricsServer(args.metrics_port).start()
+    if args.metrics_log_interval > 0 and not args.once:
+        metrics.start_log_reporter(args.metrics_log_interval)
+    logger.info("%d izlenen coin, %d aktif alarm",
+                len(engine.watchlist), engine.get_stats()['active'])
+
+    if args.once:
+        engine.check_alarms()
+        return 0
+
+    monitor = engine.start()
+    try:
+        # Zaman aşımlı join: Ctrl+C her platformda hemen yakalansın
+        while monitor.is_alive():
+            monitor.join(1)
+    except KeyboardInterrupt:
+        engine.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,259 @@
+"""Alarm ve izleme listesi depoları.
+
+SqliteStore varsayılan depodur: WAL modunda, id / crypto_id / triggered
+üzerinde indeksli tablolar ve tek satırlık güncellemeler. Bir alarmın
+tetiklenmesini kaydetmek, toplam alarm sayısından bağımsız olarak tek
+bir UPDATE'tir. JsonStore eski JSON dosya biçimini korur ve her
+değişiklikte dosyanın tamamını yeniden yazar.
+
+Liste düzeyindeki ayarlar (izleme listesinin para birimi gibi) satırlarda
+değil, get_setting / set_setting ile bir kez saklanır: SQLite'ta meta
+tablosunda, JsonStore'da ayrı bir ayar dosyasında.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+import metrics
+
+
+DB_FILE = 'crypto_alerts.db'
+SETTINGS_FILE = 'crypto_settings.json'  # JsonStore; izleme listesi dosyasının yanında
+
+SAVE_SECONDS = metrics.histogram('store_save_seconds', "Alarm ve izleme listesini kaydetme süresi",
+                                 ('store', 'operation'))
+
+logger = logging.getLogger(__name__)
+
+
+def read_json_list(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+class JsonStore:
+    """Eski biçim: her değişiklikte tüm JSON dosyasını yeniden yaz"""
+
+    def __init__(self, alarms_file, watchlist_file, settings_file=None):
+        self.alarms_file = alarms_file
+        self.watchlist_file = watchlist_file
+        self.settings_file = settings_file or os.path.join(
+            os.path.dirname(watchlist_file), SETTINGS_FILE)
+        self._lock = threading.Lock()
+        self._alarms = {}
+        self._watchlist = {}
+        self._settings = None
+
+    def load_alarms(self):
+        self._alarms = {alarm['id']: alarm for alarm in read_json_list(self.alarms_file)}
+        return list(self._alarms.values())
+
+    def load_watchlist(self):
+        self._watchlist = {item['id']: item for item in read_json_list(self.watchlist_file)}
+        return list(self._watchlist.values())
+
+    def insert_alarm(self, alarm):
+        self._alarms[alarm['id']] = alarm
+        self._write(self.alarms_file, self._alarms)
+
+    def update_alarm(self, alarm):
+        self.insert_alarm(alarm)
+
+    def update_alarms(self, alarms):
+        for alarm in alarms:
+            self._alarms[alarm['id']] = alarm
+        self._write(self.alarms_file, self._alarms)
+
+    def delete_alarm(self, alarm_id):
+        self._alarms.pop(alarm_id, None)
+        self._write(self.alarms_file, self._alarms)
+
+    def insert_watch(self, item):
+        self._watchlist[item['id']] = item
+        self._write(self.watchlist_file, self._watchlist)
+
+    def update_watch(self, item):
+        self.insert_watch(item)
+
+    def delete_watch(self, crypto_id):
+        self._watchlist.pop(crypto_id, None)
+        self._write(self.watchlist_file, self._watchlist)
+
+    def get_setting(self, key, default=None):
+        if self._settings is None:
+            try:
+                with open(self.settings_file, 'r', encoding='utf-8') as f:
+                    self._settings = json.load(f)
+            except (OSError, ValueError):
+                self._settings = {}
+        return self._settings.get(key, default)
+
+    def set_setting(self, key, value):
+        self.get_setting(key)
+        self._settings[key] = value
+        self._write(self.settings_file, self._settings, as_list=False)
+
+    def _write(self, path, items, as_list=True):
+        with self._lock, SAVE_SECONDS.time(store='json', operation='write'):
+            try:
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(list(items.values()) if as_list else items, f,
+                              ensure_ascii=False, indent=2)
+            except Exception as e:
+                logger.error("Kaydetme hatası (%s): %s", path, e)
+
+
+class SqliteStore:
+    """WAL modunda SQLite deposu; her değişiklik tek satır"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS alarms (
+            id TEXT PRIMARY KEY,
+            crypto_id TEXT NOT NULL,
+            triggered INTEGER NOT NULL DEFAULT 0,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_alarms_crypto_id ON alarms(crypto_id);
+        CREATE INDEX IF NOT EXISTS idx_alarms_triggered ON alarms(triggered);
+        CREATE TABLE IF NOT EXISTS watchlist (
+            id TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
+
+    def import_json(self, alarms_file, watchlist_file):
+        """Eski JSON dosyalarını bir kez içe aktar; daha önce yapıldıysa atla"""
+        with self._lock:
+            done = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'json_imported'"
+            ).fetchone()
+            if done:
+                return False
+
+            alarms = read_json_list(alarms_file)
+            watchlist = read_json_list(watchlist_file)
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO alarms (id, crypto_id, triggered, data) VALUES (?, ?, ?, ?)",
+                    [self._alarm_row(alarm) for alarm in alarms],
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO watchlist (id, position, data) VALUES (?, ?, ?)",
+                    [(item['id'], position, json.dumps(item, ensure_ascii=False))
+                     for position, item in enumerate(watchlist)],
+                )
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('json_imported', ?)",
+                    (f"{len(alarms)} alarms, {len(watchlist)} watchlist items",),
+                )
+        logger.info("JSON'dan %d alarm ve %d izleme listesi kaydı içe aktarıldı",
+                    len(alarms), len(watchlist))
+        return True
+
+    @staticmethod
+    def _alarm_row(alarm):
+        return (
+            alarm['id'],
+            alarm['crypto_id'],
+            1 if alarm.get('triggered', False) else 0,
+            json.dumps(alarm, ensure_ascii=False),
+        )
+
+    def load_alarms(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM alarms ORDER BY rowid").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def load_watchlist(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM watchlist ORDER BY position").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def insert_alarm(self, alarm):
+        self._execute(
+            "INSERT OR REPLACE INTO alarms (id, crypto_id, triggered, data) VALUES (?, ?, ?, ?)",
+            self._alarm_row(alarm),
+        )
+
+    def update_alarm(self, alarm):
+        _, crypto_id, triggered, data = self._alarm_row(alarm)
+        self._execute(
+            "UPDATE alarms SET crypto_id = ?, triggered = ?, data = ? WHERE id = ?",
+            (crypto_id, triggered, data, alarm['id']),
+        )
+
+    def update_alarms(self, alarms):
+        """Birden çok alarmı tek transaction'da güncelle"""
+        rows = []
+        for alarm in alarms:
+            _, crypto_id, triggered, data = self._alarm_row(alarm)
+            rows.append((crypto_id, triggered, data, alarm['id']))
+        with self._lock, SAVE_SECONDS.time(store='sqlite', operation='update_many'):
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE alarms SET crypto_id = ?, triggered = ?, data = ? WHERE id = ?",
+                        rows,
+                    )
+            except sqlite3.Error as e:
+                logger.error("Depo hatası: %s", e)
+
+    def delete_alarm(self, alarm_id):
+        self._execute("DELETE FROM alarms WHERE id = ?", (alarm_id,))
+
+    def insert_watch(self, item):
+        self._execute(
+            "INSERT OR REPLACE INTO watchlist (id, position, data) "
+            "VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM watchlist), ?)",
+            (item['id'], json.dumps(item, ensure_ascii=False)),
+        )
+
+    def update_watch(self, item):
+        self._execute(
+            "UPDATE watchlist SET data = ? WHERE id = ?",
+            (json.dumps(item, ensure_ascii=False), item['id']),
+        )
+
+    def delete_watch(self, crypto_id):
+        self._execute("DELETE FROM watchlist WHERE id = ?", (crypto_id,))
+
+    def get_setting(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?",
+                                     (f"setting:{key}",)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_setting(self, key, value):
+        self._execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                      (f"setting:{key}", json.dumps(value)))
+
+    def _execute(self, sql, params):
+        with self._lock, SAVE_SECONDS.time(store='sqlite', operation=sql.split(None, 1)[0].lower()):
+            try:
+                with self._conn:
+                    self._conn.execute(sql, params)
+            except sqlite3.Error as e:
+                logger.error("Depo hatası: %s", e)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,241 @@
+"""Alarm türleri ve kayan pencere (zaman aralığı) alarmları.
+
+Üç alarm türü vardır:
+
+    price         sabit hedef fiyat: target_price, above / below
+    from_created  oluşturulduğu fiyata (base_price) göre ±percent
+    window        son window_minutes dakikanın en düşük / en yüksek
+                  fiyatına göre ±percent
+
+Her alarm kendi para biriminde (currency, varsayılan usd) değerlendirilir;
+target_price ve base_price o para birimindedir.
+
+price ve from_created alarmları sabit eşiklere çevrilir ve AlarmIndex /
+VectorIndex içinde değerlendirilir. window alarmları WindowIndex'te
+tutulur: coin ve pencere süresi başına monotonik deque'lerle kayan min /
+max izlenir, böylece her yeni fiyat coin başına amortize O(1) maliyetlidir.
+"""
+import bisect
+import threading
+import time
+from collections import deque
+
+
+TYPE_PRICE = 'price'
+TYPE_FROM_CREATED = 'from_created'
+TYPE_WINDOW = 'window'
+ALARM_TYPES = (TYPE_PRICE, TYPE_FROM_CREATED, TYPE_WINDOW)
+
+# 'either' yalnızca yüzde alarmlarında: iki yönden biri yeterli
+CONDITIONS = ('above', 'below', 'either')
+
+
+def alarm_type(alarm):
+    """Eski kayıtlarda 'type' alanı yoktur; bunlar sabit fiyat alarmıdır"""
+    return alarm.get('type', TYPE_PRICE)
+
+
+def alarm_currency(alarm):
+    """Alarmın karşılaştırıldığı para birimi; eski kayıtlarda USD"""
+    return alarm.get('currency', 'usd')
+
+
+def condition_sides(condition):
+    return ('above', 'below') if condition == 'either' else (condition,)
+
+
+def alarm_thresholds(alarm):
+    """Alarmın sabit eşikleri [(condition, fiyat), ...]; window alarmında boş"""
+    kind = alarm_type(alarm)
+    if kind == TYPE_PRICE:
+        return [(alarm['condition'], alarm['target_price'])]
+    if kind == TYPE_FROM_CREATED:
+        base = alarm['base_price']
+        ratio = alarm['percent'] / 100
+        thresholds = []
+        for side in condition_sides(alarm['condition']):
+            target = base * (1 + ratio) if side == 'above' else base * (1 - ratio)
+            thresholds.append((side, target))
+        return thresholds
+    return []
+
+
+class MonotonicWindow:
+    """Son `seconds` saniyedeki en düşük ve en yüksek fiyat.
+
+    _min artan, _max azalan fiyat sırasında (zaman, fiyat) tutar; yeni
+    fiyatın geçersiz kıldığı kayıtlar sondan, süresi dolanlar baştan atılır.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self._min = deque()
+        self._max = deque()
+
+    def push(self, timestamp, price):
+        while self._min and self._min[-1][1] >= price:
+            self._min.pop()
+        self._min.append((timestamp, price))
+        while self._max and self._max[-1][1] <= price:
+            self._max.pop()
+        self._max.append((timestamp, price))
+
+        cutoff = timestamp - self.seconds
+        while self._min[0][0] < cutoff:
+            self._min.popleft()
+        while self._max[0][0] < cutoff:
+            self._max.popleft()
+
+    def low(self):
+        return self._min[0][1]
+
+    def high(self):
+        return self._max[0][1]
+
+
+class WindowIndex:
+    """window türündeki aktif alarmlar; coin ve süre başına tek pencere.
+
+    Her (coin, süre) için 'above' ve 'below' yüzdeleri sıralı tutulur;
+    pencerenin dibinden yükseliş ya da tepesinden düşüş yüzdesiyle geçilen
+    alarmlar bisect + dilim ile bulunur.
+    """
+
+    def __init__(self, alarms=None, history=None):
+        self._lock = threading.RLock()
+        self.history = history
+        # crypto_id -> {(window_minutes, currency): MonotonicWindow}
+        self._windows = {}
+        # crypto_id -> {(window_minutes, currency): {'above': ([yüzdeler], [alarmlar]), 'below': ...}}
+        self._thresholds = {}
+        # (crypto_id, (window_minutes, currency)) -> aktif alarm sayısı
+        self._counts = {}
+        # alarm_id -> (crypto_id, (window_minutes, currency), [(condition, percent), ...])
+        self._entries = {}
+        if alarms:
+            self.rebuild(alarms)
+
+    def rebuild(self, alarms):
+        with self._lock:
+            self._windows = {}
+            self._thresholds = {}
+            self._counts = {}
+            self._entries = {}
+            for alarm in alarms:
+                self.add(alarm)
+
+    def add(self, alarm):
+        with self._lock:
+            # Aynı id'li eski kayıt, yenisi tetiklenmiş ya da başka türde olsa da çıkarılır
+            if alarm['id'] in self._entries:
+                self.remove(alarm['id'])
+            if alarm.get('triggered', False) or alarm_type(alarm) != TYPE_WINDOW:
+                return
+            crypto_id = alarm['crypto_id']
+            window_key = (alarm['window_minutes'], alarm_currency(alarm))
+            windows = self._windows.setdefault(crypto_id, {})
+            if window_key not in windows:
+                windows[window_key] = self._new_window(crypto_id, *window_key)
+            sides = self._thresholds.setdefault(crypto_id, {}).setdefault(window_key, {
+                'above': ([], []),
+                'below': ([], []),
+            })
+            count_key = (crypto_id, window_key)
+            self._counts[count_key] = self._counts.get(count_key, 0) + 1
+            entries = []
+            for side in condition_sides(alarm['condition']):
+                percents, items = sides[side]
+                pos = bisect.bisect_right(percents, alarm['percent'])
+                percents.insert(pos, alarm['percent'])
+                items.insert(pos, alarm)
+                entries.append((side, alarm['percent']))
+            self._entries[alarm['id']] = (crypto_id, window_key, entries)
+
+    def _new_window(self, crypto_id, minutes, currency):
+        """Yeni pencereyi varsa fiyat geçmişiyle doldur (geçmiş USD tutulur)"""
+        window = MonotonicWindow(minutes * 60)
+        if self.history is not None and currency == 'usd':
+            timestamps, prices = self.history.series(crypto_id, since=time.time() - window.seconds)
+            for timestamp, price in zip(timestamps, prices):
+                window.push(timestamp, price)
+        return window
+
+    def remove(self, alarm_id):
+        with self._lock:
+            entry = self._entries.pop(alarm_id, None)
+            if entry is None:
+                return
+            crypto_id, window_key, entries = entry
+            sides = self._thresholds[crypto_id][window_key]
+            for side, percent in entries:
+                percents, items = sides[side]
+                pos = bisect.bisect_left(percents, percent)
+                while pos < len(percents) and percents[pos] == percent:
+                    if items[pos]['id'] == alarm_id:
+                        del percents[pos]
+                        del items[pos]
+                        break
+                    pos += 1
+            self._counts[(crypto_id, window_key)] -= 1
+            if not sides['above'][0] and not sides['below'][0]:
+                del self._counts[(crypto_id, window_key)]
+                del self._thresholds[crypto_id][window_key]
+                del self._windows[crypto_id][window_key]
+                if not self._thresholds[crypto_id]:
+                    del self._thresholds[crypto_id]
+                    del self._windows[crypto_id]
+
+    def evaluate(self, price_data, timestamp=None):
+        """Yeni fiyatları pencerelere ekle, tetiklenen (alarm, fiyat) çiftlerini döndür"""
+        timestamp = time.time() if timestamp is None else timestamp
+        triggered = []
+        with self._lock:
+            for crypto_id, info in price_data.items():
+                windows = self._windows.get(crypto_id)
+                if not windows:
+                    continue
+                for window_key, window in windows.items():
+                    price = (info or {}).get(window_key[1])
+                    if not price:
+                        continue
+                    window.push(timestamp, price)
+                    rise = (price / window.low() - 1) * 100
+                    fall = (1 - price / window.high()) * 100
+                    sides = self._thresholds[crypto_id][window_key]
+                    above_percents, above_items = sides['above']
+                    below_percents, below_items = sides['below']
+                    hits = above_items[:bisect.bisect_right(above_percents, rise)]
+                    hits += below_items[:bisect.bisect_right(below_percents, fall)]
+                    # 'either' alarmları iki listede de bulunabilir
+                    seen = set()
+                    for alarm in hits:
+                        if alarm['id'] not in seen:
+                            seen.add(alarm['id'])
+                            triggered.append((alarm, price))
+        return triggered
+
+    def evaluated_count(self, price_data):
+        """evaluate(price_data)'nın fiyatla karşılaştırdığı aktif alarm sayısı"""
+        count = 0
+        with self._lock:
+            for crypto_id, info in price_data.items():
+                for window_key in self._windows.get(crypto_id, ()):
+                    if (info or {}).get(window_key[1]):
+                        count += self._counts[(crypto_id, window_key)]
+        return count
+
+    def crypto_ids(self):
+        with self._lock:
+            return list(self._windows)
+
+    def currencies(self):
+        with self._lock:
+            return {currency for windows in self._windows.values() for _, currency in windows}
+
+    def has_alarm(self, crypto_id):
+        with self._lock:
+            return crypto_id in self._windows
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
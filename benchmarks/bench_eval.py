@@ -0,0 +1,89 @@
+"""Alarm değerlendirme karşılaştırması: eski döngü, bisect indeksi, NumPy.
+
+    python benchmarks/bench_eval.py
+    python benchmarks/bench_eval.py --sizes 1000 100000 --coins 5000
+
+Her boyut için sentetik alarmlar ve ±%2 oynayan bir fiyat anlık görüntüsü
+üretilir; her yöntemin bir tam değerlendirmesi ölçülür (en iyi / medyan).
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alarm_engine import AlarmIndex  # noqa: E402
+from vector_eval import HAVE_NUMPY, VectorIndex  # noqa: E402
+from synthetic import make_alarms  # noqa: E402
+
+
+SIZES = (1_000, 100_000, 1_000_000)
+COINS = 2_000
+
+
+def loop_evaluate(alarms, price_data):
+    """Eski check_alarms: tüm alarmlar üzerinde koşullu döngü"""
+    triggered = []
+    for alarm in alarms:
+        if alarm.get('triggered', False):
+            continue
+        crypto_price = price_data.get(alarm['crypto_id'], {}).get('usd')
+        if not crypto_price:
+            continue
+        should_trigger = False
+        if alarm['condition'] == 'above' and crypto_price >= alarm['target_price']:
+            should_trigger = True
+        elif alarm['condition'] == 'below' and crypto_price <= alarm['target_price']:
+            should_trigger = True
+        if should_trigger:
+            triggered.append((alarm, crypto_price))
+    return triggered
+
+
+def measure(func, repeat):
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--coins", type=int, default=COINS)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if not HAVE_NUMPY:
+        print("numpy kurulu değil; vector modu atlanıyor")
+
+    print(f"{'alarm':>10} {'yöntem':>8} {'kurulum ms':>11} {'en iyi ms':>10} {'medyan ms':>10} {'tetik':>8}")
+    for size in args.sizes:
+        alarms, prices = make_alarms(size, args.coins)
+        methods = [('loop', lambda: alarms, lambda _: loop_evaluate(alarms, prices))]
+        methods.append(('index', lambda: AlarmIndex(alarms), lambda index: index.evaluate(prices)))
+        if HAVE_NUMPY:
+            methods.append(('vector', lambda: VectorIndex(alarms), lambda index: index.evaluate(prices)))
+
+        expected = None
+        for name, build, evaluate in methods:
+            start = time.perf_counter()
+            index = build()
+            build_ms = (time.perf_counter() - start) * 1000
+            best, median, result = measure(lambda: evaluate(index), args.repeat)
+            hits = sorted(alarm['id'] for alarm, _ in result)
+            if expected is None:
+                expected = hits
+            elif hits != expected:
+                raise SystemExit(f"{name}: sonuçlar döngüyle eşleşmiyor")
+            print(f"{size:>10,} {name:>8} {build_ms:>11.1f} {best * 1000:>10.2f} "
+                  f"{median * 1000:>10.2f} {len(hits):>8,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark'lar için yerel sahte CoinGecko API'si.
+
+/simple/price, /search ve /exchange_rates uçlarını gerçek yanıt
+biçimiyle sunar; fiyatlar synthetic.coin_price ile id'den türetilir ve
+her istekte hafifçe oynar. İsteğe bağlı sabit gecikme eklenebilir.
+
+    python benchmarks/mock_coingecko.py --port 8766 --coins 10000
+    python -m alarm_engine --secondary-api http://127.0.0.1:8766/api/v3 ...
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_coins, price_info  # noqa: E402
+
+
+API_PREFIX = '/api/v3'
+SEARCH_LIMIT = 25
+RATES = {'btc': 1.0, 'usd': 60000.0, 'eur': 55000.0, 'try': 2000000.0}
+
+
+class MockCoinGecko:
+    """ThreadingHTTPServer üzerinde sahte API; requests uç başına istek sayısı"""
+
+    def __init__(self, coins=1000, host='127.0.0.1', port=0, latency=0.0, seed=1):
+        self.coins = make_coins(coins)
+        self.known = {coin['id'] for coin in self.coins}
+        self.latency = latency
+        self.requests = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Başlık ve gövde ayrı yazılıyor; Nagle + gecikmeli ACK ~40 ms eklemesin
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                path = parts.path[len(API_PREFIX):] if parts.path.startswith(API_PREFIX) else parts.path
+                params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+                handler = {
+                    '/simple/price': mock.simple_price,
+                    '/search': mock.search,
+                    '/exchange_rates': mock.exchange_rates,
+                }.get(path)
+                with mock._lock:
+                    mock.requests[path] = mock.requests.get(path, 0) + 1
+                if handler is None:
+                    self.send_error(404)
+                    return
+                if mock.latency:
+                    time.sleep(mock.latency)
+                body = json.dumps(handler(params)).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def simple_price(self, params):
+        ids = [crypto_id for crypto_id in params.get('ids', '').split(',') if crypto_id in self.known]
+        with self._lock:
+            jitters = [self._rng.uniform(-0.02, 0.02) for _ in ids]
+        return {crypto_id: price_info(crypto_id, jitter) for crypto_id, jitter in zip(ids, jitters)}
+
+    def search(self, params):
+        query = params.get('query', '').lower()
+        coins = [coin for coin in self.coins
+                 if query in coin['name'].lower() or query in coin['symbol'].lower()]
+        return {'coins': coins[:SEARCH_LIMIT]}
+
+    def exchange_rates(self, params):
+        return {'rates': {currency: {'value': value} for currency, value in RATES.items()}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sahte CoinGecko API sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--coins", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0, help="istek başına gecikme (saniye)")
+    args = parser.parse_args(argv)
+
+    mock = MockCoinGecko(args.coins, args.host, args.port, args.latency).start()
+    print(f"Serving {mock.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,357 @@
+"""Kripto Takip Pro benchmark takımı.
+
+    python benchmarks/run.py
+    python benchmarks/run.py --sizes 1000 10000 --only eval store
+    python benchmarks/run.py --output bench.json --compare onceki.json
+
+Ölçülenler (her boyut için sentetik veriyle):
+
+    eval    AlarmIndex / VectorIndex / WindowIndex tam değerlendirmesi
+    store   SqliteStore ve JsonStore: toplu kayıt, yükleme, toplu tetik güncellemesi
+    render  gerçek uygulamada display_watchlist / refresh_alarms (Tk; ekran
+            yoksa Xvfb, o da yoksa atlanır)
+    poll    sahte CoinGecko sunucusuna karşı uçtan uca check_alarms turu
+            ve /search gidiş-dönüşü
+
+Sonuçlar commit hash'iyle birlikte JSON olarak yazılır; --compare önceki
+bir JSON ile medyan süreleri karşılaştırır.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from alarm_engine import AlarmEngine, AlarmIndex  # noqa: E402
+from alarm_store import JsonStore, SqliteStore  # noqa: E402
+from alarm_types import WindowIndex  # noqa: E402
+from coingecko import CoinGeckoClient  # noqa: E402
+from mock_coingecko import MockCoinGecko  # noqa: E402
+from price_history import PriceHistory  # noqa: E402
+from rate_limiter import RateLimiter  # noqa: E402
+from synthetic import coin_count, make_alarms, make_watchlist  # noqa: E402
+from vector_eval import HAVE_NUMPY, VectorIndex  # noqa: E402
+
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+BENCHMARKS = ('eval', 'store', 'render', 'poll')
+# Yavaş ölçümlerde boyuta göre tekrar sayısı
+REPEAT = 5
+LARGE = 100_000
+# Tk listeleri yalnızca görünen satırları çizer; izleme listesi bu boyutla sınırlı
+WATCHLIST_LIMIT = 10_000
+# Render ölçümünden önce uygulamanın arka ucu yükleyip listeyi çizmesi için süre
+READY_TIMEOUT = 60
+
+
+def measure(func, repeat):
+    """func'ı repeat kez çalıştır; (en iyi, medyan, son sonuç) saniye cinsinden"""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times), result
+
+
+def repeat_for(size, repeat):
+    return max(1, repeat // 3) if size >= LARGE else repeat
+
+
+class Results:
+    """Ölçümleri biriktirip tablo olarak yazar"""
+
+    def __init__(self):
+        self.items = []
+        self.skipped = []
+
+    def add(self, name, size, best, median, runs, **extra):
+        item = {
+            'name': name,
+            'size': size,
+            'best_ms': round(best * 1000, 3),
+            'median_ms': round(median * 1000, 3),
+            'runs': runs,
+        }
+        item.update(extra)
+        self.items.append(item)
+        details = " ".join(f"{key}={value}" for key, value in extra.items())
+        print(f"{name:<28} {size:>10,} {item['best_ms']:>11.2f} {item['median_ms']:>11.2f}  {details}",
+              flush=True)
+
+    def skip(self, name, reason):
+        self.skipped.append({'name': name, 'reason': reason})
+        print(f"{name:<28} atlandı: {reason}", flush=True)
+
+
+def bench_eval(size, repeat, results):
+    coins = coin_count(size)
+    alarms, prices = make_alarms(size, coins, mixed=True)
+    methods = [('eval.index', AlarmIndex)]
+    if HAVE_NUMPY:
+        methods.append(('eval.vector', VectorIndex))
+    expected = None
+    for name, cls in methods:
+        start = time.perf_counter()
+        index = cls(alarms)
+        build = time.perf_counter() - start
+        best, median, triggered = measure(lambda: index.evaluate(prices), repeat_for(size, repeat))
+        hits = sorted(alarm['id'] for alarm, _ in triggered)
+        if expected is None:
+            expected = hits
+        elif hits != expected:
+            raise SystemExit(f"{name}: sonuçlar eval.index ile eşleşmiyor")
+        results.add(name, size, best, median, repeat_for(size, repeat),
+                    build_ms=round(build * 1000, 1), triggered=len(hits), coins=coins)
+    if not HAVE_NUMPY:
+        results.skip('eval.vector', "numpy kurulu değil")
+
+    # Pencere alarmları: her değerlendirme pencerelere bir fiyat ekler
+    window_alarms = [dict(alarm, type='window', percent=alarm.get('percent', 5), window_minutes=15)
+                     for alarm in alarms]
+    index = WindowIndex(window_alarms)
+    clock = iter(range(10 ** 9))
+    best, median, _ = measure(lambda: index.evaluate(prices, timestamp=next(clock)),
+                              repeat_for(size, repeat))
+    results.add('eval.window', size, best, median, repeat_for(size, repeat), coins=coins)
+
+
+def bench_store(size, repeat, results, workdir):
+    alarms, _ = make_alarms(size, coin_count(size))
+    alarms_file = os.path.join(workdir, f"alarms-{size}.json")
+    watchlist_file = os.path.join(workdir, f"watchlist-{size}.json")
+    with open(alarms_file, 'w', encoding='utf-8') as f:
+        json.dump(alarms, f)
+    with open(watchlist_file, 'w', encoding='utf-8') as f:
+        json.dump([], f)
+    # Her turda alarmların %1'i tetiklenir
+    changed = [dict(alarm, triggered=True) for alarm in alarms[::100]]
+    runs = repeat_for(size, repeat)
+
+    counter = iter(range(10 ** 9))
+
+    def sqlite_save():
+        store = SqliteStore(os.path.join(workdir, f"bench-{size}-{next(counter)}.db"))
+        store.import_json(alarms_file, watchlist_file)
+        return store
+
+    best, median, store = measure(sqlite_save, runs)
+    results.add('store.sqlite.save_all', size, best, median, runs)
+    best, median, loaded = measure(store.load_alarms, runs)
+    assert len(loaded) == size
+    results.add('store.sqlite.load', size, best, median, runs)
+    best, median, _ = measure(lambda: store.update_alarms(changed), runs)
+    results.add('store.sqlite.update_triggered', size, best, median, runs, updated=len(changed))
+    best, median, _ = measure(lambda: store.update_alarm(changed[0]), runs)
+    results.add('store.sqlite.update_one', size, best, median, runs)
+    store.close()
+
+    store = JsonStore(alarms_file, watchlist_file)
+    best, median, loaded = measure(store.load_alarms, runs)
+    assert len(loaded) == size
+    results.add('store.json.load', size, best, median, runs)
+    best, median, _ = measure(lambda: store.update_alarms(changed), runs)
+    results.add('store.json.update_triggered', size, best, median, runs, updated=len(changed))
+
+
+def start_display():
+    """Ekran yoksa Xvfb başlat; (süreç ya da None, atlama nedeni ya da None)"""
+    if os.environ.get('DISPLAY'):
+        return None, None
+    if shutil.which('Xvfb') is None:
+        return None, "DISPLAY yok ve Xvfb bulunamadı"
+    display = f":{90 + os.getpid() % 9}"
+    process = subprocess.Popen(['Xvfb', display, '-screen', '0', '1400x900x24'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)
+    if process.poll() is not None:
+        return None, "Xvfb başlatılamadı"
+    os.environ['DISPLAY'] = display
+    return process, None
+
+
+def bench_render(size, repeat, results, workdir):
+    try:
+        import customtkinter  # noqa: F401
+        from cryptopricealerts import ModernCryptoApp
+    except ImportError as e:
+        results.skip('render', f"arayüz bağımlılığı yok: {e}")
+        return
+
+    from providers import StaticProvider
+
+    coins = coin_count(size)
+    alarms, prices = make_alarms(size, coins, mixed=True)
+    watchlist = make_watchlist(min(size, WATCHLIST_LIMIT, coins))
+    for item in watchlist:
+        prices.setdefault(item['id'], {'usd': 1.0})
+    alarms_file = os.path.join(workdir, f"render-alarms-{size}.json")
+    watchlist_file = os.path.join(workdir, f"render-watchlist-{size}.json")
+    for path, items in ((alarms_file, alarms), (watchlist_file, watchlist)):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(items, f)
+
+    # Gerçek uygulama: fiyatsız sabit sağlayıcı (alarm tetiklenmez, ağ yok), geçici depo
+    history = PriceHistory(os.path.join(workdir, f"render-{size}.bin"))
+    store = JsonStore(alarms_file, watchlist_file,
+                      settings_file=os.path.join(workdir, f"render-settings-{size}.json"))
+    cwd = os.getcwd()
+    app = None
+    try:
+        # Katalog ve logo önbelleği çalışma dizinine yazar
+        os.chdir(workdir)
+        app = ModernCryptoApp(metrics_log_interval=0, provider=StaticProvider(), store=store,
+                              history=history)
+        deadline = time.monotonic() + READY_TIMEOUT
+        while 'interactive' not in app.startup_marks and time.monotonic() < deadline:
+            app.root.update()
+            time.sleep(0.01)
+        if 'interactive' not in app.startup_marks:
+            results.skip('render', "uygulama zamanında hazır olmadı")
+            return
+
+        def render(func):
+            func()
+            app.root.update_idletasks()
+
+        runs = repeat_for(size, repeat)
+        best, median, _ = measure(lambda: render(lambda: app.display_watchlist(prices)), runs)
+        results.add('render.display_watchlist', size, best, median, runs, rows=len(watchlist))
+        best, median, _ = measure(lambda: render(app.refresh_alarms), runs)
+        results.add('render.refresh_alarms', size, best, median, runs, rows=len(alarms))
+    finally:
+        if app is not None:
+            app.close()
+        history.close()
+        os.chdir(cwd)
+
+
+def bench_poll(size, repeat, results, workdir):
+    coins = coin_count(size)
+    alarms, _ = make_alarms(size, coins, mixed=True)
+    alarms_file = os.path.join(workdir, f"poll-alarms-{size}.json")
+    with open(alarms_file, 'w', encoding='utf-8') as f:
+        json.dump(alarms, f)
+    store = SqliteStore(os.path.join(workdir, f"poll-{size}.db"))
+    store.import_json(alarms_file, os.path.join(workdir, "poll-watchlist.json"))
+
+    mock = MockCoinGecko(coins).start()
+    try:
+        # Sahte sunucuda hız sınırı yok; limiter ölçümü bozmasın
+        client = CoinGeckoClient(base_url=mock.url, limiter=RateLimiter(rate=1e9, capacity=1e9))
+        engine = AlarmEngine(store=store, provider=client, sound=False,
+                             history=PriceHistory(os.path.join(workdir, f"poll-{size}.bin"),
+                                                  max_coins=coins))
+        # Her tur önbelleği atlayıp sunucuya gitsin
+        engine.scheduler.min_interval = 0
+        crypto_ids = engine.alarm_crypto_ids()
+        runs = repeat_for(size, repeat)
+        requests_before = mock.requests.get('/simple/price', 0)
+        best, median, _ = measure(lambda: engine.check_alarms(crypto_ids), runs)
+        requests = (mock.requests.get('/simple/price', 0) - requests_before) // runs
+        results.add('poll.check_alarms', size, best, median, runs,
+                    coins=len(crypto_ids), requests_per_cycle=requests,
+                    triggered=engine.get_stats()['triggered'])
+        best, median, _ = measure(lambda: client.search("coin 1"), repeat)
+        results.add('poll.search', size, best, median, repeat)
+        engine.history.close()
+    finally:
+        mock.stop()
+        store.close()
+
+
+def git_revision():
+    def git(*args):
+        try:
+            return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True,
+                                  timeout=30).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ''
+    return git('rev-parse', 'HEAD') or None, bool(git('status', '--porcelain', '--untracked-files=no'))
+
+
+def compare(previous_path, items):
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+    baseline = {(item['name'], item['size']): item for item in previous.get('results', [])}
+    print(f"\n{previous_path} ({(previous.get('commit') or '?')[:10]}) ile karşılaştırma:")
+    for item in items:
+        old = baseline.get((item['name'], item['size']))
+        if not old or not old['median_ms']:
+            continue
+        ratio = item['median_ms'] / old['median_ms']
+        # Milisaniyenin altındaki farklar ölçüm gürültüsü
+        slower = ratio > 1.2 and item['median_ms'] - old['median_ms'] > 0.5
+        flag = "  <-- yavaşladı" if slower else ""
+        print(f"{item['name']:<28} {item['size']:>10,} {old['median_ms']:>11.2f} -> "
+              f"{item['median_ms']:>11.2f}  x{ratio:.2f}{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--output", help="sonuç JSON dosyası (varsayılan: bench-<commit>.json)")
+    parser.add_argument("--compare", help="önceki bir sonuç JSON'u")
+    args = parser.parse_args(argv)
+
+    commit, dirty = git_revision()
+    results = Results()
+    display = None
+    print(f"{'ölçüm':<28} {'boyut':>10} {'en iyi ms':>11} {'medyan ms':>11}")
+    with tempfile.TemporaryDirectory(prefix="kripto-bench-") as workdir:
+        try:
+            if 'render' in args.only:
+                display, reason = start_display()
+                if reason:
+                    results.skip('render', reason)
+                    args.only = [name for name in args.only if name != 'render']
+            for size in args.sizes:
+                if 'eval' in args.only:
+                    bench_eval(size, args.repeat, results)
+                if 'store' in args.only:
+                    bench_store(size, args.repeat, results, workdir)
+                if 'render' in args.only:
+                    bench_render(size, args.repeat, results, workdir)
+                if 'poll' in args.only:
+                    bench_poll(size, args.repeat, results, workdir)
+        finally:
+            if display is not None:
+                display.terminate()
+
+    report = {
+        'commit': commit,
+        'dirty': dirty,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': HAVE_NUMPY,
+        'sizes': args.sizes,
+        'results': results.items,
+        'skipped': results.skipped,
+    }
+    output = args.output or f"bench-{(commit or 'unknown')[:10]}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSonuçlar: {output}")
+
+    if args.compare:
+        compare(args.compare, results.items)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,92 @@
+"""Benchmark'lar için tekrarlanabilir sentetik veri.
+
+Coin id'leri coin-0, coin-1, ... biçimindedir; her coinin taban fiyatı
+id'den türetilir (coin_price), böylece sahte sunucu ve alarm üreticisi
+aynı fiyatları paylaşmak için veri alışverişi yapmaz.
+"""
+import random
+import zlib
+from datetime import datetime, timedelta
+
+
+def coin_id(index):
+    return f"coin-{index}"
+
+
+def coin_price(crypto_id):
+    """Coin'in taban USD fiyatı: 1e-4 .. 1e4 arasında, id'ye göre sabit"""
+    return 10 ** ((zlib.crc32(crypto_id.encode('utf-8')) % 80_000) / 10_000 - 4)
+
+
+def coin_count(records):
+    """Kayıt sayısına göre makul coin sayısı (coin başına ~100 kayıt, 50..10000)"""
+    return max(50, min(10_000, records // 100))
+
+
+def make_coins(count):
+    """/search biçiminde coin kayıtları"""
+    return [{
+        'id': coin_id(i),
+        'name': f"Coin {i}",
+        'symbol': f"C{i}",
+        'market_cap_rank': i + 1,
+        'large': '',
+    } for i in range(count)]
+
+
+def make_watchlist(count, seed=1):
+    """İzleme listesi kayıtları; count coin'den fazlaysa id'ler numaralanır"""
+    rng = random.Random(seed)
+    added = datetime(2024, 1, 1)
+    return [{
+        'id': coin_id(i),
+        'name': f"Coin {i}",
+        'symbol': f"C{i}",
+        'image': '',
+        'market_cap_rank': i + 1,
+        'added_at': (added + timedelta(seconds=rng.randrange(86400 * 365))).isoformat(),
+    } for i in range(count)]
+
+
+def make_alarms(count, coins, seed=1, mixed=False):
+    """Sentetik alarmlar ve ±%2 oynamış bir fiyat anlık görüntüsü.
+
+    mixed=True ise alarmların bir kısmı oluşturma fiyatına göre yüzde
+    alarmıdır; aksi halde hepsi sabit fiyat alarmıdır (eski biçim).
+    """
+    rng = random.Random(seed)
+    ids = [coin_id(i) for i in range(coins)]
+    base = {crypto_id: coin_price(crypto_id) for crypto_id in ids}
+    created = datetime(2024, 1, 1).isoformat()
+    alarms = []
+    for i in range(count):
+        crypto_id = rng.choice(ids)
+        condition = rng.choice(('above', 'below'))
+        alarm = {
+            'id': str(i),
+            'crypto_id': crypto_id,
+            'crypto_name': crypto_id,
+            'crypto_symbol': crypto_id.upper(),
+            'condition': condition,
+            'created_at': created,
+            'triggered': False,
+        }
+        if mixed and i % 4 == 3:
+            alarm.update(type='from_created', percent=round(rng.uniform(0.5, 30), 1),
+                         base_price=base[crypto_id])
+        else:
+            factor = rng.uniform(1.0, 1.5) if condition == 'above' else rng.uniform(0.5, 1.0)
+            alarm['target_price'] = base[crypto_id] * factor
+        alarms.append(alarm)
+    prices = {crypto_id: {'usd': price * rng.uniform(0.98, 1.02)} for crypto_id, price in base.items()}
+    return alarms, prices
+
+
+def price_info(crypto_id, jitter=0.0):
+    """/simple/price satırı (24s değişim ve market cap ile)"""
+    price = coin_price(crypto_id) * (1 + jitter)
+    return {
+        'usd': price,
+        'usd_24h_change': jitter * 100,
+        'usd_market_cap': price * 1e7,
+    }
@@ -0,0 +1,205 @@
+"""Yerel coin kataloğu ve bellek içi önek indeksi.
+
+Katalog /coins/list (tüm id, ad ve semboller) ile /coins/markets'in ilk
+sayfalarından (market cap sırası ve logo) oluşturulur ve diskte bir
+anlık görüntü olarak saklanır. Arama ağa gitmeden, ad/sembol/id
+kelimeleri üzerinde sıralı token dizisinde bisect ile yapılır; sonuçlar
+market_cap_rank'e göre top-k seçilir.
+"""
+import bisect
+import heapq
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from rate_limiter import PRIORITY_SEARCH
+
+
+CATALOG_FILE = 'coin_catalog.json'
+REFRESH_INTERVAL = 24 * 3600  # saniye
+RANKED_PAGES = 4  # 4 x 250 = ilk 1000 coin için sıra ve logo
+
+# Bu uzunluğa kadarki tek kelimelik önekler için önceden hesaplanan sonuç sayısı
+PREFIX_CACHE_LEN = 4
+TOP_K = 25
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_SPLIT = re.compile(r'[\s\-_./()]+')
+
+
+def tokenize(text):
+    return [token for token in _TOKEN_SPLIT.split(text.lower()) if token]
+
+
+class CoinCatalog:
+    """Ağsız, milisaniye altı coin araması"""
+
+    def __init__(self, provider, path=CATALOG_FILE):
+        self.provider = provider
+        self.path = path
+        self.updated_at = 0
+        self._lock = threading.Lock()
+        self._coins = []
+        self._coin_tokens = []
+        self._exact = {}
+        self._top_prefix = {}
+        # Sıralı token listesi ve paralel coin index listesi
+        self._tokens = []
+        self._token_starts = [0]
+        self._token_coins = []
+        self._refresh_thread = None
+        self.load()
+
+    def is_ready(self):
+        return bool(self._coins)
+
+    def load(self):
+        """Diskteki anlık görüntüyü yükle"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return False
+        self._build(snapshot.get('coins', []), snapshot.get('updated_at', 0))
+        return True
+
+    def _build(self, coins, updated_at):
+        # Coinler sıraya göre dizilir: küçük index = yüksek market cap
+        coins = sorted(coins, key=lambda c: (c.get('market_cap_rank') or float('inf'), len(c['name'])))
+        pairs = []
+        coin_tokens = []
+        exact = {}
+        for index, coin in enumerate(coins):
+            tokens = set(tokenize(coin['name']))
+            tokens.update(tokenize(coin['id']))
+            tokens.add(coin['symbol'].lower())
+            coin_tokens.append(tuple(tokens))
+            pairs.extend((token, index) for token in tokens)
+            for key in {coin['symbol'].lower(), coin['id'], coin['name'].lower()}:
+                exact.setdefault(key, []).append(index)
+        pairs.sort()
+
+        # Kısa önekler için ilk TOP_K sonuç önceden hesaplanır; bunlar en
+        # geniş aralıklara düşen ve en sık yazılan sorgulardır
+        top_prefix = {}
+        for token, index in sorted(pairs, key=lambda pair: pair[1]):
+            for length in range(1, min(PREFIX_CACHE_LEN, len(token)) + 1):
+                top = top_prefix.setdefault(token[:length], [])
+                if len(top) < TOP_K and (not top or top[-1] != index):
+                    top.append(index)
+
+        # Her farklı token'ın coin listesi token_coins içinde artan sırada
+        # ve bitişik durur; token_starts bu blokların başlangıçlarıdır
+        tokens = []
+        token_starts = []
+        for position, (token, _) in enumerate(pairs):
+            if not tokens or tokens[-1] != token:
+                tokens.append(token)
+                token_starts.append(position)
+        token_starts.append(len(pairs))
+
+        with self._lock:
+            self._coins = coins
+            self._coin_tokens = coin_tokens
+            self._exact = exact
+            self._top_prefix = top_prefix
+            self._tokens = tokens
+            self._token_starts = token_starts
+            self._token_coins = [index for _, index in pairs]
+            self.updated_at = updated_at
+
+    def search(self, query, limit=10):
+        """Sorgudaki her kelimeyle önek eşleşen coinler, sıraya göre ilk limit tanesi"""
+        terms = tokenize(query)
+        with self._lock:
+            coins = self._coins
+            coin_tokens = self._coin_tokens
+            exact = self._exact
+            top_prefix = self._top_prefix
+            tokens = self._tokens
+            token_starts = self._token_starts
+            token_coins = self._token_coins
+        if not terms or not coins:
+            return []
+
+        if len(terms) == 1 and len(terms[0]) <= PREFIX_CACHE_LEN and limit <= TOP_K:
+            ranked = top_prefix.get(terms[0], [])
+        else:
+            # En dar aralıktan başla, diğer kelimeleri coin'in token'larında ara
+            ranges = []
+            for term in terms:
+                lo = bisect.bisect_left(tokens, term)
+                hi = bisect.bisect_left(tokens, term + '\uffff')
+                ranges.append((token_starts[hi] - token_starts[lo], lo, hi, term))
+            ranges.sort()
+            _, lo, hi, _ = ranges[0]
+            others = [term for _, _, _, term in ranges[1:]]
+
+            # Token blokları artan sırada; birleştirince sonuçlar zaten
+            # sıra düzeninde gelir ve limit dolunca durulur
+            merged = heapq.merge(*(
+                token_coins[token_starts[j]:token_starts[j + 1]] for j in range(lo, hi)
+            ))
+            ranked = []
+            for index in merged:
+                if ranked and ranked[-1] == index:
+                    continue
+                if all(any(t.startswith(o) for t in coin_tokens[index]) for o in others):
+                    ranked.append(index)
+                    if len(ranked) >= limit:
+                        break
+
+        first = exact.get(query.strip().lower(), [])
+        result = first[:limit]
+        result += [index for index in ranked if index not in result][:limit - len(result)]
+        return [coins[index] for index in result]
+
+    def refresh(self):
+        """Kataloğu API'den yeniden oluştur ve diske yaz"""
+        listed = self.provider.coins_list(priority=PRIORITY_SEARCH)
+        ranked = {}
+        for page in range(1, RANKED_PAGES + 1):
+            for market in self.provider.coins_markets(page=page, priority=PRIORITY_SEARCH):
+                ranked[market['id']] = market
+
+        coins = []
+        for item in listed:
+            market = ranked.get(item['id'], {})
+            coins.append({
+                'id': item['id'],
+                'name': item['name'],
+                'symbol': item['symbol'],
+                'market_cap_rank': market.get('market_cap_rank'),
+                'large': market.get('image', ''),
+            })
+
+        updated_at = time.time()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'updated_at': updated_at, 'coins': coins}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+        self._build(coins, updated_at)
+        logger.info("Coin kataloğu yenilendi: %d coin", len(coins))
+
+    def start_background_refresh(self, interval=REFRESH_INTERVAL):
+        """Katalog eskiyse arka planda yenile, sonra her interval saniyede bir"""
+        def refresh_loop():
+            while True:
+                age = time.time() - self.updated_at
+                if age >= interval:
+                    try:
+                        self.refresh()
+                        age = 0
+                    except Exception as e:
+                        logger.warning("Coin kataloğu yenilenemedi: %s", e)
+                        age = interval - 600  # 10 dakika sonra tekrar dene
+                time.sleep(max(60, interval - age))
+
+        if self._refresh_thread is None:
+            self._refresh_thread = threading.Thread(target=refresh_loop, daemon=True)
+            self._refresh_thread.start()
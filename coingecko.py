@@ -0,0 +1,200 @@
+"""CoinGecko ve logo istekleri için ortak HTTP istemcisi.
+
+Tüm istekler tek bir requests.Session üzerinden gider; bağlantılar
+keep-alive havuzunda tutulur, böylece her çağrı yeni bir TCP/TLS el
+sıkışması ödemez. CoinGeckoClient, providers.PriceProvider arayüzünün
+CoinGecko gerçeklemesidir. requests ilk istemci oluşturulurken içe
+aktarılır; modülü içe aktarmak açılışı yavaşlatmaz.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import metrics
+from providers import BatchResult, PriceProvider
+from rate_limiter import (
+    PRIORITY_IMAGE, PRIORITY_SEARCH, PRIORITY_WATCHLIST,
+    get_limiter, parse_retry_after,
+)
+
+
+API_BASE = "https://api.coingecko.com/api/v3"
+
+# Monitör, izleme listesi, arama ve logo thread'lerinin toplamından fazlası
+POOL_MAXSIZE = 10
+
+# (bağlantı, okuma) zaman aşımları, endpoint bazında
+TIMEOUTS = {
+    'search': (3.05, 10),
+    'price': (3.05, 10),
+    'markets': (3.05, 15),
+    'image': (3.05, 5),
+}
+
+# Öncelik verilmezse endpoint'e göre seçilir
+ENDPOINT_PRIORITY = {
+    'search': PRIORITY_SEARCH,
+    'price': PRIORITY_WATCHLIST,
+    'markets': PRIORITY_WATCHLIST,
+    'image': PRIORITY_IMAGE,
+}
+
+# 429/503 sonrası aynı isteğin yeniden deneme sayısı
+MAX_RETRIES = 3
+RETRY_STATUSES = (429, 503)
+
+# /simple/price için id parçası boyutu ve aynı anda çalışacak parça sayısı;
+# 250 id URL uzunluk sınırlarının rahatça altında kalır
+PRICE_CHUNK_SIZE = 250
+PRICE_MAX_PARALLEL = 4
+
+REQUESTS = metrics.counter('coingecko_requests_total', "Uç ve duruma göre HTTP istekleri",
+                           ('endpoint', 'status'))
+REQUEST_SECONDS = metrics.histogram('coingecko_request_seconds', "HTTP istek gecikmesi",
+                                    ('endpoint',))
+RETRIES = metrics.counter('coingecko_retries_total', "429/503 sonrası yeniden denenen istekler",
+                          ('endpoint',))
+
+
+class CoinGeckoClient(PriceProvider):
+    """Paylaşılan, bağlantı havuzlu CoinGecko istemcisi"""
+
+    name = 'coingecko'
+
+    def __init__(self, base_url=API_BASE, pool_size=POOL_MAXSIZE, limiter=None):
+        self.base_url = base_url.rstrip('/')
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.limiter = limiter or get_limiter(urlsplit(self.base_url).hostname)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+            'User-Agent': 'KriptoTakipPro/1.0',
+        })
+        self._executor = ThreadPoolExecutor(
+            max_workers=PRICE_MAX_PARALLEL, thread_name_prefix="price-chunk"
+        )
+
+    def _limiter_for(self, url):
+        if url.startswith(self.base_url):
+            return self.limiter
+        return get_limiter(urlsplit(url).hostname)
+
+    def get(self, url, params=None, endpoint='price', priority=None):
+        """Hız sınırlayıcıdan geçerek GET; 429/503'te geri çekilip tekrar dene"""
+        limiter = self._limiter_for(url)
+        if priority is None:
+            priority = ENDPOINT_PRIORITY[endpoint]
+
+        attempt = 0
+        while True:
+            limiter.acquire(priority)
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=TIMEOUTS[endpoint])
+            except Exception:
+                REQUESTS.inc(endpoint=endpoint, status='error')
+                raise
+            finally:
+                REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+            REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+            if response.status_code in RETRY_STATUSES:
+                limiter.penalize(parse_retry_after(response.headers.get('Retry-After')))
+                if attempt < MAX_RETRIES:
+                    attempt += 1
+                    RETRIES.inc(endpoint=endpoint)
+                    continue
+            else:
+                limiter.reward()
+            response.raise_for_status()
+            return response
+
+    def get_json(self, path, params=None, endpoint='price', priority=None):
+        url = f"{self.base_url}{path}"
+        return self.get(url, params=params, endpoint=endpoint, priority=priority).json()
+
+    def search(self, query):
+        """/search sonucundaki coin listesi"""
+        return self.get_json('/search', {'query': query}, endpoint='search').get('coins', [])
+
+    def coins_list(self, priority=None):
+        """/coins/list: tüm coinlerin id, sembol ve adı"""
+        return self.get_json('/coins/list', endpoint='markets', priority=priority)
+
+    def coins_markets(self, page=1, per_page=250, vs_currency='usd', priority=None):
+        """/coins/markets: market cap sırasına göre bir sayfa"""
+        params = {
+            'vs_currency': vs_currency,
+            'order': 'market_cap_desc',
+            'per_page': per_page,
+            'page': page,
+        }
+        return self.get_json('/coins/markets', params, endpoint='markets', priority=priority)
+
+    def exchange_rates(self, priority=None):
+        """/exchange_rates: para birimlerinin BTC karşılıkları"""
+        return self.get_json('/exchange_rates', endpoint='markets', priority=priority).get('rates', {})
+
+    def simple_price(self, ids, vs_currencies='usd', include_24hr_change=False,
+                     include_market_cap=False, priority=None):
+        params = {'ids': ','.join(ids), 'vs_currencies': vs_currencies}
+        if include_24hr_change:
+            params['include_24hr_change'] = 'true'
+        if include_market_cap:
+            params['include_market_cap'] = 'true'
+        return self.get_json('/simple/price', params, endpoint='price', priority=priority)
+
+    def simple_price_batched(self, ids, vs_currencies='usd', chunk_size=PRICE_CHUNK_SIZE,
+                             **kwargs):
+        """Çok sayıda id'yi parçalara bölüp paralel çek.
+
+        Başarılı parçaların sonuçları birleştirilir; başarısız parçalar
+        hatalarıyla birlikte BatchResult.failed içinde döner.
+        """
+        ids = list(dict.fromkeys(ids))
+        chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+        prices = {}
+        failed = []
+
+        if len(chunks) == 1:
+            try:
+                prices.update(self.simple_price(chunks[0], vs_currencies, **kwargs))
+            except Exception as e:
+                failed.append((chunks[0], e))
+            return BatchResult(prices, failed)
+
+        futures = [
+            (chunk, self._executor.submit(self.simple_price, chunk, vs_currencies, **kwargs))
+            for chunk in chunks
+        ]
+        for chunk, future in futures:
+            try:
+                prices.update(future.result())
+            except Exception as e:
+                failed.append((chunk, e))
+        return BatchResult(prices, failed)
+
+    def fetch_image(self, url):
+        return self.get(url, endpoint='image').content
+
+    def blocked_for(self):
+        return self.limiter.blocked_for()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Süreç genelinde paylaşılan istemci"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = CoinGeckoClient()
+        return _client
@@ -1,49 +1,241 @@
+"""Kripto Takip Pro masaüstü arayüzü.
+
+Açılışta önce pencere çizilir; ağ istemcisi, alarm motoru (depo, fiyat
+geçmişi, indeksler) ve coin kataloğu ardından arka planda yüklenir.
+requests, Pillow ve NumPy ilk kullanıldıkları yerde içe aktarılır.
+
+    python cryptopricealerts.py --profile-startup
+"""
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+import logging
+import queue
 import tkinter as tk
 from tkinter import ttk, messagebox
 import customtkinter as ctk
-import requests
-import json
 import threading
-import time
-import subprocess
-import platform
 from datetime import datetime
-from PIL import Image, ImageTk
-import io
+from collections import OrderedDict
 from typing import Dict, List, Optional
-import webbrowser
 
+from alarm_engine import (
+    EVENT_ALARMS, EVENT_TRIGGERED, EVENT_WATCHLIST, AlarmEngine, batch_message, format_money,
+    format_price, target_text,
+)
+import metrics
+from alarm_types import TYPE_FROM_CREATED, TYPE_PRICE, TYPE_WINDOW, alarm_currency, alarm_type
+from coin_catalog import CoinCatalog
+from coingecko import get_client
+from fx_rates import CURRENCIES, currency_symbol
+from logo_cache import LogoCache
+from search_worker import SearchWorker
+from virtual_list import VirtualList
+
+IMPORTS_DONE = time.perf_counter()
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
+# Bellekte tutulan PhotoImage sayısı; fazlası diskteki önbellekten tekrar yüklenir
+MEMORY_LOGOS = 256
+
+# Arka plan thread'lerinden gelen işler tek kuyrukta; Tk thread'i bunu
+# UI_POLL_MS aralıkla, tur başına en fazla UI_DRAIN_BUDGET saniye boşaltır
+UI_POLL_MS = 50
+UI_DRAIN_BUDGET = 0.03
+
+UI_QUEUE_DEPTH = metrics.gauge('ui_queue_depth', "Tk thread'ine gönderilmiş, henüz çalışmamış işler")
+RENDER_SECONDS = metrics.histogram('ui_render_seconds', "Görünüme göre Tk çizim süresi", ('view',))
+
+
 class ModernCryptoApp:
-    def __init__(self):
+    def __init__(self, metrics_port=None, metrics_log_interval=metrics.LOG_INTERVAL,
+                 profile_startup=False, provider=None, store=None, history=None):
         
         self.root = ctk.CTk()
         self.root.title("🚀 Kripto Takip Pro")
         self.root.geometry("1400x900")
         self.root.minsize(1000, 700)
         
-        
-        self.watchlist = self.load_watchlist()
-        self.alarms = self.load_alarms()
-        self.crypto_images = {}
+        # Ağ ve veri tarafı pencere çizildikten sonra load_backend ile gelir;
+        # provider / store / history verilmezse varsayılanlar (benchmark için)
+        self.backend_options = {'provider': provider, 'store': store, 'history': history}
+        self.client = None
+        self.engine = None
+        self.logo_cache = None
+        self.catalog = None
+        self.search_worker = None
+        self.crypto_images = OrderedDict()
         self.search_results_data = []
         
         
-        self.monitoring_active = True
         self.search_after_id = None
         
+        # Tk'ye dokunan her arka plan işi bu kuyruktan, drain_ui_queue ile geçer
+        self.ui_queue = queue.Queue()
+        self.pending_events = set()
+        self.ui_poll_id = None
+        # Bildirim penceresi açıkken gelen tetiklenmeler sonraki tek özette birleşir
+        self.pending_triggers = []
+        self.trigger_summary_scheduled = False
         
-        self.current_prices = {}
+        # Açılış ölçümü: STARTED'dan itibaren geçen süreler (saniye)
+        self.profile_startup = profile_startup
+        self.startup_marks = {'imports': IMPORTS_DONE - STARTED}
         
-        self.setup_ui()
-        self.start_price_monitoring()
+        if metrics_port is not None:
+            metrics.MetricsServer(metrics_port).start()
+        if metrics_log_interval > 0:
+            metrics.start_log_reporter(metrics_log_interval)
         
+        self.setup_ui()
+        self.mark_startup('window')
+        self.show_loading(self.watchlist_container, "📊 Veriler yükleniyor...")
+        self.show_loading(self.alarms_container, "🔔 Alarmlar yükleniyor...")
+        self.ui_poll_id = self.root.after(UI_POLL_MS, self.drain_ui_queue)
+        self.root.after(0, self.on_first_paint)
+    
+    def mark_startup(self, name):
+        """Açılış aşamasını bir kez kaydet; 'interactive' ile ölçüm biter"""
+        if name in self.startup_marks:
+            return
+        self.startup_marks[name] = time.perf_counter() - STARTED
+        if name == 'interactive':
+            logging.getLogger(__name__).info(
+                "Açılış: %s", ", ".join(f"{key} {value * 1000:.0f} ms"
+                                        for key, value in self.startup_marks.items())
+            )
+            if self.profile_startup:
+                for key, value in self.startup_marks.items():
+                    print(f"{key:<14} {value * 1000:>8.1f} ms")
+                self.root.after(0, self.close)
+    
+    def on_first_paint(self):
+        """Pencere çizildi; ağır yüklemeyi arka planda başlat"""
+        self.root.update_idletasks()
+        self.mark_startup('first_paint')
+        threading.Thread(target=self.load_backend, daemon=True, name="startup").start()
+    
+    def load_backend(self):
+        """İstemci, motor (depo, geçmiş, indeksler) ve katalog; Tk thread'i dışında"""
+        try:
+            options = self.backend_options
+            client = options['provider'] or get_client()
+            engine = AlarmEngine(store=options['store'], provider=client,
+                                 history=options['history'])
+            logo_cache = LogoCache(client)
+            catalog = CoinCatalog(client)
+        except Exception as e:
+            logging.getLogger(__name__).exception("Başlatma hatası")
+            self.post_ui(self.show_error, f"Başlatma hatası: {e}")
+            return
+        self.post_ui(self.on_backend_ready, client, engine, logo_cache, catalog)
+    
+    def on_backend_ready(self, client, engine, logo_cache, catalog):
+        self.client = client
+        self.engine = engine
+        self.logo_cache = logo_cache
+        self.catalog = catalog
+        self.engine.add_listener(self.post_engine_event)
+        self.catalog.start_background_refresh()
+        # Uzak aramalar tek bir thread'de; yalnızca en son sorgunun sonucu gösterilir
+        self.search_worker = SearchWorker(
+            self.client.search,
+            on_result=lambda gen, results: self.post_ui(self.on_search_result, gen, results),
+            on_error=lambda gen, e: self.post_ui(self.on_search_error, gen, e)
+        )
+        self.mark_startup('backend')
         
-        self.refresh_watchlist()
+        self.currency_var.set(self.engine.watchlist_currency().upper())
+        self.render_stats()
         self.refresh_alarms()
+        self.refresh_watchlist()
+        self.engine.start()
+        
+        # Yükleme sırasında yazılmış bir arama varsa şimdi çalıştır
+        if len(self.search_entry.get().strip()) >= 2:
+            self.on_search_change(None)
+    
+    def show_loading(self, container, text):
+        loading_frame = ctk.CTkFrame(container.show_message(), height=60)
+        loading_frame.pack(fill="x", pady=20)
+        
+        ctk.CTkLabel(
+            loading_frame,
+            text=text,
+            font=ctk.CTkFont(size=14)
+        ).pack(pady=20)
+    
+    def post_ui(self, callback, *args):
+        """Arka plan thread'inden Tk thread'ine iş gönder; Tk'ye dokunmaz"""
+        UI_QUEUE_DEPTH.inc()
+        self.ui_queue.put((callback, args))
+    
+    def drain_ui_queue(self):
+        """Tek after döngüsü: kuyruktaki işleri süre bütçesi içinde Tk thread'inde çalıştır"""
+        # Sonraki tur önceden kurulur: bir iş modal pencere açarsa Tk'nin iç
+        # olay döngüsü kuyruğu boşaltmaya devam eder
+        self.ui_poll_id = self.root.after(UI_POLL_MS, self.drain_ui_queue)
+        deadline = time.perf_counter() + UI_DRAIN_BUDGET
+        while time.perf_counter() < deadline:
+            try:
+                callback, args = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            UI_QUEUE_DEPTH.dec()
+            try:
+                callback(*args)
+            except Exception:
+                logging.getLogger(__name__).exception("Arayüz işi başarısız: %s", callback.__name__)
+        # İş kaldıysa beklemeden devam et (tek zincir kalsın diye kurulan tur iptal edilir)
+        if not self.ui_queue.empty():
+            self.root.after_cancel(self.ui_poll_id)
+            self.ui_poll_id = self.root.after(1, self.drain_ui_queue)
+    
+    def post_engine_event(self, event, payload):
+        """Motor thread'inden: olayı UI kuyruğuna koy; bekleyen aynı yenileme tekrar eklenmez"""
+        if payload is None:
+            if event in self.pending_events:
+                return
+            self.pending_events.add(event)
+        self.post_ui(self.on_engine_event, event, payload)
+    
+    def on_engine_event(self, event, payload):
+        """Motor durumu değişti; ilgili görünümleri son anlık görüntüyle yenile"""
+        self.pending_events.discard(event)
+        if event == EVENT_ALARMS:
+            self.refresh_alarms()
+            self.watchlist_container.refresh()  # Alarm butonlarını güncelle
+            self.render_stats()
+        elif event == EVENT_WATCHLIST:
+            self.refresh_watchlist()
+            if self.search_results_data:
+                self.display_search_results()  # Ekle butonlarını güncelle
+            self.render_stats()
+        elif event == EVENT_TRIGGERED:
+            # Arayüz EVENT_ALARMS ile güncellendi; bildirim kuyruğun dışında gösterilir
+            self.pending_triggers.extend(payload)
+            if not self.trigger_summary_scheduled:
+                self.trigger_summary_scheduled = True
+                self.root.after(0, self.show_triggered_summary)
+    
+    def show_triggered_summary(self):
+        """Bekleyen tüm tetiklenmeler için tek özet; açıkken gelenler bir sonrakinde"""
+        while self.pending_triggers:
+            triggered, self.pending_triggers = self.pending_triggers, []
+            messagebox.showinfo("🔔 Alarm Tetiklendi", batch_message(triggered))
+        self.trigger_summary_scheduled = False
+    
+    @property
+    def watchlist(self):
+        return self.engine.watchlist if self.engine is not None else []
+    
+    @property
+    def alarms(self):
+        return self.engine.alarms if self.engine is not None else []
         
     def setup_ui(self):
        
@@ -111,59 +303,30 @@ class ModernCryptoApp:
         cards_frame = ctk.CTkFrame(parent, fg_color="transparent")
         cards_frame.pack(fill="both", expand=True)
         
-       
-        watchlist_card = ctk.CTkFrame(cards_frame, width=120, height=80)
-        watchlist_card.pack(side="left", padx=10)
-        watchlist_card.pack_propagate(False)
-        
-        ctk.CTkLabel(
-            watchlist_card,
-            text=str(len(self.watchlist)),
-            font=ctk.CTkFont(size=24, weight="bold"),
-            text_color="cyan"
-        ).pack(pady=(15, 0))
-        
-        ctk.CTkLabel(
-            watchlist_card,
-            text="İzlenen",
-            font=ctk.CTkFont(size=12)
-        ).pack()
-        
-        
-        active_alarms = len([a for a in self.alarms if not a.get('triggered', False)])
-        alarms_card = ctk.CTkFrame(cards_frame, width=120, height=80)
-        alarms_card.pack(side="left", padx=10)
-        alarms_card.pack_propagate(False)
-        
-        ctk.CTkLabel(
-            alarms_card,
-            text=str(active_alarms),
-            font=ctk.CTkFont(size=24, weight="bold"),
-            text_color="orange"
-        ).pack(pady=(15, 0))
-        
-        ctk.CTkLabel(
-            alarms_card,
-            text="Aktif Alarm",
-            font=ctk.CTkFont(size=12)
-        ).pack()
+        # Sayaç etiketleri render_stats ile yerinde güncellenir
+        self.stat_labels = {}
+        self.create_stat_card(cards_frame, 'watched', "İzlenen", "cyan")
+        self.create_stat_card(cards_frame, 'active', "Aktif Alarm", "orange")
+        self.create_stat_card(cards_frame, 'triggered', "Tetiklenen", "green")
+        self.render_stats()
+    
+    def create_stat_card(self, parent, key, title, color):
         
-       
-        triggered_alarms = len([a for a in self.alarms if a.get('triggered', False)])
-        triggered_card = ctk.CTkFrame(cards_frame, width=120, height=80)
-        triggered_card.pack(side="left", padx=10)
-        triggered_card.pack_propagate(False)
+        card = ctk.CTkFrame(parent, width=120, height=80)
+        card.pack(side="left", padx=10)
+        card.pack_propagate(False)
         
-        ctk.CTkLabel(
-            triggered_card,
-            text=str(triggered_alarms),
+        self.stat_labels[key] = ctk.CTkLabel(
+            card,
+            text="0",
             font=ctk.CTkFont(size=24, weight="bold"),
-            text_color="green"
-        ).pack(pady=(15, 0))
+            text_color=color
+        )
+        self.stat_labels[key].pack(pady=(15, 0))
         
         ctk.CTkLabel(
-            triggered_card,
-            text="Tetiklenen",
+            card,
+            text=title,
             font=ctk.CTkFont(size=12)
         ).pack()
         
@@ -234,8 +397,26 @@ class ModernCryptoApp:
         )
         refresh_btn.pack(side="right", pady=15, padx=(0, 20))
         
+        # Gösterim para birimi; fiyatlar yine tek istekte USD çekilir
+        self.currency_var = ctk.StringVar(value="USD")
+        currency_menu = ctk.CTkOptionMenu(
+            watchlist_header,
+            values=[currency.upper() for currency in CURRENCIES],
+            variable=self.currency_var,
+            width=80,
+            command=self.change_watchlist_currency
+        )
+        currency_menu.pack(side="right", pady=15, padx=(0, 10))
+        
        
-        self.watchlist_container = ctk.CTkScrollableFrame(watchlist_frame)
+        # Yalnızca görünen satırlar oluşturulur, kaydırdıkça yeniden kullanılır
+        self.watchlist_container = VirtualList(
+            watchlist_frame,
+            create_row=self.create_watchlist_item,
+            bind_row=self.update_watchlist_item,
+            row_height=100,
+            fg_color="transparent"
+        )
         self.watchlist_container.pack(fill="both", expand=True, padx=20, pady=20)
         
     def setup_right_panel(self, parent):
@@ -261,22 +442,36 @@ class ModernCryptoApp:
         new_alarm_btn.pack(side="right", pady=15, padx=(0, 20))
         
         
-        self.alarms_container = ctk.CTkScrollableFrame(parent)
+        self.alarms_container = VirtualList(
+            parent,
+            create_row=self.create_alarm_item,
+            bind_row=self.update_alarm_item,
+            row_height=self.alarm_row_height,
+            fg_color="transparent"
+        )
         self.alarms_container.pack(fill="both", expand=True, padx=20, pady=(0, 20))
         
     def on_search_change(self, event):
         
+        if self.catalog is None:
+            return  # açılış bitince on_backend_ready tekrar çağırır
+        
         if self.search_after_id:
             self.root.after_cancel(self.search_after_id)
         
         query = self.search_entry.get().strip()
         if len(query) >= 2:
-            self.search_after_id = self.root.after(500, lambda: self.search_crypto(query))
+            # Yerel aramada beklemeye gerek yok; API'ye düşüyorsak istekleri seyrelt
+            delay = 150 if self.catalog.is_ready() else 500
+            self.search_after_id = self.root.after(delay, lambda: self.search_crypto(query))
         else:
+            self.search_worker.cancel()
             self.clear_search_results()
     
     def manual_search(self):
        
+        if self.catalog is None:
+            return
         query = self.search_entry.get().strip()
         if len(query) >= 2:
             self.search_crypto(query)
@@ -285,23 +480,30 @@ class ModernCryptoApp:
     
     def search_crypto(self, query):
         
-        def search_thread():
-            try:
-                
-                self.root.after(0, self.show_search_loading)
-                
-                url = f"https://api.coingecko.com/api/v3/search?query={query}"
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                data = response.json()
-                
-                self.search_results_data = data.get('coins', [])[:10]
-                self.root.after(0, self.display_search_results)
-                
-            except requests.RequestException as e:
-                self.root.after(0, lambda: self.show_error(f"Arama hatası: {str(e)}"))
+        # Yerel katalog hazırsa ağa gitmeden ara
+        if self.catalog.is_ready():
+            self.search_worker.cancel()  # geç kalan uzak sonuçlar bunu ezmesin
+            self.search_results_data = self.catalog.search(query, limit=10)
+            self.display_search_results()
+            return
         
-        threading.Thread(target=search_thread, daemon=True).start()
+        self.show_search_loading()
+        self.search_worker.submit(query)
+    
+    def on_search_result(self, generation, results):
+        
+        # Bu arada yeni bir sorgu yazıldıysa eski sonucu gösterme
+        if not self.search_worker.is_current(generation):
+            return
+        self.search_results_data = results[:10]
+        self.display_search_results()
+    
+    def on_search_error(self, generation, error):
+        
+        if not self.search_worker.is_current(generation):
+            return
+        self.clear_search_results()
+        self.show_error(f"Arama hatası: {str(error)}")
     
     def show_search_loading(self):
         
@@ -367,7 +569,7 @@ class ModernCryptoApp:
         symbol_label.pack(anchor="w")
         
         
-        is_in_watchlist = any(item['id'] == crypto['id'] for item in self.watchlist)
+        is_in_watchlist = self.engine.is_watched(crypto['id'])
         
         
         if is_in_watchlist:
@@ -393,29 +595,38 @@ class ModernCryptoApp:
         
         self.load_crypto_image_async(crypto['id'], crypto.get('large', ''), logo_label)
     
-    def load_crypto_image_async(self, crypto_id, image_url, label):
+    def load_crypto_image_async(self, crypto_id, image_url, label, is_current=None):
        
-        if not image_url or crypto_id in self.crypto_images:
+        if not image_url:
+            return
+        
+        if crypto_id in self.crypto_images:
+            self.crypto_images.move_to_end(crypto_id)
+            self.update_image_label(label, self.crypto_images[crypto_id], is_current)
             return
-            
-        def load_image():
-            try:
-                response = requests.get(image_url, timeout=5)
-                response.raise_for_status()
-                
-                image = Image.open(io.BytesIO(response.content))
-                image = image.resize((30, 30), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(image)
-                
-                self.crypto_images[crypto_id] = photo
-                self.root.after(0, lambda: self.update_image_label(label, photo))
-            except:
-                pass
         
-        threading.Thread(target=load_image, daemon=True).start()
+        # Disk önbelleği / indirme havuzu; PhotoImage Tk thread'inde oluşturulur
+        self.logo_cache.request(
+            crypto_id, image_url,
+            lambda image: self.post_ui(self.show_logo, crypto_id, image, label, is_current)
+        )
     
-    def update_image_label(self, label, photo):
+    def show_logo(self, crypto_id, image, label, is_current=None):
+        
+        photo = self.crypto_images.get(crypto_id)
+        if photo is None:
+            from PIL import ImageTk
+            photo = ImageTk.PhotoImage(image)
+            self.crypto_images[crypto_id] = photo
+            if len(self.crypto_images) > MEMORY_LOGOS:
+                self.crypto_images.popitem(last=False)
+        self.update_image_label(label, photo, is_current)
+    
+    def update_image_label(self, label, photo, is_current=None):
         
+        # Havuzdaki satır bu arada başka bir kriptoya bağlanmış olabilir
+        if is_current is not None and not is_current():
+            return
         try:
             label.configure(image=photo, text="")
         except:
@@ -432,79 +643,80 @@ class ModernCryptoApp:
             'added_at': datetime.now().isoformat()
         }
         
-        self.watchlist.append(crypto_data)
-        self.save_watchlist()
-        
-        
-        self.display_search_results()  
-        self.refresh_watchlist()
-        self.update_stats()
+        # Liste, arama sonuçları ve sayaçlar EVENT_WATCHLIST ile yenilenir
+        self.engine.add_to_watchlist(crypto_data)
         
         messagebox.showinfo("Başarılı", f"✅ {crypto['name']} izleme listesine eklendi!")
     
+    def change_watchlist_currency(self, value):
+        """İzleme listesini başka para biriminde göster"""
+        if self.engine is None:
+            return
+        self.engine.set_watchlist_currency(value.lower())
+    
     def refresh_watchlist(self):
         """İzleme listesini yenile"""
-        if not self.watchlist:
+        if self.engine is None:
+            return
+        watchlist = self.watchlist
+        currency = self.engine.watchlist_currency()
+        if not watchlist:
             self.show_empty_watchlist()
+            self.mark_startup('interactive')
             return
         
-        # Loading göster
-        self.clear_watchlist()
-        loading_frame = ctk.CTkFrame(self.watchlist_container, height=60)
-        loading_frame.pack(fill="x", pady=20)
-        
-        ctk.CTkLabel(
-            loading_frame,
-            text="📊 Fiyatlar yükleniyor...",
-            font=ctk.CTkFont(size=14)
-        ).pack(pady=20)
+        # Satırlar henüz yoksa loading göster; varsa yerinde güncellenecek
+        if not self.watchlist_container.items:
+            self.show_loading(self.watchlist_container, "📊 Fiyatlar yükleniyor...")
         
         def load_watchlist_data():
             try:
-                ids = ','.join([item['id'] for item in self.watchlist])
-                url = f"https://api.coingecko.com/api/v3/simple/price?ids={ids}&vs_currencies=usd&include_24hr_change=true&include_market_cap=true"
+                ids = [item['id'] for item in watchlist]
+                price_data = self.engine.prices.get_prices(ids)
+                if price_data.failed:
+                    # Alınamayan coinler listeden düşmesin; son bilinen fiyat gösterilir
+                    logging.getLogger(__name__).warning(
+                        "%d coinin fiyatı alınamadı, son bilinen fiyat gösteriliyor",
+                        len(price_data.failed))
+                    for coin_id in price_data.failed:
+                        last = self.engine.prices.peek(coin_id)
+                        if last:
+                            price_data[coin_id] = last
+                price_data = self.engine.convert_prices(price_data, {currency})
                 
-                response = requests.get(url, timeout=15)
-                response.raise_for_status()
-                price_data = response.json()
+                self.post_ui(self.display_watchlist, price_data)
                 
-                self.current_prices = price_data
-                self.root.after(0, lambda: self.display_watchlist(price_data))
-                
-            except requests.RequestException as e:
-                self.root.after(0, lambda: self.show_watchlist_error(str(e)))
+            except Exception as e:
+                self.post_ui(self.show_watchlist_error, str(e))
         
         threading.Thread(target=load_watchlist_data, daemon=True).start()
     
     def display_watchlist(self, price_data):
-        """İzleme listesini göster"""
-        self.clear_watchlist()
-        
-        for crypto in self.watchlist:
-            if crypto['id'] in price_data:
-                self.create_watchlist_item(crypto, price_data[crypto['id']])
+        """İzleme listesini göster; görünen satırlar yerinde güncellenir"""
+        with RENDER_SECONDS.time(view='watchlist'):
+            self.watchlist_container.clear_message()
+            self.watchlist_container.set_items([
+                (crypto, price_data[crypto['id']])
+                for crypto in self.watchlist
+                if crypto['id'] in price_data
+            ])
+        self.mark_startup('interactive')
     
-    def create_watchlist_item(self, crypto, price_info):
-        """Geliştirilmiş izleme listesi öğesi"""
-        price = price_info.get('usd', 0)
-        change_24h = price_info.get('usd_24h_change', 0)
-        market_cap = price_info.get('usd_market_cap', 0)
+    def create_watchlist_item(self, parent):
+        """Geliştirilmiş izleme listesi satırı (boş oluşturulur, sonra bağlanır)"""
+        row = {'crypto': None, 'price': 0, 'values': {}}
         
-        item_frame = ctk.CTkFrame(self.watchlist_container, height=90)
-        item_frame.pack(fill="x", pady=5)
+        item_frame = ctk.CTkFrame(parent, height=90)
         item_frame.pack_propagate(False)
+        row['frame'] = item_frame
         
         # Logo
         logo_frame = ctk.CTkFrame(item_frame, width=60, height=60, corner_radius=30)
         logo_frame.pack(side="left", padx=20, pady=15)
         logo_frame.pack_propagate(False)
         
-        if crypto['id'] in self.crypto_images:
-            logo_label = ctk.CTkLabel(logo_frame, image=self.crypto_images[crypto['id']], text="")
-        else:
-            logo_label = ctk.CTkLabel(logo_frame, text="📈", font=ctk.CTkFont(size=24))
-            self.load_crypto_image_async(crypto['id'], crypto['image'], logo_label)
-        logo_label.pack(expand=True)
+        row['logo_label'] = ctk.CTkLabel(logo_frame, text="📈", font=ctk.CTkFont(size=24))
+        row['logo_label'].pack(expand=True)
         
         # Bilgiler
         info_frame = ctk.CTkFrame(item_frame, fg_color="transparent")
@@ -513,83 +725,74 @@ class ModernCryptoApp:
         name_symbol_frame = ctk.CTkFrame(info_frame, fg_color="transparent")
         name_symbol_frame.pack(fill="x")
         
-        name_label = ctk.CTkLabel(
+        row['name_label'] = ctk.CTkLabel(
             name_symbol_frame,
-            text=crypto['name'],
+            text="",
             font=ctk.CTkFont(size=16, weight="bold")
         )
-        name_label.pack(side="left")
+        row['name_label'].pack(side="left")
         
-        symbol_label = ctk.CTkLabel(
+        row['symbol_label'] = ctk.CTkLabel(
             name_symbol_frame,
-            text=f"({crypto['symbol']})",
+            text="",
             font=ctk.CTkFont(size=12),
             text_color=("gray50", "gray50")
         )
-        symbol_label.pack(side="left", padx=(10, 0))
-        
-        if crypto.get('market_cap_rank'):
-            rank_label = ctk.CTkLabel(
-                name_symbol_frame,
-                text=f"#{crypto['market_cap_rank']}",
-                font=ctk.CTkFont(size=10, weight="bold"),
-                text_color="orange"
-            )
-            rank_label.pack(side="right")
+        row['symbol_label'].pack(side="left", padx=(10, 0))
+        
+        row['rank_label'] = ctk.CTkLabel(
+            name_symbol_frame,
+            text="",
+            font=ctk.CTkFont(size=10, weight="bold"),
+            text_color="orange"
+        )
+        row['rank_label'].pack(side="right")
         
         # Alt bilgiler
         details_frame = ctk.CTkFrame(info_frame, fg_color="transparent")
         details_frame.pack(fill="x", pady=(10, 0))
         
-        if market_cap > 0:
-            mc_text = self.format_market_cap(market_cap)
-            mc_label = ctk.CTkLabel(
-                details_frame,
-                text=f"Market Cap: {mc_text}",
-                font=ctk.CTkFont(size=10),
-                text_color=("gray60", "gray40")
-            )
-            mc_label.pack(side="left")
+        row['mc_label'] = ctk.CTkLabel(
+            details_frame,
+            text="",
+            font=ctk.CTkFont(size=10),
+            text_color=("gray60", "gray40")
+        )
+        row['mc_label'].pack(side="left")
         
         # Fiyat bilgileri (sağ taraf)
         price_frame = ctk.CTkFrame(item_frame, fg_color="transparent", width=200)
         price_frame.pack(side="right", padx=20, pady=15)
         price_frame.pack_propagate(False)
         
-        price_label = ctk.CTkLabel(
+        row['price_label'] = ctk.CTkLabel(
             price_frame,
-            text=f"${self.format_price(price)}",
+            text="",
             font=ctk.CTkFont(size=18, weight="bold")
         )
-        price_label.pack(anchor="e")
+        row['price_label'].pack(anchor="e")
         
         # Değişim oranı
-        change_color = "green" if change_24h >= 0 else "red"
-        change_symbol = "↗" if change_24h >= 0 else "↘"
-        change_label = ctk.CTkLabel(
+        row['change_label'] = ctk.CTkLabel(
             price_frame,
-            text=f"{change_symbol} {abs(change_24h):.2f}%",
-            font=ctk.CTkFont(size=12, weight="bold"),
-            text_color=change_color
+            text="",
+            font=ctk.CTkFont(size=12, weight="bold")
         )
-        change_label.pack(anchor="e", pady=(5, 0))
+        row['change_label'].pack(anchor="e", pady=(5, 0))
         
         # Butonlar
         buttons_frame = ctk.CTkFrame(price_frame, fg_color="transparent")
         buttons_frame.pack(anchor="e", pady=(10, 0))
         
         # Alarm butonu
-        has_alarm = self.has_active_alarm(crypto['id'])
-        alarm_btn = ctk.CTkButton(
+        row['alarm_btn'] = ctk.CTkButton(
             buttons_frame,
             text="🔔",
             width=40,
             height=30,
-            fg_color="orange" if has_alarm else ("gray50", "gray30"),
-            hover_color="darkorange" if has_alarm else ("gray40", "gray40"),
-            command=lambda: self.create_alarm_for_crypto(crypto, price)
+            command=lambda: self.create_alarm_for_crypto(row['crypto'], row['price'])
         )
-        alarm_btn.pack(side="left", padx=2)
+        row['alarm_btn'].pack(side="left", padx=2)
         
         # Silme butonu
         delete_btn = ctk.CTkButton(
@@ -599,35 +802,95 @@ class ModernCryptoApp:
             height=30,
             fg_color="red",
             hover_color="darkred",
-            command=lambda: self.remove_from_watchlist(crypto)
+            command=lambda: self.remove_from_watchlist(row['crypto'])
         )
         delete_btn.pack(side="left", padx=2)
+        
+        return row
     
-    def format_price(self, price):
-        """Fiyat formatlama"""
-        if price >= 1:
-            return f"{price:,.2f}"
+    def update_watchlist_item(self, row, item):
+        """Satırı (crypto, price_info) öğesine bağla; yalnızca değişen etiketleri güncelle"""
+        crypto, price_info = item
+        if row['crypto'] is None or row['crypto']['id'] != crypto['id']:
+            self.bind_watchlist_crypto(row, crypto)
+        row['crypto'] = crypto
+        
+        # Kur henüz yoksa USD gösterilir
+        currency = self.engine.watchlist_currency()
+        if currency not in price_info:
+            currency = 'usd'
+        price = price_info.get(currency, 0)
+        change_24h = price_info.get(f'{currency}_24h_change') or 0
+        market_cap = price_info.get(f'{currency}_market_cap') or 0
+        # Alarm diyaloğu USD fiyatla açılır, gerekirse kendisi çevirir
+        row['price'] = price_info.get('usd', 0)
+        
+        values = row['values']
+        
+        price_text = format_money(price, currency)
+        if values.get('price') != price_text:
+            row['price_label'].configure(text=price_text)
+            values['price'] = price_text
+        
+        change_symbol = "↗" if change_24h >= 0 else "↘"
+        change_text = f"{change_symbol} {abs(change_24h):.2f}%"
+        if values.get('change') != change_text:
+            row['change_label'].configure(
+                text=change_text,
+                text_color="green" if change_24h >= 0 else "red"
+            )
+            values['change'] = change_text
+        
+        mc_text = f"Market Cap: {self.format_market_cap(market_cap, currency)}" if market_cap > 0 else ""
+        if values.get('market_cap') != mc_text:
+            row['mc_label'].configure(text=mc_text)
+            values['market_cap'] = mc_text
+        
+        has_alarm = self.has_active_alarm(crypto['id'])
+        if values.get('has_alarm') != has_alarm:
+            row['alarm_btn'].configure(
+                fg_color="orange" if has_alarm else ("gray50", "gray30"),
+                hover_color="darkorange" if has_alarm else ("gray40", "gray40")
+            )
+            values['has_alarm'] = has_alarm
+    
+    def bind_watchlist_crypto(self, row, crypto):
+        """Havuzdaki satırı başka bir kriptoya bağla"""
+        row['name_label'].configure(text=crypto['name'])
+        row['symbol_label'].configure(text=f"({crypto['symbol']})")
+        rank = crypto.get('market_cap_rank')
+        row['rank_label'].configure(text=f"#{rank}" if rank else "")
+        
+        logo_label = row['logo_label']
+        if crypto['id'] in self.crypto_images:
+            logo_label.configure(image=self.crypto_images[crypto['id']], text="")
         else:
-            return f"{price:.6f}".rstrip('0').rstrip('.')
+            logo_label.configure(image=None, text="📈")
+            self.load_crypto_image_async(
+                crypto['id'], crypto['image'], logo_label,
+                is_current=lambda: row['crypto'] is not None and row['crypto']['id'] == crypto['id']
+            )
+    
+    def format_price(self, price, currency='usd'):
+        """Fiyat formatlama"""
+        return format_price(price, currency)
     
-    def format_market_cap(self, market_cap):
+    def format_market_cap(self, market_cap, currency='usd'):
         """Market cap formatlama"""
+        symbol = currency_symbol(currency)
         if market_cap >= 1e12:
-            return f"${market_cap/1e12:.2f}T"
+            return f"{symbol}{market_cap/1e12:.2f}T"
         elif market_cap >= 1e9:
-            return f"${market_cap/1e9:.2f}B"
+            return f"{symbol}{market_cap/1e9:.2f}B"
         elif market_cap >= 1e6:
-            return f"${market_cap/1e6:.2f}M"
+            return f"{symbol}{market_cap/1e6:.2f}M"
         else:
-            return f"${market_cap:,.0f}"
+            return f"{symbol}{market_cap:,.0f}"
     
     def remove_from_watchlist(self, crypto):
         """İzleme listesinden kaldır"""
         if messagebox.askyesno("Onay", f"{crypto['name']} izleme listesinden kaldırılsın mı?"):
-            self.watchlist = [item for item in self.watchlist if item['id'] != crypto['id']]
-            self.save_watchlist()
-            self.refresh_watchlist()
-            self.update_stats()
+            self.engine.remove_from_watchlist(crypto['id'])
     
     def create_alarm_for_crypto(self, crypto, current_price):
         """Kripto için alarm oluştur"""
@@ -663,7 +926,7 @@ class ModernCryptoApp:
         crypto_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
         for crypto in self.watchlist:
-            current_price = self.current_prices.get(crypto['id'], {}).get('usd', 0)
+            current_price = self.engine.prices.price(crypto['id'])
             
             item_frame = ctk.CTkFrame(crypto_frame)
             item_frame.pack(fill="x", pady=5)
@@ -681,7 +944,7 @@ class ModernCryptoApp:
             if current_price > 0:
                 ctk.CTkLabel(
                     info_frame,
-                    text=f"Güncel: ${self.format_price(current_price)}",
+                    text=f"Güncel: {format_money(current_price)}",
                     font=ctk.CTkFont(size=12),
                     text_color=("gray50", "gray50")
                 ).pack(anchor="w")
@@ -701,10 +964,10 @@ class ModernCryptoApp:
         self.show_alarm_dialog(crypto, current_price)
     
     def show_alarm_dialog(self, crypto, current_price):
-        """Alarm oluşturma dialog'u"""
+        """Alarm oluşturma dialog'u; current_price USD'dir"""
         dialog = ctk.CTkToplevel(self.root)
         dialog.title(f"🔔 {crypto['name']} Alarm Kur")
-        dialog.geometry("450x400")
+        dialog.geometry("450x670")
         dialog.transient(self.root)
         dialog.grab_set()
         
@@ -736,23 +999,61 @@ class ModernCryptoApp:
             font=ctk.CTkFont(size=14, weight="bold")
         ).pack(pady=(15, 5))
         
-        ctk.CTkLabel(
+        current_label = ctk.CTkLabel(
             current_frame,
-            text=f"${self.format_price(current_price) if current_price > 0 else 'Yüklenemedi'}",
+            text="",
             font=ctk.CTkFont(size=24, weight="bold"),
             text_color="cyan"
-        ).pack(pady=(0, 15))
+        )
+        current_label.pack(pady=(0, 15))
         
         # Form alanları
         form_frame = ctk.CTkFrame(main_frame)
         form_frame.pack(fill="x", pady=(0, 20))
         
-        # Hedef fiyat
-        ctk.CTkLabel(
+        # Alarmın para birimi; değerlendirme bu para biriminde yapılır
+        currency_var = ctk.StringVar(
+            value=crypto.get('currency', self.engine.watchlist_currency()).upper())
+        ctk.CTkSegmentedButton(
+            form_frame,
+            values=[currency.upper() for currency in CURRENCIES],
+            variable=currency_var,
+            command=lambda _: update_form()
+        ).pack(pady=(15, 0))
+        
+        def local_price():
+            # Güncel fiyatın seçili para birimindeki karşılığı; kur yoksa None
+            if current_price <= 0:
+                return None
+            return self.engine.fx.convert(current_price, currency_var.get().lower())
+        
+        # Alarm türü
+        type_var = ctk.StringVar(value=TYPE_PRICE)
+        
+        type_frame = ctk.CTkFrame(form_frame, fg_color="transparent")
+        type_frame.pack(pady=(15, 5))
+        
+        for value, text in (
+            (TYPE_PRICE, "🎯 Hedef fiyat"),
+            (TYPE_FROM_CREATED, "📊 Şimdiki fiyattan % değişim"),
+            (TYPE_WINDOW, "⏱️ Belirli sürede % değişim"),
+        ):
+            ctk.CTkRadioButton(
+                type_frame,
+                text=text,
+                variable=type_var,
+                value=value,
+                font=ctk.CTkFont(size=12),
+                command=lambda: update_form()
+            ).pack(anchor="w", pady=3)
+        
+        # Hedef fiyat / yüzde
+        value_label = ctk.CTkLabel(
             form_frame,
             text="Hedef Fiyat ($)",
             font=ctk.CTkFont(size=14, weight="bold")
-        ).pack(pady=(20, 5))
+        )
+        value_label.pack(pady=(10, 5))
         
         price_entry = ctk.CTkEntry(
             form_frame,
@@ -760,14 +1061,30 @@ class ModernCryptoApp:
             font=ctk.CTkFont(size=16),
             height=40
         )
-        price_entry.pack(pady=(0, 15), padx=20, fill="x")
+        price_entry.pack(pady=(0, 10), padx=20, fill="x")
         
-        # Koşul seçimi
+        # Süre (yalnızca zaman aralığı alarmında görünür)
+        window_frame = ctk.CTkFrame(form_frame, fg_color="transparent")
         ctk.CTkLabel(
+            window_frame,
+            text="Süre (dakika)",
+            font=ctk.CTkFont(size=14, weight="bold")
+        ).pack(pady=(0, 5))
+        window_entry = ctk.CTkEntry(
+            window_frame,
+            placeholder_text="15",
+            font=ctk.CTkFont(size=16),
+            height=40
+        )
+        window_entry.pack(padx=20, fill="x")
+        
+        # Koşul seçimi
+        condition_title = ctk.CTkLabel(
             form_frame,
             text="Alarm Koşulu",
             font=ctk.CTkFont(size=14, weight="bold")
-        ).pack(pady=(10, 5))
+        )
+        condition_title.pack(pady=(10, 5))
         
         condition_var = ctk.StringVar(value="above")
         
@@ -792,53 +1109,103 @@ class ModernCryptoApp:
         )
         below_radio.pack(pady=5)
         
+        either_radio = ctk.CTkRadioButton(
+            condition_frame,
+            text="↕️ Fiyat herhangi bir yönde değiştiğinde",
+            variable=condition_var,
+            value="either",
+            font=ctk.CTkFont(size=12)
+        )
+        
+        def update_form():
+            # Türe ve para birimine göre alan başlıklarını ve seçenekleri değiştir
+            kind = type_var.get()
+            currency = currency_var.get().lower()
+            price = local_price()
+            current_label.configure(
+                text=format_money(price, currency) if price is not None else "Yüklenemedi"
+            )
+            if kind == TYPE_PRICE:
+                value_label.configure(text=f"Hedef Fiyat ({currency_symbol(currency).strip()})")
+                price_entry.configure(placeholder_text="0.00")
+                above_radio.configure(text="🔺 Fiyat hedefin üstüne çıktığında")
+                below_radio.configure(text="🔻 Fiyat hedefin altına indiğinde")
+                either_radio.pack_forget()
+                if condition_var.get() == "either":
+                    condition_var.set("above")
+            else:
+                value_label.configure(text="Değişim (%)")
+                price_entry.configure(placeholder_text="5")
+                above_radio.configure(text="🔺 Fiyat yükseldiğinde")
+                below_radio.configure(text="🔻 Fiyat düştüğünde")
+                either_radio.pack(pady=5)
+            
+            if kind == TYPE_WINDOW:
+                window_frame.pack(pady=(0, 10), fill="x", before=condition_title)
+            else:
+                window_frame.pack_forget()
+        
         # Butonlar
         button_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
         button_frame.pack(fill="x", pady=(10, 0))
         
         def create_alarm():
             try:
-                target_price = float(price_entry.get().replace(',', ''))
-                if target_price <= 0:
-                    raise ValueError("Fiyat 0'dan büyük olmalı")
-                
-                # Aynı kripto için aynı fiyat ve koşulda alarm var mı kontrol et
-                existing_alarm = any(
-                    alarm['crypto_id'] == crypto['id'] and 
-                    alarm['target_price'] == target_price and 
-                    alarm['condition'] == condition_var.get() and
-                    not alarm.get('triggered', False)
-                    for alarm in self.alarms
-                )
-                
-                if existing_alarm:
-                    messagebox.showwarning("Uyarı", "Bu kripto para için aynı fiyat ve koşulda zaten bir alarm mevcut!")
-                    return
+                kind = type_var.get()
+                currency = currency_var.get().lower()
+                value = float(price_entry.get().replace(',', ''))
+                if value <= 0:
+                    raise ValueError("Değer 0'dan büyük olmalı")
                 
                 alarm = {
                     'id': str(int(time.time() * 1000)),  # Unique ID
                     'crypto_id': crypto['id'],
                     'crypto_name': crypto['name'],
                     'crypto_symbol': crypto['symbol'],
-                    'target_price': target_price,
+                    'type': kind,
+                    'currency': currency,
                     'condition': condition_var.get(),
                     'created_at': datetime.now().isoformat(),
                     'triggered': False
                 }
                 
-                self.alarms.append(alarm)
-                self.save_alarms()
+                if kind == TYPE_PRICE:
+                    alarm['target_price'] = value
+                else:
+                    base_price = local_price()
+                    if base_price is None:
+                        messagebox.showerror("Hata", "Güncel fiyat yüklenemediği için yüzde alarmı kurulamaz!")
+                        return
+                    alarm['percent'] = value
+                    alarm['base_price'] = base_price
+                    if kind == TYPE_WINDOW:
+                        alarm['window_minutes'] = int(window_entry.get() or 15)
+                        if alarm['window_minutes'] <= 0:
+                            raise ValueError("Süre 0'dan büyük olmalı")
+                
+                # Aynı kripto için aynı hedef ve koşulda alarm var mı kontrol et
+                key_fields = ('condition', 'target_price', 'percent', 'window_minutes')
+                existing_alarm = any(
+                    existing['crypto_id'] == crypto['id'] and
+                    alarm_type(existing) == kind and
+                    alarm_currency(existing) == currency and
+                    all(existing.get(field) == alarm.get(field) for field in key_fields) and
+                    not existing.get('triggered', False)
+                    for existing in self.alarms
+                )
+                
+                if existing_alarm:
+                    messagebox.showwarning("Uyarı", "Bu kripto para için aynı hedef ve koşulda zaten bir alarm mevcut!")
+                    return
+                
+                # Alarm listesi, butonlar ve sayaçlar EVENT_ALARMS ile güncellenir
+                self.engine.add_alarm(alarm)
                 
                 dialog.destroy()
                 messagebox.showinfo("Başarılı", f"✅ {crypto['name']} için alarm kuruldu!")
                 
-                # UI'yi güncelle
-                self.refresh_alarms()
-                self.refresh_watchlist()  # Alarm butonunu güncelle
-                self.update_stats()
-                
             except ValueError:
-                messagebox.showerror("Hata", "Lütfen geçerli bir fiyat değeri girin!")
+                messagebox.showerror("Hata", "Lütfen geçerli bir değer girin!")
             except Exception as e:
                 messagebox.showerror("Hata", f"Alarm oluşturulurken hata: {str(e)}")
         
@@ -860,57 +1227,58 @@ class ModernCryptoApp:
         )
         create_btn.pack(side="right")
         
+        update_form()
+        
         # Focus'u price entry'ye ver
         price_entry.focus()
     
     def has_active_alarm(self, crypto_id):
         """Aktif alarm kontrolü"""
-        return any(
-            alarm['crypto_id'] == crypto_id and not alarm.get('triggered', False) 
-            for alarm in self.alarms
-        )
+        return self.engine.has_active_alarm(crypto_id)
     
     def refresh_alarms(self):
         """Alarmları yenile"""
-        self.clear_alarms()
-        
-        if not self.alarms:
+        alarms = self.alarms
+        if not alarms:
             self.show_empty_alarms()
             return
         
-        # Aktif alarmları önce göster
-        active_alarms = [a for a in self.alarms if not a.get('triggered', False)]
-        triggered_alarms = [a for a in self.alarms if a.get('triggered', False)]
+        # Aktif alarmları önce göster (tek anlık görüntüden)
+        active_alarms = [alarm for alarm in alarms if not alarm.get('triggered', False)]
+        triggered_alarms = [alarm for alarm in alarms if alarm.get('triggered', False)]
         
+        items = []
         if active_alarms:
-            active_title = ctk.CTkLabel(
-                self.alarms_container,
-                text="🟢 Aktif Alarmlar",
-                font=ctk.CTkFont(size=16, weight="bold"),
-                text_color="green"
-            )
-            active_title.pack(pady=(10, 15))
-            
-            for alarm in active_alarms:
-                self.create_alarm_item(alarm, is_active=True)
-        
+            items.append(('header', "🟢 Aktif Alarmlar", "green"))
+            items.extend(('alarm', alarm, True) for alarm in active_alarms)
         if triggered_alarms:
-            triggered_title = ctk.CTkLabel(
-                self.alarms_container,
-                text="🔴 Tetiklenen Alarmlar",
-                font=ctk.CTkFont(size=16, weight="bold"),
-                text_color="red"
-            )
-            triggered_title.pack(pady=(20, 15))
-            
-            for alarm in triggered_alarms:
-                self.create_alarm_item(alarm, is_active=False)
+            items.append(('header', "🔴 Tetiklenen Alarmlar", "red"))
+            items.extend(('alarm', alarm, False) for alarm in triggered_alarms)
+        
+        with RENDER_SECONDS.time(view='alarms'):
+            self.alarms_container.clear_message()
+            self.alarms_container.set_items(items)
     
-    def create_alarm_item(self, alarm, is_active=True):
-        """Alarm öğesi oluştur"""
-        item_frame = ctk.CTkFrame(self.alarms_container, height=100)
-        item_frame.pack(fill="x", pady=5)
+    def alarm_row_height(self, item):
+        return 50 if item[0] == 'header' else 110
+    
+    def create_alarm_item(self, parent):
+        """Alarm satırı oluştur (başlık ya da alarm olarak bağlanabilir)"""
+        row = {'alarm': None}
+        
+        row_frame = ctk.CTkFrame(parent, fg_color="transparent")
+        row['frame'] = row_frame
+        
+        # Bölüm başlığı
+        row['header_label'] = ctk.CTkLabel(
+            row_frame,
+            text="",
+            font=ctk.CTkFont(size=16, weight="bold")
+        )
+        
+        item_frame = ctk.CTkFrame(row_frame, height=100)
         item_frame.pack_propagate(False)
+        row['item_frame'] = item_frame
         
         # Sol kısım - Bilgiler
         info_frame = ctk.CTkFrame(item_frame, fg_color="transparent")
@@ -920,70 +1288,98 @@ class ModernCryptoApp:
         name_frame = ctk.CTkFrame(info_frame, fg_color="transparent")
         name_frame.pack(fill="x")
         
-        name_label = ctk.CTkLabel(
+        row['name_label'] = ctk.CTkLabel(
             name_frame,
-            text=f"{alarm['crypto_name']} ({alarm['crypto_symbol']})",
+            text="",
             font=ctk.CTkFont(size=14, weight="bold")
         )
-        name_label.pack(side="left")
+        row['name_label'].pack(side="left")
         
-        status_emoji = "🟢" if is_active else "🔴"
-        status_label = ctk.CTkLabel(
+        row['status_label'] = ctk.CTkLabel(
             name_frame,
-            text=status_emoji,
+            text="",
             font=ctk.CTkFont(size=16)
         )
-        status_label.pack(side="right")
+        row['status_label'].pack(side="right")
         
         # Alarm detayları
-        condition_text = "üstüne çık" if alarm['condition'] == 'above' else "altına in"
-        detail_text = f"Hedef: ${self.format_price(alarm['target_price'])} ({condition_text})"
-        
-        detail_label = ctk.CTkLabel(
+        row['detail_label'] = ctk.CTkLabel(
             info_frame,
-            text=detail_text,
+            text="",
             font=ctk.CTkFont(size=12),
             text_color=("gray60", "gray40")
         )
-        detail_label.pack(anchor="w", pady=(5, 0))
+        row['detail_label'].pack(anchor="w", pady=(5, 0))
         
         # Oluşturma tarihi
-        created_date = datetime.fromisoformat(alarm['created_at']).strftime("%d.%m.%Y %H:%M")
-        date_label = ctk.CTkLabel(
+        row['date_label'] = ctk.CTkLabel(
             info_frame,
-            text=f"Oluşturulma: {created_date}",
+            text="",
             font=ctk.CTkFont(size=10),
             text_color=("gray50", "gray50")
         )
-        date_label.pack(anchor="w", pady=(5, 0))
+        row['date_label'].pack(anchor="w", pady=(5, 0))
         
         # Sağ kısım - Butonlar
         buttons_frame = ctk.CTkFrame(item_frame, fg_color="transparent")
         buttons_frame.pack(side="right", padx=15, pady=15)
         
-        if is_active:
-            # Düzenleme butonu
-            edit_btn = ctk.CTkButton(
-                buttons_frame,
-                text="✏️",
-                width=40,
-                height=30,
-                fg_color=("gray50", "gray30"),
-                command=lambda: self.edit_alarm(alarm)
-            )
-            edit_btn.pack(pady=2)
+        # Düzenleme butonu (yalnızca aktif alarmlarda görünür)
+        row['edit_btn'] = ctk.CTkButton(
+            buttons_frame,
+            text="✏️",
+            width=40,
+            height=30,
+            fg_color=("gray50", "gray30"),
+            command=lambda: self.edit_alarm(row['alarm'])
+        )
         
         # Silme butonu
-        delete_btn = ctk.CTkButton(
+        row['delete_btn'] = ctk.CTkButton(
             buttons_frame,
             text="🗑️",
             width=40,
             height=30,
             fg_color="red",
             hover_color="darkred",
-            command=lambda: self.delete_alarm(alarm['id'])
+            command=lambda: self.delete_alarm(row['alarm']['id'])
         )
-        delete_btn.pack(pady=2)
+        row['delete_btn'].pack(side="bottom", pady=2)
+        
+        return row
+    
+    def update_alarm_item(self, row, item):
+        """Havuzdaki satırı bir başlığa ya da alarma bağla"""
+        if item[0] == 'header':
+            _, text, color = item
+            row['alarm'] = None
+            row['item_frame'].pack_forget()
+            row['header_label'].configure(text=text, text_color=color)
+            row['header_label'].pack(fill="both", expand=True)
+            return
+        
+        _, alarm, is_active = item
+        row['alarm'] = alarm
+        row['header_label'].pack_forget()
+        row['item_frame'].pack(fill="both", expand=True)
+        
+        row['name_label'].configure(text=f"{alarm['crypto_name']} ({alarm['crypto_symbol']})")
+        row['status_label'].configure(text="🟢" if is_active else "🔴")
+        
+        if alarm_type(alarm) == TYPE_PRICE:
+            condition_text = "üstüne çık" if alarm['condition'] == 'above' else "altına in"
+            detail = f"Hedef: {target_text(alarm)} ({condition_text})"
+        else:
+            detail = f"Hedef: {target_text(alarm)}"
+        row['detail_label'].configure(text=detail)
+        
+        created_date = datetime.fromisoformat(alarm['created_at']).strftime("%d.%m.%Y %H:%M")
+        row['date_label'].configure(text=f"Oluşturulma: {created_date}")
+        
+        if is_active:
+            row['edit_btn'].pack(side="top", pady=2)
+        else:
+            row['edit_btn'].pack_forget()
     
     def edit_alarm(self, alarm):
         """Alarm düzenle"""
@@ -991,122 +1387,36 @@ class ModernCryptoApp:
         crypto_data = {
             'id': alarm['crypto_id'],
             'name': alarm['crypto_name'], 
-            'symbol': alarm['crypto_symbol']
+            'symbol': alarm['crypto_symbol'],
+            'currency': alarm_currency(alarm)
         }
         
-        current_price = self.current_prices.get(alarm['crypto_id'], {}).get('usd', 0)
+        current_price = self.engine.prices.price(alarm['crypto_id'])
         
         # Önce eski alarmı sil
-        self.alarms = [a for a in self.alarms if a['id'] != alarm['id']]
-        self.save_alarms()
+        self.engine.remove_alarm(alarm['id'])
         
         # Yeni alarm dialog'unu aç
         self.show_alarm_dialog(crypto_data, current_price)
     
     def delete_alarm(self, alarm_id):
         """Alarm sil"""
-        alarm = next((a for a in self.alarms if a['id'] == alarm_id), None)
+        alarm = self.engine.find_alarm(alarm_id)
         if not alarm:
             return
             
         if messagebox.askyesno("Onay", f"'{alarm['crypto_name']}' alarmını silmek istediğinizden emin misiniz?"):
-            self.alarms = [a for a in self.alarms if a['id'] != alarm_id]
-            self.save_alarms()
-            self.refresh_alarms()
-            self.refresh_watchlist()  # Alarm butonlarını güncelle
-            self.update_stats()
+            self.engine.remove_alarm(alarm_id)
             messagebox.showinfo("Başarılı", "Alarm silindi!")
     
-    def start_price_monitoring(self):
-        """Fiyat takibini başlat"""
-        def monitor_prices():
-            while self.monitoring_active:
-                try:
-                    self.check_alarms()
-                    time.sleep(30)  # 30 saniyede bir kontrol
-                except Exception as e:
-                    print(f"Monitoring error: {e}")
-                    time.sleep(60)
-        
-        threading.Thread(target=monitor_prices, daemon=True).start()
-    
-    def check_alarms(self):
-        """Alarmları kontrol et"""
-        active_alarms = [a for a in self.alarms if not a.get('triggered', False)]
-        if not active_alarms:
+    def render_stats(self):
+        """Sayaç kartlarını motorun tuttuğu toplamlarla güncelle"""
+        if self.engine is None:
             return
-        
-        try:
-            crypto_ids = list(set(alarm['crypto_id'] for alarm in active_alarms))
-            ids_str = ','.join(crypto_ids)
-            
-            url = f"https://api.coingecko.com/api/v3/simple/price?ids={ids_str}&vs_currencies=usd"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            price_data = response.json()
-            
-            for alarm in active_alarms:
-                crypto_price = price_data.get(alarm['crypto_id'], {}).get('usd')
-                if not crypto_price:
-                    continue
-                
-                should_trigger = False
-                if alarm['condition'] == 'above' and crypto_price >= alarm['target_price']:
-                    should_trigger = True
-                elif alarm['condition'] == 'below' and crypto_price <= alarm['target_price']:
-                    should_trigger = True
-                
-                if should_trigger:
-                    alarm['triggered'] = True
-                    alarm['triggered_at'] = datetime.now().isoformat()
-                    alarm['triggered_price'] = crypto_price
-                    self.save_alarms()
-                    
-                    # Bildirimler
-                    self.play_notification_sound(alarm['condition'] == 'above')
-                    
-                    condition_text = "hedefin üstüne çıktı" if alarm['condition'] == 'above' else "hedefin altına indi"
-                    message = (f"🔔 ALARM TETİKLENDİ!\n\n"
-                              f"{alarm['crypto_name']} {condition_text}!\n\n"
-                              f"Hedef Fiyat: ${self.format_price(alarm['target_price'])}\n"
-                              f"Güncel Fiyat: ${self.format_price(crypto_price)}")
-                    
-                    self.root.after(0, lambda m=message: messagebox.showinfo("🔔 Alarm Tetiklendi", m))
-                    self.root.after(0, self.refresh_alarms)
-                    self.root.after(0, self.update_stats)
-                    
-        except Exception as e:
-            print(f"Alarm check error: {e}")
-    
-    def play_notification_sound(self, is_positive=True):
-        """Cross-platform bildirim sesi"""
-        try:
-            system = platform.system()
-            
-            if system == "Darwin":  # macOS
-                sound_file = "/System/Library/Sounds/Glass.aiff" if is_positive else "/System/Library/Sounds/Basso.aiff"
-                subprocess.run(["afplay", sound_file], check=False)
-                
-            elif system == "Windows":
-                import winsound
-                if is_positive:
-                    winsound.Beep(1000, 300)
-                else:
-                    winsound.Beep(500, 300)
-                    
-            elif system == "Linux":
-                subprocess.run(["paplay", "/usr/share/sounds/alsa/Front_Left.wav"], check=False)
-                
-        except Exception as e:
-            print(f"Ses çalma hatası: {e}")
-            try:
-                print("\a")  # Terminal bell
-            except:
-                pass
-    
-    def update_stats(self):
-        """İstatistikleri güncelle"""
-        self.root.after(0, self.setup_ui)  # Header'ı yenile
+        for key, value in self.engine.get_stats().items():
+            label = self.stat_labels.get(key)
+            if label is not None and label.cget("text") != str(value):
+                label.configure(text=str(value))
     
     # Yardımcı metodlar
     def clear_search_results(self):
@@ -1114,16 +1424,15 @@ class ModernCryptoApp:
             widget.destroy()
     
     def clear_watchlist(self):
-        for widget in self.watchlist_container.winfo_children():
-            widget.destroy()
+        self.watchlist_container.clear_message()
+        self.watchlist_container.set_items([])
     
     def clear_alarms(self):
-        for widget in self.alarms_container.winfo_children():
-            widget.destroy()
+        self.alarms_container.clear_message()
+        self.alarms_container.set_items([])
     
     def show_empty_watchlist(self):
-        self.clear_watchlist()
-        empty_frame = ctk.CTkFrame(self.watchlist_container, height=200)
+        empty_frame = ctk.CTkFrame(self.watchlist_container.show_message(), height=200)
         empty_frame.pack(fill="both", expand=True, pady=50)
         
         ctk.CTkLabel(
@@ -1146,8 +1455,7 @@ class ModernCryptoApp:
         ).pack()
     
     def show_empty_alarms(self):
-        self.clear_alarms()
-        empty_frame = ctk.CTkFrame(self.alarms_container, height=200)
+        empty_frame = ctk.CTkFrame(self.alarms_container.show_message(), height=200)
         empty_frame.pack(fill="both", expand=True, pady=50)
         
         ctk.CTkLabel(
@@ -1173,8 +1481,8 @@ class ModernCryptoApp:
         messagebox.showerror("Hata", message)
     
     def show_watchlist_error(self, error_msg):
-        self.clear_watchlist()
-        error_frame = ctk.CTkFrame(self.watchlist_container, height=100)
+        self.mark_startup('interactive')
+        error_frame = ctk.CTkFrame(self.watchlist_container.show_message(), height=100)
         error_frame.pack(fill="x", pady=20)
         
         ctk.CTkLabel(
@@ -1191,42 +1499,14 @@ class ModernCryptoApp:
             text_color=("gray50", "gray50")
         ).pack(pady=(0, 20))
     
-    # Veri saklama metodları
-    def load_watchlist(self):
-        try:
-            with open('crypto_watchlist.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return []
-    
-    def save_watchlist(self):
-        try:
-            with open('crypto_watchlist.json', 'w', encoding='utf-8') as f:
-                json.dump(self.watchlist, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Watchlist save error: {e}")
-    
-    def load_alarms(self):
-        try:
-            with open('crypto_alarms.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return []
-    
-    def save_alarms(self):
-        try:
-            with open('crypto_alarms.json', 'w', encoding='utf-8') as f:
-                json.dump(self.alarms, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Alarms save error: {e}")
+    def close(self):
+        if self.engine is not None:
+            self.engine.stop()
+        self.root.destroy()
     
     def run(self):
         """Uygulamayı başlat"""
-        def on_closing():
-            self.monitoring_active = False
-            self.root.destroy()
-        
-        self.root.protocol("WM_DELETE_WINDOW", on_closing)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
         
         # Pencere icon'u (isteğe bağlı)
         try:
@@ -1236,6 +1516,26 @@ class ModernCryptoApp:
         
         self.root.mainloop()
 
-if __name__ == "__main__":
-    app = ModernCryptoApp()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kripto Takip Pro")
+    parser.add_argument("--metrics-port", type=int,
+                        help="Prometheus metriklerini bu porttan sun (127.0.0.1)")
+    parser.add_argument("--metrics-log-interval", type=float, default=metrics.LOG_INTERVAL,
+                        help="metrik özetini log'a yazma aralığı (saniye, 0 kapalı)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="import, ilk çizim ve etkileşime hazır olma sürelerini yazıp çık")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=args.log_level.upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    
+    app = ModernCryptoApp(metrics_port=args.metrics_port,
+                          metrics_log_interval=args.metrics_log_interval,
+                          profile_startup=args.profile_startup)
     app.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Döviz kuru önbelleği ve USD fiyatlarından diğer para birimlerine çevrim.
+
+Coin fiyatları her zaman tek istekte USD olarak çekilir; EUR, TRY, BTC gibi
+para birimlerindeki karşılıklar /exchange_rates'ten alınan ve kendi
+takviminde yenilenen kurlarla hesaplanır. Yeni bir para birimi eklemek
+fiyat isteklerinin sayısını artırmaz.
+"""
+import logging
+import threading
+import time
+
+from rate_limiter import PRIORITY_WATCHLIST
+
+
+BASE_CURRENCY = 'usd'
+CURRENCIES = ('usd', 'eur', 'try', 'btc')
+CURRENCY_SYMBOLS = {'usd': '$', 'eur': '€', 'try': '₺', 'btc': '₿'}
+
+REFRESH_INTERVAL = 600  # saniye
+RETRY_INTERVAL = 60  # başarısız çekimden sonra bu süre yeniden denenmez
+FIRST_LOAD_WAIT = 10  # ensure() arka plandaki ilk yüklemeyi en fazla bu kadar bekler
+
+logger = logging.getLogger(__name__)
+
+
+def currency_symbol(currency):
+    return CURRENCY_SYMBOLS.get(currency, currency.upper() + " ")
+
+
+class FxRates:
+    """/exchange_rates önbelleği; kurlar BTC karşılığı olarak tutulur"""
+
+    def __init__(self, provider, interval=REFRESH_INTERVAL):
+        self.provider = provider
+        self.interval = interval
+        self.updated_at = 0
+        self.failed_at = None  # son başarısız çekim (monotonic)
+        self._rates = {}
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+        self._first_attempt = threading.Event()
+
+    def refresh(self):
+        try:
+            rates = self.provider.exchange_rates(priority=PRIORITY_WATCHLIST)
+        except Exception:
+            self.failed_at = time.monotonic()
+            raise
+        finally:
+            self._first_attempt.set()
+        values = {currency: info['value'] for currency, info in rates.items() if info.get('value')}
+        with self._lock:
+            self._rates = values
+            self.updated_at = time.time()
+            self.failed_at = None
+        logger.debug("Döviz kurları yenilendi: %d para birimi", len(values))
+
+    def ensure(self):
+        """Kurlar hiç yüklenmediyse yükle.
+
+        Arka plan yenilemesi çalışıyorsa istek atılmaz, yalnızca ilk
+        yüklemesi beklenir. Aksi halde başarısız bir çekimden sonra
+        RETRY_INTERVAL boyunca yeniden denenmez; her yoklama ya da akış
+        fiyatı ayrı bir /exchange_rates isteği yapmaz.
+        """
+        if self._rates:
+            return
+        if self._refresh_thread is not None:
+            self._first_attempt.wait(FIRST_LOAD_WAIT)
+            return
+        if self.failed_at is not None and time.monotonic() - self.failed_at < RETRY_INTERVAL:
+            return
+        self.refresh()
+
+    def rate(self, currency, base=BASE_CURRENCY):
+        """1 birim base'in currency karşılığı; kur yoksa None (istek atmaz)"""
+        if currency == base:
+            return 1.0
+        with self._lock:
+            target = self._rates.get(currency)
+            source = self._rates.get(base)
+        if not target or not source:
+            return None
+        return target / source
+
+    def convert(self, amount, currency, base=BASE_CURRENCY):
+        rate = self.rate(currency, base)
+        return None if rate is None else amount * rate
+
+    def expand(self, price_data, currencies, base=BASE_CURRENCY):
+        """USD fiyat bilgilerine istenen para birimlerindeki karşılıklarını ekle.
+
+        24 saatlik değişim yüzdesi olduğu gibi kopyalanır (kur hareketi
+        yok sayılır); market cap kurla çevrilir.
+        """
+        rates = {c: self.rate(c, base) for c in currencies if c != base}
+        rates = {c: r for c, r in rates.items() if r is not None}
+        if not rates:
+            return price_data
+
+        expanded = {}
+        for crypto_id, info in price_data.items():
+            price = (info or {}).get(base)
+            if not price:
+                expanded[crypto_id] = info
+                continue
+            info = dict(info)
+            for currency, rate in rates.items():
+                info[currency] = price * rate
+                if f"{base}_24h_change" in info:
+                    info[f"{currency}_24h_change"] = info[f"{base}_24h_change"]
+                if info.get(f"{base}_market_cap"):
+                    info[f"{currency}_market_cap"] = info[f"{base}_market_cap"] * rate
+            expanded[crypto_id] = info
+        return expanded
+
+    def start_background_refresh(self):
+        """Kurları her interval saniyede bir arka planda yenile"""
+        def refresh_loop():
+            while True:
+                try:
+                    self.refresh()
+                    delay = self.interval
+                except Exception as e:
+                    logger.warning("Döviz kurları yenilenemedi: %s", e)
+                    delay = RETRY_INTERVAL
+                time.sleep(delay)
+
+        if self._refresh_thread is None:
+            self._refresh_thread = threading.Thread(target=refresh_loop, daemon=True,
+                                                    name="fx-refresh")
+            self._refresh_thread.start()
@@ -0,0 +1,138 @@
+"""Diskte kalıcı, boyut sınırlı (LRU) logo önbelleği.
+
+Logolar 30x30 PNG olarak, coin id ve URL'den türetilen adla saklanır;
+uygulama yeniden başladığında tekrar indirilmez. İndirmeler sabit
+boyutlu bir thread havuzunda yapılır ve aynı logo için gelen eşzamanlı
+istekler tek indirmede birleştirilir. Pillow ilk logo okunurken içe
+aktarılır.
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+CACHE_DIR = 'logo_cache'
+LOGO_SIZE = (30, 30)
+MAX_BYTES = 20 * 1024 * 1024
+WORKERS = 4
+
+logger = logging.getLogger(__name__)
+
+
+class LogoCache:
+    """Küçük resim önbelleği; callback(image) havuz thread'inden çağrılır"""
+
+    def __init__(self, client, directory=CACHE_DIR, max_bytes=MAX_BYTES, workers=WORKERS):
+        self.client = client
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # dosya adı -> boyut; en eski kullanılan başta
+        self._files = OrderedDict()
+        self._total = 0
+        # dosya adı -> bekleyen callback listesi
+        self._pending = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="logo")
+        self._scan()
+
+    def _scan(self):
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith('.png'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self._total += size
+
+    @staticmethod
+    def filename(coin_id, url):
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+        safe_id = re.sub(r'[^a-z0-9_-]', '_', coin_id.lower())[:48]
+        return f"{safe_id}-{digest}.png"
+
+    def request(self, coin_id, url, callback):
+        """Logoyu diskten ya da ağdan yükle; hazır olunca callback(image)"""
+        name = self.filename(coin_id, url)
+        with self._lock:
+            waiters = self._pending.get(name)
+            if waiters is not None:
+                waiters.append(callback)
+                return
+            self._pending[name] = [callback]
+        self._executor.submit(self._load, name, url)
+
+    def _load(self, name, url):
+        try:
+            image = self._read(name) or self._download(name, url)
+        except Exception as e:
+            logger.debug("Logo yüklenemedi (%s): %s", url, e)
+            image = None
+
+        with self._lock:
+            callbacks = self._pending.pop(name, [])
+        if image is None:
+            return
+        for callback in callbacks:
+            try:
+                callback(image)
+            except Exception as e:
+                logger.debug("Logo geri çağırma hatası: %s", e)
+
+    def _read(self, name):
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            if name not in self._files:
+                return None
+            self._files.move_to_end(name)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._total -= self._files.pop(name, 0)
+            return None
+        from PIL import Image
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        return image
+
+    def _download(self, name, url):
+        from PIL import Image
+        content = self.client.fetch_image(url)
+        image = Image.open(io.BytesIO(content)).convert('RGBA')
+        image = image.resize(LOGO_SIZE, Image.Resampling.LANCZOS)
+
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG', optimize=True)
+        data = buffer.getvalue()
+
+        path = os.path.join(self.directory, name)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total += len(data) - self._files.pop(name, 0)
+            self._files[name] = len(data)
+            self._evict()
+        return image
+
+    def _evict(self):
+        """Boyut sınırı aşıldıysa en eski kullanılan dosyaları sil"""
+        while self._total > self.max_bytes and len(self._files) > 1:
+            name, size = self._files.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
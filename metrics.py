@@ -0,0 +1,289 @@
+"""Süreç içi metrik kaydı: sayaçlar, göstergeler ve histogramlar.
+
+Metrikler modül düzeyindeki REGISTRY'de tutulur ve Prometheus metin
+biçiminde dışa verilir:
+
+    python -m alarm_engine --metrics-port 9108
+    curl http://127.0.0.1:9108/metrics
+
+Arayüz kullanıcıları için start_log_reporter() aynı verilerin kısa bir
+özetini belirli aralıklarla log'a yazar. Yalnızca standart kütüphane
+kullanılır.
+"""
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Saniye cinsinden varsayılan histogram sınırları (1 ms .. 30 s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LOG_INTERVAL = 60  # saniye
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{value}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} için beklenen etiketler {self.label_names}, gelen {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """Yalnızca artan sayaç"""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def total(self):
+        with self._lock:
+            return sum(self._values.values())
+
+
+class Gauge(_Metric):
+    """Anlık değer (kuyruk derinliği gibi)"""
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def total(self):
+        with self._lock:
+            return sum(self._values.values())
+
+
+class Histogram(_Metric):
+    """Sınırlı kovalı dağılım; her etiket seti için [kovalar, toplam, adet]"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """with bloğunun süresini gözlemle (hata olsa da)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def summary(self):
+        """Tüm etiketler üzerinden (adet, ortalama)"""
+        with self._lock:
+            count = sum(state[2] for state in self._values.values())
+            total = sum(state[1] for state in self._values.values())
+        return count, (total / count if count else 0.0)
+
+    def _render_sample(self, key, state):
+        counts, total, count = state
+        lines = []
+        cumulative = 0
+        for bound, bucket in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket
+            labels = _format_labels(self.label_names, key, [('le', _format_value(float(bound)))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.label_names, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Metriklerin adla tutulduğu kayıt; aynı ad tekrar istenirse aynı metrik döner"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _get(self, cls, name, help_text, labels, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labels, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name} metriği zaten {metric.kind} olarak kayıtlı")
+            return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text, labels=()):
+        return self._get(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help_text, labels, buckets=buckets)
+
+    def metrics(self):
+        with self._lock:
+            return list(self._metrics.values())
+
+    def render(self):
+        """Prometheus metin biçimi"""
+        lines = []
+        for metric in self.metrics():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Tek satırlık özet: sayaç toplamları ve histogram adet / ortalamaları"""
+        parts = []
+        for metric in self.metrics():
+            if isinstance(metric, Counter):
+                parts.append(f"{metric.name}={metric.total():g}")
+            elif isinstance(metric, Histogram):
+                count, mean = metric.summary()
+                if count:
+                    parts.append(f"{metric.name}={count}x{mean * 1000:.1f}ms")
+            else:
+                value = metric.total()
+                if value:
+                    parts.append(f"{metric.name}={value:g}")
+        return " ".join(parts)
+
+
+REGISTRY = Registry()
+
+
+def counter(name, help_text, labels=()):
+    return REGISTRY.counter(name, help_text, labels)
+
+
+def gauge(name, help_text, labels=()):
+    return REGISTRY.gauge(name, help_text, labels)
+
+
+def histogram(name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.histogram(name, help_text, labels, buckets)
+
+
+class MetricsServer:
+    """/metrics adresinde Prometheus metin biçimi sunan yerel HTTP sunucusu"""
+
+    def __init__(self, port, host='127.0.0.1', registry=REGISTRY):
+        # Sunucu istenmedikçe http.server içe aktarılmaz (açılış süresi)
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug("metrik sunucusu: " + format, *args)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True,
+                                        name="metrics-http")
+        self._thread.start()
+        logger.info("Metrikler %s adresinde sunuluyor", self.url)
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def start_log_reporter(interval=LOG_INTERVAL, registry=REGISTRY):
+    """Metrik özetini her interval saniyede bir INFO olarak log'a yaz"""
+    def report_loop():
+        while True:
+            time.sleep(interval)
+            summary = registry.summary()
+            if summary:
+                logger.info("metrikler: %s", summary)
+
+    thread = threading.Thread(target=report_loop, daemon=True, name="metrics-log")
+    thread.start()
+    return thread
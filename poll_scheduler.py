@@ -0,0 +1,167 @@
+"""Eşiğe yakınlık ve oynaklığa göre coin başına yoklama zamanlayıcısı.
+
+Her coin'in bir sonraki yoklama zamanı bir heap'te tutulur. Aralık, fiyatın
+en yakın aktif eşiğe göreli uzaklığı d ve oynaklığı σ (saniye başına log
+getiri standart sapması, EWMA) ile hesaplanır: fiyatın SIGMAS standart
+sapmalık bir hareketle eşiğe varabileceği süre
+
+    aralık = (d / (SIGMAS * σ)) ** 2
+
+[min_interval, max_interval] aralığına sıkıştırılır. Vadesi gelen coinler,
+yakında vadesi gelecek olanlarla birlikte tek toplu istekte çekilir;
+istekler arasında dakikalık bütçeden türetilen en kısa süre beklenir.
+"""
+import heapq
+import math
+import threading
+import time
+
+
+MIN_INTERVAL = 5  # saniye
+MAX_INTERVAL = 300
+SIGMAS = 4
+EWMA_ALPHA = 0.2
+# Günlük ~%4 oynaklık, saniye başına: 0.04 / sqrt(86400)
+DEFAULT_SIGMA = 1.4e-4
+MIN_SIGMA = DEFAULT_SIGMA / 4
+# Vadesi bu kadar yakın olanlar aynı isteğe eklenir (aralığın oranı)
+LOOKAHEAD = 0.5
+POLL_BUDGET = 12  # dakikada en fazla toplu istek
+
+
+class PollScheduler:
+    """Coin başına vade zamanları; take() ile birlikte çekilecek coinler"""
+
+    def __init__(self, base_interval=30, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL,
+                 budget=POLL_BUDGET, history=None):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.min_gap = 60 / budget if budget else 0
+        self.history = history
+        self._lock = threading.Lock()
+        self._heap = []  # (vade, crypto_id); eskimiş kayıtlar atlanır
+        self._due = {}  # crypto_id -> (vade, aralık)
+        self._last = {}  # crypto_id -> (zaman, fiyat)
+        self._variance = {}  # crypto_id -> saniye başına log getiri varyansı (EWMA)
+        self._last_request = float('-inf')
+
+    def sync(self, crypto_ids, now=None):
+        """Yeni coinleri hemen vadeli ekle, alarmı kalmayanları çıkar"""
+        now = time.monotonic() if now is None else now
+        wanted = set(crypto_ids)
+        with self._lock:
+            for crypto_id in wanted - self._due.keys():
+                self._due[crypto_id] = (now, self.base_interval)
+                heapq.heappush(self._heap, (now, crypto_id))
+                if crypto_id not in self._variance:
+                    self._seed(crypto_id)
+            for crypto_id in self._due.keys() - wanted:
+                del self._due[crypto_id]
+                self._variance.pop(crypto_id, None)
+                self._last.pop(crypto_id, None)
+
+    def _seed(self, crypto_id):
+        """Oynaklığı varsa fiyat geçmişinden başlat"""
+        if self.history is None:
+            return
+        timestamps, prices = self.history.series(crypto_id, since=time.time() - 3600)
+        for timestamp, price in zip(timestamps, prices):
+            self._observe(crypto_id, price, timestamp)
+
+    def next_due(self):
+        """Bir sonraki istek zamanı (monotonic); coin yoksa None"""
+        with self._lock:
+            self._drop_stale()
+            if not self._heap:
+                return None
+            return max(self._heap[0][0], self._last_request + self.min_gap)
+
+    def _drop_stale(self):
+        while self._heap:
+            due, crypto_id = self._heap[0]
+            entry = self._due.get(crypto_id)
+            if entry is not None and entry[0] == due:
+                return
+            heapq.heappop(self._heap)
+
+    def take(self, now=None, limit=None):
+        """Vadesi gelmiş coinleri, yakında vadesi gelecek olanlarla birlikte al"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now or now < self._last_request + self.min_gap:
+                return []
+            taken = []
+            deferred = []
+            while self._heap and (limit is None or len(taken) < limit):
+                due, crypto_id = self._heap[0]
+                entry = self._due.get(crypto_id)
+                if entry is None or entry[0] != due:
+                    heapq.heappop(self._heap)
+                    continue
+                if due > now + LOOKAHEAD * entry[1]:
+                    # Bu coin erken; daha geç vadeliler yine de sığabilir
+                    if due > now + LOOKAHEAD * self.max_interval:
+                        break
+                    deferred.append(heapq.heappop(self._heap))
+                    continue
+                heapq.heappop(self._heap)
+                taken.append(crypto_id)
+            for item in deferred:
+                heapq.heappush(self._heap, item)
+            self._last_request = now
+            return taken
+
+    def _observe(self, crypto_id, price, timestamp):
+        last = self._last.get(crypto_id)
+        self._last[crypto_id] = (timestamp, price)
+        if last is None or timestamp <= last[0] or last[1] <= 0:
+            return
+        rate = math.log(price / last[1]) ** 2 / (timestamp - last[0])
+        previous = self._variance.get(crypto_id)
+        self._variance[crypto_id] = rate if previous is None else (
+            EWMA_ALPHA * rate + (1 - EWMA_ALPHA) * previous
+        )
+
+    def sigma(self, crypto_id):
+        variance = self._variance.get(crypto_id)
+        if variance is None:
+            return DEFAULT_SIGMA
+        return max(math.sqrt(variance), MIN_SIGMA)
+
+    def interval_for(self, crypto_id, distance):
+        """Eşiğe göreli uzaklık ve oynaklıktan yoklama aralığı"""
+        if distance is None:
+            return self.base_interval
+        interval = (distance / (SIGMAS * self.sigma(crypto_id))) ** 2
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def update(self, crypto_ids, price_data, distances, currency='usd', now=None, failed=()):
+        """Çekilen coinleri gözlemle ve yeni vadelerini hesapla.
+
+        failed: fiyat isteği başarısız olan coinler; en kısa aralıkla
+        yeniden denenir (istekler yine bütçeye göre aralıklanır).
+        """
+        now = time.monotonic() if now is None else now
+        wall = time.time()
+        with self._lock:
+            for crypto_id in crypto_ids:
+                if crypto_id not in self._due:
+                    continue
+                price = (price_data.get(crypto_id) or {}).get(currency)
+                if price:
+                    self._observe(crypto_id, price, wall)
+                    interval = self.interval_for(crypto_id, distances.get(crypto_id))
+                elif crypto_id in failed:
+                    interval = self.min_interval  # istek başarısız, eşik bilinmiyor
+                else:
+                    interval = self.base_interval  # fiyat gelmedi, normal aralıkla tekrar dene
+                due = now + interval
+                self._due[crypto_id] = (due, interval)
+                heapq.heappush(self._heap, (due, crypto_id))
+
+    def intervals(self):
+        """crypto_id -> son hesaplanan aralık (izleme ve test için)"""
+        with self._lock:
+            return {crypto_id: interval for crypto_id, (_, interval) in self._due.items()}
@@ -0,0 +1,143 @@
+"""Coin ve para birimi bazında, süreli (TTL) ortak fiyat önbelleği.
+
+İzleme listesi, alarm diyalogları ve monitör aynı önbellekten okur.
+Aynı anda istenen id'ler tek bir uçuştaki isteğe bağlanır; bekleyen tüm
+çağıranlar aynı sonucu alır. Bir PriceHistory verilirse API'den gelen her
+yeni fiyat coin'in geçmiş tamponuna da yazılır.
+
+Bazı parçalar başarısız olursa get_prices gelenleri döndürür; fiyatı
+alınamayan coinler sonucun failed alanındadır (fiyatı olmayan coinden
+ayırt edilebilsin diye).
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+
+DEFAULT_TTL = 20  # saniye
+
+logger = logging.getLogger(__name__)
+
+
+class PriceResult(dict):
+    """get_prices sonucu {id: info}; failed: fiyatı çekilemeyen {id: hata}"""
+
+    def __init__(self, prices=(), failed=None):
+        super().__init__(prices)
+        self.failed = failed or {}
+
+
+class PriceCache:
+    """(coin_id, currency) anahtarlı /simple/price önbelleği"""
+
+    def __init__(self, provider, ttl=DEFAULT_TTL, history=None):
+        self.provider = provider
+        self.ttl = ttl
+        self.history = history
+        self._lock = threading.Lock()
+        # (coin_id, currency) -> (fetched_at, info)
+        self._entries = {}
+        # (coin_id, currency) -> Future
+        self._inflight = {}
+
+    def get_prices(self, ids, currency='usd', max_age=None, priority=None):
+        """CoinGecko /simple/price biçiminde {id: info} (PriceResult) döndür.
+
+        max_age saniyeden yeni kayıtlar önbellekten gelir; eksikler tek
+        istekte çekilir, zaten uçuşta olanlar için o istek beklenir.
+        Başarısız parçaların coinleri sonucun failed alanındadır; hiçbir
+        fiyat alınamadıysa hata yükseltilir.
+        """
+        max_age = self.ttl if max_age is None else max_age
+        now = time.monotonic()
+        result = {}
+        waiting = {}
+        owned = {}
+
+        with self._lock:
+            for coin_id in dict.fromkeys(ids):
+                key = (coin_id, currency)
+                entry = self._entries.get(key)
+                if entry and now - entry[0] <= max_age:
+                    result[coin_id] = entry[1]
+                    continue
+                future = self._inflight.get(key)
+                if future is None:
+                    future = Future()
+                    self._inflight[key] = future
+                    owned[coin_id] = future
+                else:
+                    waiting[coin_id] = future
+
+        if owned:
+            # _fetch başarısız parçaları owned'dan çıkarır; hataları görmek için önce ekle
+            waiting.update(owned)
+            self._fetch(owned, currency, priority)
+
+        failed = {}
+        for coin_id, future in waiting.items():
+            try:
+                info = future.result()
+            except Exception as e:
+                failed[coin_id] = e
+                continue
+            if info is not None:
+                result[coin_id] = info
+
+        if failed and not result:
+            raise next(iter(failed.values()))
+        return PriceResult(result, failed)
+
+    def _fetch(self, owned, currency, priority=None):
+        try:
+            batch = self.provider.simple_price_batched(
+                list(owned), vs_currencies=currency, priority=priority,
+                include_24hr_change=True, include_market_cap=True,
+            )
+            failed = batch.failed
+        except Exception as e:
+            batch = None
+            failed = [(list(owned), e)]
+
+        for chunk, error in failed:
+            logger.warning("%d coinlik fiyat parçası alınamadı: %s", len(chunk), error)
+            with self._lock:
+                for coin_id in chunk:
+                    self._inflight.pop((coin_id, currency), None)
+            for coin_id in chunk:
+                owned.pop(coin_id).set_exception(error)
+
+        if batch is not None:
+            self.store(batch.prices, currency, owned)
+            self.record(batch.prices, currency)
+
+    def record(self, data, currency='usd', min_spacing=0):
+        """Fiyatları (varsa) geçmiş tamponlarına yaz; hata yalnızca log'lanır"""
+        if self.history is None:
+            return
+        try:
+            self.history.record(data, currency, min_spacing=min_spacing)
+        except Exception as e:
+            logger.warning("Fiyat geçmişine yazılamadı: %s", e)
+
+    def store(self, data, currency='usd', owned=None):
+        """Dışarıdan gelen fiyat verisini önbelleğe yaz"""
+        now = time.monotonic()
+        owned = owned or {}
+        with self._lock:
+            for coin_id, info in data.items():
+                self._entries[(coin_id, currency)] = (now, info)
+            for coin_id in owned:
+                self._inflight.pop((coin_id, currency), None)
+        for coin_id, future in owned.items():
+            future.set_result(data.get(coin_id))
+
+    def peek(self, coin_id, currency='usd'):
+        """Yaşına bakmadan son bilinen fiyat bilgisi (istek atmaz)"""
+        with self._lock:
+            entry = self._entries.get((coin_id, currency))
+        return entry[1] if entry else {}
+
+    def price(self, coin_id, currency='usd'):
+        return self.peek(coin_id, currency).get(currency, 0)
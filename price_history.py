@@ -0,0 +1,235 @@
+"""Coin başına sabit boyutlu fiyat geçmişi; bellek eşlemeli (mmap) dosyada.
+
+Her coin için (zaman, fiyat) çiftlerinden oluşan bir halka tampon tutulur.
+Dosya baştan tam boyutta ayrılır ve mmap ile açılır; yazmak yalnızca 16
+baytlık bir kaydı ve dizindeki baş/sayı alanlarını değiştirir. Veri Python
+float nesneleri yerine dosyada durur, işletim sistemi gerektikçe sayfalar.
+
+Dosya düzeni:
+    başlık  | dizin (MAX_COINS x 64 bayt) | veri (MAX_COINS x CAPACITY x 16 bayt)
+
+Dizin dolduğunda en uzun süredir yazılmayan coin'in yeri yeni coine
+verilir. Dosya bir süreçle sınırlıdır: yanındaki .lock dosyası kilitlenir;
+aynı dosyayı kullanan başka bir örnek varsa price_history-1.bin,
+price_history-2.bin, ... sırayla denenir.
+"""
+import bisect
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+
+
+HISTORY_FILE = 'price_history.bin'
+CAPACITY = 1440  # coin başına kayıt; 30 sn aralıkla 12 saat
+MAX_COINS = 8192  # seyrek dosya; yalnızca yazılan coinlerin sayfaları ayrılır
+MAX_INSTANCES = 64  # aynı anda açılabilecek geçmiş dosyası sayısı
+
+MAGIC = b'KTPH'
+VERSION = 1
+
+HEADER = struct.Struct('<4sIII')  # magic, version, capacity, max_coins
+HEADER_SIZE = 64
+SLOT = struct.Struct('<48sIId')  # coin id, head, count, son yazma zamanı
+ID_BYTES = 48
+ENTRY = struct.Struct('<dd')  # timestamp, price
+
+logger = logging.getLogger(__name__)
+
+
+def slot_key(coin_id):
+    """Dizinde saklanan anahtar; 48 bayta sığmayan id'ler kısaltılıp özetiyle ayrılır"""
+    raw = coin_id.encode('utf-8')
+    if len(raw) <= ID_BYTES:
+        return coin_id
+    digest = hashlib.blake2b(raw, digest_size=4).hexdigest()
+    # Kesim çok baytlı bir karakteri bölmesin
+    prefix = raw[:ID_BYTES - len(digest) - 1].decode('utf-8', 'ignore')
+    return f"{prefix}#{digest}"
+
+
+def _try_lock(f):
+    """Dosyayı süreçler arası, beklemeden kilitle; başkası tutuyorsa False"""
+    try:
+        import fcntl
+    except ImportError:
+        import msvcrt
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _instance_path(path, index):
+    if not index:
+        return path
+    base, ext = os.path.splitext(path)
+    return f"{base}-{index}{ext}"
+
+
+def acquire_path(path):
+    """Kilitlenebilen ilk geçmiş dosyası yolu ve açık kilit dosyası"""
+    for index in range(MAX_INSTANCES):
+        candidate = _instance_path(path, index)
+        lock_file = open(candidate + '.lock', 'a+b')
+        if _try_lock(lock_file):
+            if index:
+                logger.info("%s başka bir örnekte açık, %s kullanılıyor", path, candidate)
+            return candidate, lock_file
+        lock_file.close()
+    raise RuntimeError(f"{MAX_INSTANCES} fiyat geçmişi dosyasının hepsi kullanımda: {path}")
+
+
+class PriceHistory:
+    """mmap destekli, coin başına halka tampon"""
+
+    def __init__(self, path=HISTORY_FILE, capacity=CAPACITY, max_coins=MAX_COINS):
+        path, self._lock_file = acquire_path(path)
+        self.path = path
+        self._lock = threading.Lock()
+        # slot anahtarı -> slot; boş slotlar ve slot başına son yazma zamanı
+        self._slots = {}
+        self._free = []
+        self._written = []
+
+        exists = os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE
+        if exists:
+            with open(path, 'rb') as f:
+                magic, version, file_capacity, file_max_coins = HEADER.unpack(f.read(HEADER.size))
+            if magic == MAGIC and version == VERSION:
+                capacity, max_coins = file_capacity, file_max_coins
+            else:
+                exists = False
+
+        self.capacity = capacity
+        self.max_coins = max_coins
+        self._data_offset = HEADER_SIZE + max_coins * SLOT.size
+        size = self._data_offset + max_coins * capacity * ENTRY.size
+
+        mode = 'r+b' if exists else 'w+b'
+        self._file = open(path, mode)
+        if not exists:
+            self._file.truncate(size)  # seyrek dosya; sayfalar yazıldıkça ayrılır
+            self._file.write(HEADER.pack(MAGIC, VERSION, capacity, max_coins))
+            self._file.flush()
+        self._mm = mmap.mmap(self._file.fileno(), size)
+
+        for slot in range(max_coins):
+            raw_id, _, _, written = SLOT.unpack_from(self._mm, HEADER_SIZE + slot * SLOT.size)
+            # Eski sürümler id'yi bayt ortasından kesmiş olabilir
+            key = raw_id.rstrip(b'\0').decode('utf-8', 'ignore')
+            self._written.append(written)
+            if key and key not in self._slots:
+                self._slots[key] = slot
+            else:
+                self._free.append(slot)
+        self._free.reverse()  # pop() küçük slotları önce versin
+
+    def _slot_for(self, coin_id, create):
+        key = slot_key(coin_id)
+        slot = self._slots.get(key)
+        if slot is None and create:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                # En uzun süredir yazılmayan coin'in yerini al
+                slot = min(range(self.max_coins), key=self._written.__getitem__)
+                for old_key, old_slot in self._slots.items():
+                    if old_slot == slot:
+                        del self._slots[old_key]
+                        break
+            SLOT.pack_into(self._mm, HEADER_SIZE + slot * SLOT.size,
+                           key.encode('utf-8'), 0, 0, 0.0)
+            self._written[slot] = 0.0
+            self._slots[key] = slot
+        return slot
+
+    def append(self, coin_id, price, timestamp=None, min_spacing=0):
+        """Coin'in tamponuna bir kayıt ekle; en eski kaydın üzerine yazılır.
+
+        Son kayıt min_spacing saniyeden yeniyse yazılmaz (sık akış fiyatları
+        tamponu birkaç dakikalık veriyle doldurmasın).
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            slot = self._slot_for(coin_id, create=True)
+            slot_offset = HEADER_SIZE + slot * SLOT.size
+            raw_id, head, count, written = SLOT.unpack_from(self._mm, slot_offset)
+            if count and timestamp - written < min_spacing:
+                return False
+            entry_offset = self._data_offset + (slot * self.capacity + head) * ENTRY.size
+            ENTRY.pack_into(self._mm, entry_offset, timestamp, price)
+            SLOT.pack_into(self._mm, slot_offset, raw_id,
+                           (head + 1) % self.capacity, min(count + 1, self.capacity), timestamp)
+            self._written[slot] = timestamp
+        return True
+
+    def record(self, price_data, currency='usd', timestamp=None, min_spacing=0):
+        """/simple/price yanıtındaki tüm fiyatları kaydet"""
+        timestamp = time.time() if timestamp is None else timestamp
+        for coin_id, info in price_data.items():
+            price = info.get(currency) if info else None
+            if price:
+                self.append(coin_id, price, timestamp, min_spacing)
+
+    def series(self, coin_id, since=None):
+        """Eskiden yeniye (zamanlar, fiyatlar) olarak iki array('d')"""
+        with self._lock:
+            slot = self._slot_for(coin_id, create=False)
+            if slot is None:
+                return array('d'), array('d')
+            _, head, count, _ = SLOT.unpack_from(self._mm, HEADER_SIZE + slot * SLOT.size)
+            start = self._data_offset + slot * self.capacity * ENTRY.size
+            raw = self._mm[start:start + self.capacity * ENTRY.size]
+
+        values = array('d')
+        values.frombytes(raw)
+        # Halka tamponu düzleştir: en eski kayıt head'de (tampon dolduysa)
+        first = head if count == self.capacity else 0
+        order = values[first * 2:count * 2] + values[:first * 2] if first else values[:count * 2]
+        timestamps = order[0::2]
+        prices = order[1::2]
+        if since is not None:
+            keep = bisect.bisect_left(timestamps, since)
+            timestamps, prices = timestamps[keep:], prices[keep:]
+        return timestamps, prices
+
+    def latest(self, coin_id):
+        """Son (zaman, fiyat) kaydı ya da None"""
+        with self._lock:
+            slot = self._slot_for(coin_id, create=False)
+            if slot is None:
+                return None
+            _, head, count, _ = SLOT.unpack_from(self._mm, HEADER_SIZE + slot * SLOT.size)
+            if not count:
+                return None
+            last = (head - 1) % self.capacity
+            return ENTRY.unpack_from(
+                self._mm, self._data_offset + (slot * self.capacity + last) * ENTRY.size
+            )
+
+    def coins(self):
+        """Geçmişi olan coinlerin slot anahtarları (uzun id'ler kısaltılmış)"""
+        with self._lock:
+            return list(self._slots)
+
+    def flush(self):
+        with self._lock:
+            self._mm.flush()
+
+    def close(self):
+        with self._lock:
+            self._mm.flush()
+            self._mm.close()
+            self._file.close()
+            self._lock_file.close()
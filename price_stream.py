@@ -0,0 +1,288 @@
+"""Server-Sent Events (SSE) ile anlık fiyat akışı.
+
+Akış kaynağı her olayda /simple/price biçiminde bir JSON gönderir:
+
+    data: {"bitcoin": {"usd": 64123.5}}
+
+PriceStream bu olayları ayrı bir thread'de okuyup on_ticks(price_data)
+ile iletir; bağlantı koparsa artan beklemeyle yeniden bağlanır. Yalnızca
+standart kütüphane (http.client) kullanılır.
+
+StandInPriceServer testler (tests/test_price_stream.py) ve yerel deneme
+için aynı protokolü konuşan küçük bir sunucudur:
+
+    python -m price_stream --port 8765 --ids bitcoin,ethereum
+"""
+import argparse
+import json
+import logging
+import queue
+import random
+import socket
+import threading
+import time
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from rate_limiter import backoff_delay
+
+
+READ_TIMEOUT = 45  # saniye; sunucu bu sürede en az bir ping göndermeli
+PING_INTERVAL = 15
+RECONNECT_CAP = 30
+
+logger = logging.getLogger(__name__)
+
+
+class PriceStream:
+    """SSE istemcisi; ids() ile verilen coinlere abone olur"""
+
+    def __init__(self, url, on_ticks, ids=None, on_state=None, currency='usd'):
+        self.url = url
+        self.on_ticks = on_ticks
+        self.ids = ids or (lambda: [])
+        self.on_state = on_state
+        self.currency = currency
+        self.connected = False
+        self.subscribed = frozenset()
+        self._running = False
+        self._restart = False
+        self._sock = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True, name="price-stream")
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._running = False
+        self._close()
+
+    def reconnect(self):
+        """Abonelik listesi değişti; bağlantıyı kapatıp yeni listeyle aç"""
+        self._restart = True
+        self._close()
+
+    def _close(self):
+        with self._lock:
+            sock = self._sock
+            self._sock = None
+        if sock is not None:
+            try:
+                # Okuyan thread'i readline() içinden hemen çıkar
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _set_connected(self, connected):
+        if connected != self.connected:
+            self.connected = connected
+            logger.info("Fiyat akışı %s", "bağlandı" if connected else "koptu")
+            if self.on_state is not None:
+                self.on_state(connected)
+
+    def _run(self):
+        failures = 0
+        while self._running:
+            try:
+                self._listen()
+                failures = 0
+            except Exception as e:
+                if self._restart:
+                    failures = 0
+                else:
+                    failures += 1
+                    if self._running:
+                        logger.warning("Fiyat akışı hatası: %s", e)
+            self._restart = False
+            self._set_connected(False)
+            if self._running:
+                time.sleep(backoff_delay(failures, base=1, cap=RECONNECT_CAP) if failures else 0.1)
+
+    def _listen(self):
+        import http.client
+
+        parts = urlsplit(self.url)
+        ids = frozenset(self.ids())
+        query = parts.query
+        if ids:
+            query = "&".join(q for q in (query, urlencode({
+                'ids': ",".join(sorted(ids)),
+                'vs_currencies': self.currency,
+            })) if q)
+        path = (parts.path or "/") + (f"?{query}" if query else "")
+
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        conn = connection_class(parts.netloc, timeout=READ_TIMEOUT)
+        sock = None
+        try:
+            conn.connect()
+            # Yanıt 'Connection: close' ise http.client conn.sock'u bırakır;
+            # kapatabilmek için soketi ayrıca tut
+            sock = conn.sock
+            with self._lock:
+                self._sock = sock
+            # Soket kaydedilmeden önce gelen reconnect() kapatacak soket
+            # bulamamıştır; abonelik listesi değiştiyse yeni listeyle başla
+            if self._restart or frozenset(self.ids()) != ids:
+                return
+            conn.request("GET", path, headers={
+                'Accept': 'text/event-stream',
+                'Cache-Control': 'no-cache',
+            })
+            response = conn.getresponse()
+            if response.status != 200:
+                raise ConnectionError(f"HTTP {response.status}")
+            self.subscribed = ids
+            self._set_connected(True)
+
+            data = []
+            while self._running:
+                line = response.readline()
+                if not line:
+                    return  # sunucu bağlantıyı kapattı
+                line = line.decode('utf-8').rstrip('\r\n')
+                if not line:
+                    # Boş satır olayı bitirir
+                    if data:
+                        self._dispatch("\n".join(data))
+                        data = []
+                elif line.startswith('data:'):
+                    data.append(line[5:].lstrip())
+                # ':' ile başlayan satırlar ping; event/id/retry alanları kullanılmıyor
+        finally:
+            with self._lock:
+                if self._sock is sock:
+                    self._sock = None
+            conn.close()
+            if sock is not None:
+                sock.close()
+
+    def _dispatch(self, payload):
+        try:
+            price_data = json.loads(payload)
+        except ValueError:
+            logger.debug("Bozuk akış olayı atlandı: %r", payload)
+            return
+        if price_data:
+            self.on_ticks(price_data)
+
+
+class StandInPriceServer:
+    """Testler için yerel SSE fiyat sunucusu; publish() ile fiyat yayınla"""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self._clients = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                params = parse_qs(urlsplit(self.path).query)
+                ids = set(",".join(params.get('ids', [])).split(",")) - {""}
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.wfile.flush()
+
+                events = queue.Queue()
+                client = (ids, events)
+                with server._lock:
+                    server._clients.append(client)
+                try:
+                    while True:
+                        try:
+                            event = events.get(timeout=PING_INTERVAL)
+                        except queue.Empty:
+                            self.wfile.write(b": ping\n\n")
+                            self.wfile.flush()
+                            continue
+                        if event is None:
+                            break
+                        self.wfile.write(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+                        self.wfile.flush()
+                except OSError:
+                    pass
+                finally:
+                    with server._lock:
+                        server._clients.remove(client)
+                    self.close_connection = True
+
+            def log_message(self, format, *args):
+                logger.debug("deneme sunucusu: " + format, *args)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/stream"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.disconnect_all()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def client_count(self):
+        with self._lock:
+            return len(self._clients)
+
+    def publish(self, price_data):
+        """Fiyatları abone olan istemcilere gönder (abonelik yoksa hepsi)"""
+        with self._lock:
+            clients = list(self._clients)
+        for ids, events in clients:
+            event = {cid: info for cid, info in price_data.items() if not ids or cid in ids}
+            if event:
+                events.put(event)
+
+    def disconnect_all(self):
+        with self._lock:
+            clients = list(self._clients)
+        for _, events in clients:
+            events.put(None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m price_stream",
+        description="Rastgele yürüyüş fiyatları yayınlayan yerel SSE sunucusu",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ids", default="bitcoin,ethereum", help="virgülle ayrılmış coin id'leri")
+    parser.add_argument("--interval", type=float, default=0.5, help="yayın aralığı (saniye)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level="INFO", format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    server = StandInPriceServer(args.host, args.port).start()
+    prices = {coin_id: 100.0 for coin_id in args.ids.split(",") if coin_id}
+    logger.info("Deneme fiyat akışı %s adresinde", server.url)
+    try:
+        while True:
+            for coin_id in prices:
+                prices[coin_id] *= 1 + random.gauss(0, 0.002)
+            server.publish({coin_id: {'usd': price} for coin_id, price in prices.items()})
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
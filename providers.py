@@ -0,0 +1,266 @@
+"""Fiyat sağlayıcı arayüzü ve hedge'li (yedekli) istekler.
+
+PriceProvider arama, fiyat ve market verisi için ortak arayüzdür;
+CoinGeckoClient (coingecko.py) ilk gerçeklemesidir. HedgedProvider bir
+isteği önce birincil sağlayıcıya gönderir; birincil, kendi gecikme
+dağılımının belirli bir yüzdelik değeri içinde yanıt vermezse aynı istek
+ikincil sağlayıcıya da gönderilir ve ilk başarılı yanıt kullanılır.
+Böylece döngü süresini birincilin en yavaş yanıtları belirlemez. Parçalı
+fiyat çekiminde parçalar birlikte gönderilir ve her parça ayrı hedge'lenir.
+
+İkincil sağlayıcı aynı coin id'lerini kullanmalıdır (ör. CoinGecko Pro ya
+da bir ayna sunucu). StaticProvider testler için bellek içi bir sağlayıcıdır.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, NamedTuple, Tuple
+
+
+DEFAULT_CHUNK_SIZE = 250
+
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_DELAY = 0.05  # saniye
+HEDGE_DEFAULT_DELAY = 1.0  # yeterli ölçüm yokken
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW = 200  # işlem başına tutulan son gecikme ölçümü
+HEDGE_WORKERS = 8  # sağlayıcı başına; ikincil kendi thread'lerinde çalışır
+
+logger = logging.getLogger(__name__)
+
+
+class BatchResult(NamedTuple):
+    """Parçalı fiyat çekiminin birleşik sonucu"""
+    prices: Dict[str, dict]
+    failed: List[Tuple[List[str], Exception]]
+
+
+class PriceProvider:
+    """Arama, fiyat ve market verisi kaynağı"""
+
+    name = 'provider'
+
+    def search(self, query):
+        """/search biçiminde coin listesi"""
+        raise NotImplementedError
+
+    def simple_price(self, ids, vs_currencies='usd', include_24hr_change=False,
+                     include_market_cap=False, priority=None):
+        """/simple/price biçiminde {id: {currency: fiyat, ...}}"""
+        raise NotImplementedError
+
+    def coins_list(self, priority=None):
+        """Tüm coinlerin id, sembol ve adı"""
+        raise NotImplementedError
+
+    def coins_markets(self, page=1, per_page=250, vs_currency='usd', priority=None):
+        """Market cap sırasına göre bir sayfa"""
+        raise NotImplementedError
+
+    def exchange_rates(self, priority=None):
+        """/exchange_rates biçiminde {currency: {'value': BTC karşılığı, ...}}"""
+        raise NotImplementedError
+
+    def simple_price_batched(self, ids, vs_currencies='usd', chunk_size=DEFAULT_CHUNK_SIZE,
+                             **kwargs):
+        """Id'leri parçalara bölüp sırayla çek; başarısız parçalar failed içinde"""
+        ids = list(dict.fromkeys(ids))
+        prices = {}
+        failed = []
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            try:
+                prices.update(self.simple_price(chunk, vs_currencies, **kwargs))
+            except Exception as e:
+                failed.append((chunk, e))
+        return BatchResult(prices, failed)
+
+    def blocked_for(self):
+        """Hız sınırı nedeniyle beklenmesi gereken süre (saniye)"""
+        return 0.0
+
+
+class HedgedProvider(PriceProvider):
+    """Birincil yavaşsa aynı isteği ikinciye de gönder, ilk yanıtı kullan"""
+
+    def __init__(self, primary, secondary, percentile=HEDGE_PERCENTILE,
+                 min_delay=HEDGE_MIN_DELAY, workers=HEDGE_WORKERS):
+        self.primary = primary
+        self.secondary = secondary
+        self.name = f"{primary.name}+{secondary.name}"
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self._lock = threading.Lock()
+        # işlem adı -> birincilin son gecikmeleri
+        self._latencies = {}
+        self.stats = {'requests': 0, 'hedged': 0, 'secondary_wins': 0}
+        # Hedge isteği, aşmaya çalıştığı yavaş birincil çağrıların arkasında beklemesin
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hedge-primary")
+        self._secondary_executor = ThreadPoolExecutor(max_workers=workers,
+                                                      thread_name_prefix="hedge-secondary")
+
+    def hedge_delay(self, operation):
+        """Birincilin bu işlemdeki gecikme yüzdeliği"""
+        with self._lock:
+            samples = sorted(self._latencies.get(operation, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        index = min(len(samples) - 1, int(len(samples) * self.percentile))
+        return max(self.min_delay, samples[index])
+
+    def _record(self, operation, started, future):
+        # Geç gelen yanıtlar da sayılır; yoksa yüzdelik hep iyimser kalır
+        if future.exception() is not None:
+            return
+        with self._lock:
+            samples = self._latencies.setdefault(operation, deque(maxlen=HEDGE_WINDOW))
+            samples.append(time.monotonic() - started)
+
+    def _submit_primary(self, operation, *args, **kwargs):
+        with self._lock:
+            self.stats['requests'] += 1
+        started = time.monotonic()
+        primary = self._executor.submit(getattr(self.primary, operation), *args, **kwargs)
+        primary.add_done_callback(lambda f: self._record(operation, started, f))
+        return primary
+
+    def _submit_secondary(self, operation, *args, **kwargs):
+        with self._lock:
+            self.stats['hedged'] += 1
+        return self._secondary_executor.submit(getattr(self.secondary, operation), *args, **kwargs)
+
+    def _call(self, operation, *args, **kwargs):
+        primary = self._submit_primary(operation, *args, **kwargs)
+        done, _ = wait([primary], timeout=self.hedge_delay(operation))
+        if done and primary.exception() is None:
+            return primary.result()
+        secondary = self._submit_secondary(operation, *args, **kwargs)
+        return self._first_success(operation, primary, secondary)
+
+    def _first_success(self, operation, primary, secondary):
+        """İki isteğin ilk başarılı yanıtı; ikisi de başarısızsa son hata"""
+        pending = {primary, secondary}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is secondary:
+                        with self._lock:
+                            self.stats['secondary_wins'] += 1
+                    return future.result()
+                error = future.exception()
+                logger.debug("%s.%s başarısız: %s", self.name, operation, error)
+        raise error
+
+    def search(self, query):
+        return self._call('search', query)
+
+    def simple_price(self, ids, vs_currencies='usd', include_24hr_change=False,
+                     include_market_cap=False, priority=None):
+        return self._call('simple_price', ids, vs_currencies,
+                          include_24hr_change=include_24hr_change,
+                          include_market_cap=include_market_cap, priority=priority)
+
+    def simple_price_batched(self, ids, vs_currencies='usd', chunk_size=DEFAULT_CHUNK_SIZE,
+                             **kwargs):
+        """Parçaları birincile birlikte gönder; süresinde yanıtlanmayan her parçayı hedge'le"""
+        ids = list(dict.fromkeys(ids))
+        chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+        primaries = [self._submit_primary('simple_price', chunk, vs_currencies, **kwargs)
+                     for chunk in chunks]
+        wait(primaries, timeout=self.hedge_delay('simple_price'))
+        secondaries = [
+            None if primary.done() and primary.exception() is None
+            else self._submit_secondary('simple_price', chunk, vs_currencies, **kwargs)
+            for chunk, primary in zip(chunks, primaries)
+        ]
+
+        prices = {}
+        failed = []
+        for chunk, primary, secondary in zip(chunks, primaries, secondaries):
+            try:
+                if secondary is None:
+                    prices.update(primary.result())
+                else:
+                    prices.update(self._first_success('simple_price', primary, secondary))
+            except Exception as e:
+                failed.append((chunk, e))
+        return BatchResult(prices, failed)
+
+    def coins_list(self, priority=None):
+        return self._call('coins_list', priority=priority)
+
+    def coins_markets(self, page=1, per_page=250, vs_currency='usd', priority=None):
+        return self._call('coins_markets', page=page, per_page=per_page,
+                          vs_currency=vs_currency, priority=priority)
+
+    def exchange_rates(self, priority=None):
+        return self._call('exchange_rates', priority=priority)
+
+    def blocked_for(self):
+        # İkincil her zaman devrede olduğundan yalnızca ikisi de sınırdaysa beklenir
+        return min(self.primary.blocked_for(), self.secondary.blocked_for())
+
+
+class StaticProvider(PriceProvider):
+    """Testler için bellek içi sağlayıcı; delay sabit ya da fonksiyon olabilir"""
+
+    def __init__(self, prices=None, coins=None, rates=None, delay=0.0, error=None, name='static'):
+        self.name = name
+        # {id: {currency: fiyat, ...}}
+        self.prices = dict(prices or {})
+        # {currency: BTC karşılığı}
+        self.rates = dict(rates or {'btc': 1.0, 'usd': 60000.0, 'eur': 55000.0, 'try': 2000000.0})
+        # [{'id', 'name', 'symbol', 'market_cap_rank', 'large'}, ...]
+        self.coins = list(coins or [])
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def _wait(self):
+        self.calls += 1
+        delay = self.delay() if callable(self.delay) else self.delay
+        if delay:
+            time.sleep(delay)
+        if self.error is not None:
+            raise self.error
+
+    def set_price(self, coin_id, price, currency='usd', **extra):
+        self.prices[coin_id] = {currency: price, **extra}
+
+    def search(self, query):
+        self._wait()
+        query = query.lower()
+        return [coin for coin in self.coins
+                if query in coin['name'].lower() or query in coin['symbol'].lower()]
+
+    def simple_price(self, ids, vs_currencies='usd', include_24hr_change=False,
+                     include_market_cap=False, priority=None):
+        self._wait()
+        result = {}
+        for coin_id in ids:
+            info = self.prices.get(coin_id)
+            if info is None:
+                continue
+            result[coin_id] = {key: value for key, value in info.items()
+                               if key.split('_')[0] in vs_currencies.split(',')}
+        return result
+
+    def coins_list(self, priority=None):
+        self._wait()
+        return [{'id': c['id'], 'symbol': c['symbol'], 'name': c['name']} for c in self.coins]
+
+    def coins_markets(self, page=1, per_page=250, vs_currency='usd', priority=None):
+        self._wait()
+        ranked = sorted((c for c in self.coins if c.get('market_cap_rank')),
+                        key=lambda c: c['market_cap_rank'])
+        start = (page - 1) * per_page
+        return [{'id': c['id'], 'market_cap_rank': c['market_cap_rank'], 'image': c.get('large', '')}
+                for c in ranked[start:start + per_page]]
+
+    def exchange_rates(self, priority=None):
+        self._wait()
+        return {currency: {'value': value} for currency, value in self.rates.items()}
@@ -0,0 +1,147 @@
+"""Süreç genelinde, öncelikli token-bucket hız sınırlayıcı.
+
+Her dış istek göndermeden önce acquire() çağırır. Bekleyenler öncelik
+sırasıyla token alır; alarm kontrolleri arama ve logo isteklerinin
+önüne geçer ve onlar için birkaç token her zaman ayrılmış kalır. 429/503
+yanıtlarında Retry-After'a uyulur, yoksa jitter'lı üstel geri çekilme
+uygulanır.
+"""
+import heapq
+import itertools
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+PRIORITY_ALARM = 0
+PRIORITY_WATCHLIST = 1
+PRIORITY_SEARCH = 2
+PRIORITY_IMAGE = 3
+
+# CoinGecko ücretsiz katman: dakikada ~30 istek
+API_RATE = 0.5  # token/saniye
+API_CAPACITY = 8
+API_RESERVE = 2  # yalnızca alarm kontrollerinin kullanabileceği token
+
+# Logo CDN'i çok daha cömert; yine de patlamaları yumuşat
+CDN_RATE = 10.0
+CDN_CAPACITY = 20
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """attempt. deneme için jitter'lı üstel bekleme süresi"""
+    delay = min(cap, base * (2 ** max(attempt - 1, 0)))
+    return random.uniform(delay / 2, delay)
+
+
+def parse_retry_after(value):
+    """Retry-After başlığını saniyeye çevir (saniye veya HTTP tarihi)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimiter:
+    """Öncelik sıralı token bucket"""
+
+    def __init__(self, rate=API_RATE, capacity=API_CAPACITY, reserve=0):
+        self.rate = rate
+        self.capacity = capacity
+        self.reserve = reserve
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._failures = 0
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._seq = itertools.count()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def acquire(self, priority=PRIORITY_WATCHLIST, timeout=None):
+        """Token alana kadar bekle; zaman aşımında False döndür"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        ticket = (priority, next(self._seq))
+        floor = 0 if priority == PRIORITY_ALARM else self.reserve
+
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = None
+                    if self._waiting[0] == ticket:
+                        if now < self._blocked_until:
+                            wait = self._blocked_until - now
+                        elif self._tokens >= 1 + floor:
+                            self._tokens -= 1
+                            heapq.heappop(self._waiting)
+                            ticket = None
+                            self._cond.notify_all()
+                            return True
+                        else:
+                            wait = (1 + floor - self._tokens) / self.rate
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                if ticket is not None:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+
+    def penalize(self, retry_after=None):
+        """429/503 sonrası tüm trafiği durdur; bekleme süresini döndür"""
+        with self._cond:
+            self._failures += 1
+            delay = retry_after if retry_after is not None else backoff_delay(self._failures)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            self._tokens = 0.0
+            self._cond.notify_all()
+            return delay
+
+    def reward(self):
+        """Başarılı yanıt; geri çekilme sayacını sıfırla"""
+        with self._cond:
+            self._failures = 0
+
+    def blocked_for(self):
+        with self._cond:
+            return max(0.0, self._blocked_until - time.monotonic())
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(host):
+    """Host başına paylaşılan sınırlayıcı"""
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            if host.startswith(('api.', 'pro-api.')):
+                limiter = RateLimiter(API_RATE, API_CAPACITY, API_RESERVE)
+            else:
+                limiter = RateLimiter(CDN_RATE, CDN_CAPACITY)
+            _limiters[host] = limiter
+        return limiter
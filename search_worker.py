@@ -0,0 +1,56 @@
+"""Tek thread'li, yalnızca en son sorguyu çalıştıran arama işçisi.
+
+Her sorgu artan bir nesil (generation) numarası alır. Bekleyen bir sorgu
+yenisi gelince yerini ona bırakır; geç dönen eski bir yanıt ise nesil
+numarası eşleşmediği için sessizce atılır.
+"""
+import threading
+
+
+class SearchWorker:
+    """search(query) fonksiyonunu tek bir arka plan thread'inde çalıştırır"""
+
+    def __init__(self, search, on_result, on_error=None):
+        self.search = search
+        self.on_result = on_result
+        self.on_error = on_error
+        self.generation = 0
+        self._pending = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, query):
+        """Sorguyu kuyruğa al; bekleyen eski sorgunun yerine geçer"""
+        with self._cond:
+            self.generation += 1
+            self._pending = (self.generation, query)
+            self._cond.notify()
+            return self.generation
+
+    def cancel(self):
+        """Bekleyen ve uçuştaki aramaları geçersiz kıl"""
+        with self._cond:
+            self.generation += 1
+            self._pending = None
+
+    def is_current(self, generation):
+        return generation == self.generation
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                generation, query = self._pending
+                self._pending = None
+
+            try:
+                results = self.search(query)
+            except Exception as e:
+                if self.on_error is not None and self.is_current(generation):
+                    self.on_error(generation, e)
+                continue
+
+            if self.is_current(generation):
+                self.on_result(generation, results)
@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from alarm_engine import ALARMS_EVALUATED, AlarmEngine
+from alarm_store import JsonStore
+from price_history import PriceHistory
+from providers import BatchResult, StaticProvider
+
+
+def price_alarm(alarm_id, crypto_id, target, condition='above'):
+    return {
+        'id': alarm_id,
+        'crypto_id': crypto_id,
+        'crypto_name': crypto_id.title(),
+        'crypto_symbol': crypto_id[:3].upper(),
+        'condition': condition,
+        'target_price': target,
+        'created_at': '2024-01-01T00:00:00',
+        'triggered': False,
+    }
+
+
+class AlarmEngineTest(unittest.TestCase):
+    def setUp(self):
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir, True)
+        self.provider = StaticProvider({'bitcoin': {'usd': 100.0}, 'ethereum': {'usd': 10.0}})
+        self.store = JsonStore(os.path.join(workdir, 'alarms.json'),
+                               os.path.join(workdir, 'watchlist.json'))
+        history = PriceHistory(os.path.join(workdir, 'history.bin'))
+        self.addCleanup(history.close)
+        self.engine = AlarmEngine(store=self.store, provider=self.provider, sound=False,
+                                  history=history)
+
+    def test_check_alarms_triggers_once(self):
+        self.engine.add_alarm(price_alarm('1', 'bitcoin', 90.0))
+        self.engine.add_alarm(price_alarm('2', 'ethereum', 20.0))
+        triggered = self.engine.check_alarms()
+        self.assertEqual([alarm['id'] for alarm in triggered], ['1'])
+        self.assertEqual(self.engine.check_alarms(), [])
+        self.assertEqual(self.engine.get_stats(), {'watched': 0, 'active': 1, 'triggered': 1})
+
+    def test_snapshot_is_not_changed_by_later_commands(self):
+        self.engine.add_alarm(price_alarm('1', 'bitcoin', 90.0))
+        before = self.engine.snapshot()
+        self.engine.check_alarms()
+        self.engine.remove_alarm('1')
+        self.assertEqual(len(before.alarms), 1)
+        self.assertFalse(before.alarms[0]['triggered'])
+        self.assertEqual(self.engine.alarms, ())
+
+    def test_failed_cycle_reschedules_taken_coins(self):
+        self.engine.add_alarm(price_alarm('1', 'bitcoin', 150.0))
+        scheduler = self.engine.scheduler
+        scheduler.sync(self.engine.alarm_crypto_ids())
+        taken = scheduler.take()
+        self.assertEqual(taken, ['bitcoin'])
+        self.assertIsNone(scheduler.next_due())
+
+        def fail(price_data, source):
+            raise RuntimeError("evaluation failed")
+
+        self.engine._evaluate = fail
+        with self.assertRaises(RuntimeError):
+            self.engine.check_alarms(taken)
+        self.assertIsNotNone(scheduler.next_due())
+
+    def test_failed_fetch_reschedules_taken_coins(self):
+        self.engine.add_alarm(price_alarm('1', 'bitcoin', 150.0))
+        scheduler = self.engine.scheduler
+        scheduler.sync(self.engine.alarm_crypto_ids())
+        taken = scheduler.take()
+        self.provider.error = RuntimeError("down")
+        with self.assertRaises(RuntimeError):
+            self.engine.check_alarms(taken)
+        self.assertEqual(scheduler.intervals(), {'bitcoin': scheduler.base_interval})
+        self.assertIsNotNone(scheduler.next_due())
+
+    def test_wake_during_poll_is_not_lost(self):
+        calls = []
+
+        def poll_due():
+            calls.append(1)
+            if len(calls) == 1:
+                self.engine._wake.set()  # ör. akış yoklama sırasında koptu
+                return 300.0
+            self.engine.monitoring_active = False
+            return 0.0
+
+        self.engine.poll_due = poll_due
+        monitor = threading.Thread(target=self.engine.monitor_prices, daemon=True)
+        monitor.start()
+        monitor.join(2)
+        self.assertFalse(monitor.is_alive())
+        self.assertEqual(len(calls), 2)
+
+    def test_ticks_do_not_wait_for_exchange_rates(self):
+        alarm = price_alarm('1', 'bitcoin', 150.0)
+        alarm['currency'] = 'eur'
+        self.engine.add_alarm(alarm)
+        self.engine.fx.ensure = mock.Mock()
+        self.engine.handle_ticks({'bitcoin': {'usd': 160.0}})
+        self.engine.fx.ensure.assert_not_called()
+        # Kur yokken EUR alarmı bu fiyatla değerlendirilmez
+        self.assertFalse(self.engine.find_alarm('1')['triggered'])
+
+    def test_evaluated_counts_only_priced_coins(self):
+        self.engine.add_alarm(price_alarm('1', 'bitcoin', 150.0))
+        self.engine.add_alarm(price_alarm('2', 'bitcoin', 50.0, condition='below'))
+        self.engine.add_alarm(price_alarm('3', 'ethereum', 20.0))
+        before = ALARMS_EVALUATED.value(source='test')
+        self.engine.call(self.engine._evaluate, {'bitcoin': {'usd': 100.0}}, 'test')
+        self.assertEqual(ALARMS_EVALUATED.value(source='test') - before, 2)
+
+    def test_partially_failed_fetch_retries_failed_coins_soon(self):
+        self.engine.add_alarm(price_alarm('1', 'bitcoin', 150.0))
+        self.engine.add_alarm(price_alarm('2', 'ethereum', 20.0))
+        scheduler = self.engine.scheduler
+        scheduler.sync(self.engine.alarm_crypto_ids())
+        taken = scheduler.take()
+        error = RuntimeError("chunk failed")
+        batch = BatchResult({'bitcoin': {'usd': 100.0}}, [(['ethereum'], error)])
+        with mock.patch.object(self.provider, 'simple_price_batched', return_value=batch):
+            self.assertEqual(self.engine.check_alarms(taken), [])
+        intervals = scheduler.intervals()
+        self.assertEqual(intervals['ethereum'], scheduler.min_interval)
+        self.assertNotEqual(intervals['bitcoin'], scheduler.min_interval)
+
+
+if __name__ == "__main__":
+    unittest.main()
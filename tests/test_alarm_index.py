@@ -0,0 +1,170 @@
+"""AlarmIndex ve VectorIndex'in basit döngüyle eşdeğerliği (rastgele senaryolar)."""
+import random
+import unittest
+from unittest import mock
+
+from alarm_engine import AlarmIndex
+from vector_eval import HAVE_NUMPY
+
+if HAVE_NUMPY:
+    from vector_eval import VectorIndex
+
+COINS = [f"coin-{i}" for i in range(12)]
+CURRENCIES = ('usd', 'eur', 'try')
+BASE_PRICES = {crypto_id: 10 ** (i % 5) for i, crypto_id in enumerate(COINS)}
+
+
+def loop_evaluate(alarms, price_data):
+    """Alarm başına koşul; indekslerin uyması gereken davranış"""
+    triggered = set()
+    for alarm in alarms:
+        if alarm.get('triggered', False):
+            continue
+        price = (price_data.get(alarm['crypto_id']) or {}).get(alarm.get('currency', 'usd'))
+        if not price:
+            continue
+        condition = alarm['condition']
+        if alarm.get('type', 'price') == 'price':
+            hit = (price >= alarm['target_price'] if condition == 'above'
+                   else price <= alarm['target_price'])
+        else:
+            ratio = alarm['percent'] / 100
+            up = price >= alarm['base_price'] * (1 + ratio)
+            down = price <= alarm['base_price'] * (1 - ratio)
+            hit = {'above': up, 'below': down, 'either': up or down}[condition]
+        if hit:
+            triggered.add((alarm['id'], price))
+    return triggered
+
+
+def random_alarm(rng, alarm_id):
+    crypto_id = rng.choice(COINS)
+    currency = rng.choice(CURRENCIES)
+    base = BASE_PRICES[crypto_id] * {'usd': 1, 'eur': 0.9, 'try': 30}[currency]
+    alarm = {
+        'id': alarm_id,
+        'crypto_id': crypto_id,
+        'currency': currency,
+        'created_at': '2024-01-01T00:00:00',
+        'triggered': rng.random() < 0.05,
+    }
+    if rng.random() < 0.5:
+        alarm.update(condition=rng.choice(('above', 'below')),
+                     target_price=base * rng.uniform(0.7, 1.3))
+    else:
+        alarm.update(type='from_created', condition=rng.choice(('above', 'below', 'either')),
+                     percent=round(rng.uniform(1, 25), 1), base_price=base * rng.uniform(0.9, 1.1))
+    if currency == 'usd' and rng.random() < 0.3:
+        del alarm['currency']  # eski kayıtlar: para birimi yok, USD
+    return alarm
+
+
+def random_prices(rng):
+    """Bazı coinler ve para birimleri eksik bir anlık görüntü"""
+    price_data = {}
+    for crypto_id in COINS:
+        if rng.random() < 0.2:
+            continue
+        usd = BASE_PRICES[crypto_id] * rng.uniform(0.65, 1.35)
+        info = {'usd': usd, 'eur': usd * 0.9, 'try': usd * 30}
+        for currency in CURRENCIES:
+            if rng.random() < 0.15:
+                del info[currency]
+        price_data[crypto_id] = info
+    return price_data
+
+
+def as_set(triggered):
+    return {(alarm['id'], price) for alarm, price in triggered}
+
+
+class AlarmIndexEquivalenceTest(unittest.TestCase):
+    def index_types(self):
+        types = [AlarmIndex]
+        if HAVE_NUMPY:
+            types.append(VectorIndex)
+        return types
+
+    def check(self, index, active, rng):
+        alarms = list(active.values())
+        live = [alarm for alarm in alarms if not alarm['triggered']]
+        self.assertEqual(len(index), len(live))
+        self.assertEqual(sorted(index.crypto_ids()), sorted({a['crypto_id'] for a in live}))
+        self.assertEqual(index.currencies(), {a.get('currency', 'usd') for a in live})
+        for crypto_id in COINS:
+            self.assertEqual(index.has_alarm(crypto_id),
+                             any(a['crypto_id'] == crypto_id for a in live), crypto_id)
+        for _ in range(3):
+            price_data = random_prices(rng)
+            self.assertEqual(as_set(index.evaluate(price_data)), loop_evaluate(alarms, price_data))
+
+    def test_random_add_remove(self):
+        for index_type in self.index_types():
+            for seed in range(5):
+                with self.subTest(index=index_type.__name__, seed=seed), \
+                        mock.patch('vector_eval.MIN_CAPACITY', 8):
+                    # Küçük kapasite: vektör dizileri büyür ve sıkıştırılır
+                    rng = random.Random(seed)
+                    active = {str(i): random_alarm(rng, str(i)) for i in range(60)}
+                    index = index_type(list(active.values()))
+                    self.check(index, active, rng)
+                    next_id = len(active)
+                    for _ in range(8):
+                        for alarm_id in rng.sample(sorted(active), k=min(len(active), 15)):
+                            index.remove(alarm_id)
+                            del active[alarm_id]
+                        for _ in range(rng.randrange(20)):
+                            # Var olan id'yi değiştirerek eklemek eskisinin yerini alır
+                            alarm_id = (rng.choice(sorted(active)) if active and rng.random() < 0.2
+                                        else str(next_id))
+                            next_id += 1
+                            active[alarm_id] = random_alarm(rng, alarm_id)
+                            index.add(active[alarm_id])
+                        self.check(index, active, rng)
+
+    def test_rebuild_matches_incremental(self):
+        rng = random.Random(42)
+        alarms = [random_alarm(rng, str(i)) for i in range(200)]
+        price_data = random_prices(rng)
+        for index_type in self.index_types():
+            with self.subTest(index=index_type.__name__):
+                incremental = index_type()
+                for alarm in alarms:
+                    incremental.add(alarm)
+                rebuilt = index_type(alarms)
+                self.assertEqual(as_set(incremental.evaluate(price_data)),
+                                 as_set(rebuilt.evaluate(price_data)))
+
+    @unittest.skipUnless(HAVE_NUMPY, "numpy kurulu değil")
+    def test_vector_drops_coins_without_alarms(self):
+        rng = random.Random(3)
+        alarms = [random_alarm(rng, str(i)) for i in range(100)]
+        index = VectorIndex(alarms)
+        for alarm in alarms:
+            if alarm['crypto_id'] != 'coin-0':
+                index.remove(alarm['id'])
+        kept = [a for a in alarms if a['crypto_id'] == 'coin-0' and not a['triggered']]
+        # Yalnızca coin-0'ın para birimi sütunları kalır
+        self.assertEqual(len(index.price_vector({})), len({a.get('currency', 'usd') for a in kept}))
+        self.assertEqual(index.crypto_ids(), ['coin-0'])
+        self.assertFalse(index.has_alarm('coin-1'))
+        price_data = random_prices(rng)
+        self.assertEqual(as_set(index.evaluate(price_data)), loop_evaluate(kept, price_data))
+
+    @unittest.skipUnless(HAVE_NUMPY, "numpy kurulu değil")
+    def test_nearest_distances_match(self):
+        rng = random.Random(7)
+        alarms = [random_alarm(rng, str(i)) for i in range(200)]
+        index = AlarmIndex(alarms)
+        vector = VectorIndex(alarms)
+        for _ in range(5):
+            price_data = random_prices(rng)
+            expected = index.nearest_distances(price_data)
+            actual = vector.nearest_distances(price_data)
+            self.assertEqual(actual.keys(), expected.keys())
+            for crypto_id, distance in expected.items():
+                self.assertAlmostEqual(actual[crypto_id], distance)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from alarm_engine import AlarmEngine
+from alarm_store import JsonStore, SqliteStore
+from price_history import PriceHistory
+from providers import StaticProvider
+
+
+class SettingsTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir, True)
+
+    def path(self, name):
+        return os.path.join(self.workdir, name)
+
+    def test_sqlite_setting_persists(self):
+        store = SqliteStore(self.path('alerts.db'))
+        self.assertEqual(store.get_setting('watchlist_currency', 'usd'), 'usd')
+        store.set_setting('watchlist_currency', 'eur')
+        store.close()
+        store = SqliteStore(self.path('alerts.db'))
+        self.addCleanup(store.close)
+        self.assertEqual(store.get_setting('watchlist_currency'), 'eur')
+
+    def test_json_setting_persists(self):
+        store = JsonStore(self.path('alarms.json'), self.path('watchlist.json'))
+        store.set_setting('watchlist_currency', 'try')
+        store = JsonStore(self.path('alarms.json'), self.path('watchlist.json'))
+        self.assertEqual(store.get_setting('watchlist_currency'), 'try')
+
+    def test_watchlist_currency_is_stored_once(self):
+        store = SqliteStore(self.path('alerts.db'))
+        self.addCleanup(store.close)
+        for coin in ('bitcoin', 'ethereum'):
+            store.insert_watch({'id': coin, 'name': coin, 'symbol': coin[:3]})
+        history = PriceHistory(self.path('history.bin'))
+        self.addCleanup(history.close)
+        engine = AlarmEngine(store=store, provider=StaticProvider(), sound=False, history=history)
+        self.assertEqual(engine.watchlist_currency(), 'usd')
+
+        engine.set_watchlist_currency('eur')
+        self.assertEqual(engine.watchlist_currency(), 'eur')
+        self.assertEqual(store.get_setting('watchlist_currency'), 'eur')
+        self.assertTrue(all('currency' not in item for item in store.load_watchlist()))
+
+    def test_legacy_row_currency_is_used_until_saved(self):
+        store = SqliteStore(self.path('alerts.db'))
+        self.addCleanup(store.close)
+        store.insert_watch({'id': 'bitcoin', 'name': 'Bitcoin', 'symbol': 'BTC', 'currency': 'try'})
+        history = PriceHistory(self.path('history.bin'))
+        self.addCleanup(history.close)
+        engine = AlarmEngine(store=store, provider=StaticProvider(), sound=False, history=history)
+        self.assertEqual(engine.watchlist_currency(), 'try')
@@ -0,0 +1,162 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from alarm_types import MonotonicWindow, WindowIndex
+from price_history import PriceHistory
+
+
+def window_alarm(alarm_id, crypto_id, percent, condition='above', minutes=1, currency='usd'):
+    return {
+        'id': alarm_id,
+        'type': 'window',
+        'crypto_id': crypto_id,
+        'crypto_name': crypto_id.title(),
+        'crypto_symbol': crypto_id[:3].upper(),
+        'condition': condition,
+        'percent': percent,
+        'window_minutes': minutes,
+        'currency': currency,
+        'created_at': '2024-01-01T00:00:00',
+        'triggered': False,
+    }
+
+
+def triggered_ids(triggered):
+    return sorted(alarm['id'] for alarm, _ in triggered)
+
+
+class MonotonicWindowTest(unittest.TestCase):
+    def test_low_and_high(self):
+        window = MonotonicWindow(60)
+        for timestamp, price in ((0, 100.0), (10, 90.0), (20, 120.0), (30, 110.0)):
+            window.push(timestamp, price)
+        self.assertEqual((window.low(), window.high()), (90.0, 120.0))
+
+    def test_expired_prices_leave_at_window_edge(self):
+        window = MonotonicWindow(60)
+        window.push(0, 100.0)
+        window.push(30, 120.0)
+        window.push(61, 110.0)
+        self.assertEqual((window.low(), window.high()), (110.0, 120.0))
+        # Tam sınırdaki kayıt (zaman == kesim) pencerede kalır
+        window.push(90, 105.0)
+        self.assertEqual(window.high(), 120.0)
+        window.push(91, 105.0)
+        self.assertEqual((window.low(), window.high()), (105.0, 110.0))
+
+
+class WindowIndexTest(unittest.TestCase):
+    def test_rise_from_window_low_triggers(self):
+        index = WindowIndex([window_alarm('1', 'bitcoin', 5.0)])
+        self.assertEqual(index.evaluate({'bitcoin': {'usd': 100.0}}, timestamp=0), [])
+        self.assertEqual(index.evaluate({'bitcoin': {'usd': 104.0}}, timestamp=10), [])
+        triggered = index.evaluate({'bitcoin': {'usd': 106.0}}, timestamp=20)
+        self.assertEqual([(alarm['id'], price) for alarm, price in triggered], [('1', 106.0)])
+
+    def test_low_outside_window_is_ignored(self):
+        index = WindowIndex([window_alarm('1', 'bitcoin', 5.0)])
+        index.evaluate({'bitcoin': {'usd': 100.0}}, timestamp=0)
+        index.evaluate({'bitcoin': {'usd': 104.0}}, timestamp=30)
+        # 100'lük dip 60 sn'lik pencereden çıktı; yükseliş 104'e göre
+        self.assertEqual(index.evaluate({'bitcoin': {'usd': 106.0}}, timestamp=61), [])
+        self.assertEqual(triggered_ids(index.evaluate({'bitcoin': {'usd': 110.0}}, timestamp=62)),
+                         ['1'])
+
+    def test_either_triggers_on_fall_and_only_once(self):
+        index = WindowIndex([window_alarm('1', 'bitcoin', 5.0, condition='either'),
+                             window_alarm('2', 'ethereum', 5.0, condition='either')])
+        index.evaluate({'bitcoin': {'usd': 100.0}, 'ethereum': {'usd': 100.0}}, timestamp=0)
+        index.evaluate({'ethereum': {'usd': 120.0}}, timestamp=10)
+        triggered = index.evaluate({'bitcoin': {'usd': 94.0}, 'ethereum': {'usd': 110.0}},
+                                   timestamp=20)
+        # ethereum hem dipten %10 yukarıda hem tepeden %8 aşağıda: tek kez döner
+        self.assertEqual(triggered_ids(triggered), ['1', '2'])
+
+    def test_below_does_not_trigger_on_rise(self):
+        index = WindowIndex([window_alarm('1', 'bitcoin', 5.0, condition='below')])
+        index.evaluate({'bitcoin': {'usd': 100.0}}, timestamp=0)
+        self.assertEqual(index.evaluate({'bitcoin': {'usd': 120.0}}, timestamp=10), [])
+        self.assertEqual(triggered_ids(index.evaluate({'bitcoin': {'usd': 110.0}}, timestamp=20)),
+                         ['1'])
+
+    def test_currency_uses_matching_price(self):
+        index = WindowIndex([window_alarm('1', 'bitcoin', 5.0, currency='eur')])
+        index.evaluate({'bitcoin': {'usd': 100.0, 'eur': 90.0}}, timestamp=0)
+        self.assertEqual(index.evaluate({'bitcoin': {'usd': 110.0}}, timestamp=10), [])
+        self.assertEqual(triggered_ids(index.evaluate({'bitcoin': {'eur': 95.0}}, timestamp=20)),
+                         ['1'])
+        self.assertEqual(index.currencies(), {'eur'})
+
+    def test_removing_one_alarm_keeps_shared_window(self):
+        index = WindowIndex([window_alarm('1', 'bitcoin', 5.0), window_alarm('2', 'bitcoin', 8.0)])
+        index.evaluate({'bitcoin': {'usd': 100.0}}, timestamp=0)
+        index.remove('1')
+        self.assertTrue(index.has_alarm('bitcoin'))
+        self.assertEqual(len(index), 1)
+        # Pencere silinmedi: 100'lük dip hâlâ biliniyor
+        self.assertEqual(triggered_ids(index.evaluate({'bitcoin': {'usd': 109.0}}, timestamp=10)),
+                         ['2'])
+
+    def test_removing_last_alarm_drops_window(self):
+        index = WindowIndex([window_alarm('1', 'bitcoin', 5.0),
+                             window_alarm('2', 'bitcoin', 5.0, minutes=5)])
+        index.remove('1')
+        index.remove('2')
+        self.assertFalse(index.has_alarm('bitcoin'))
+        self.assertEqual(index.crypto_ids(), [])
+        self.assertEqual(index.currencies(), set())
+        self.assertEqual(index.evaluate({'bitcoin': {'usd': 100.0}}, timestamp=0), [])
+        # Aynı coin için yeni alarm boş bir pencereyle başlar
+        index.add(window_alarm('3', 'bitcoin', 5.0))
+        self.assertEqual(index.evaluate({'bitcoin': {'usd': 200.0}}, timestamp=10), [])
+
+    def test_readding_alarm_replaces_it(self):
+        index = WindowIndex([window_alarm('1', 'bitcoin', 5.0)])
+        index.add(window_alarm('1', 'bitcoin', 50.0))
+        index.evaluate({'bitcoin': {'usd': 100.0}}, timestamp=0)
+        self.assertEqual(index.evaluate({'bitcoin': {'usd': 110.0}}, timestamp=10), [])
+        self.assertEqual(len(index), 1)
+
+    def test_replacing_with_other_type_or_triggered_removes_alarm(self):
+        index = WindowIndex([window_alarm('1', 'bitcoin', 5.0), window_alarm('2', 'ethereum', 5.0)])
+        index.add(dict(window_alarm('1', 'bitcoin', 5.0), triggered=True))
+        index.add({'id': '2', 'crypto_id': 'ethereum', 'condition': 'above', 'target_price': 1.0})
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.crypto_ids(), [])
+
+    def test_non_window_and_triggered_alarms_are_ignored(self):
+        triggered = dict(window_alarm('2', 'bitcoin', 5.0), triggered=True)
+        price = {'id': '3', 'crypto_id': 'bitcoin', 'condition': 'above', 'target_price': 1.0}
+        index = WindowIndex([triggered, price])
+        self.assertEqual(len(index), 0)
+        self.assertFalse(index.has_alarm('bitcoin'))
+
+
+class WindowHistoryTest(unittest.TestCase):
+    def setUp(self):
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir, True)
+        self.history = PriceHistory(os.path.join(workdir, 'history.bin'))
+        self.addCleanup(self.history.close)
+        now = time.time()
+        self.history.append('bitcoin', 80.0, timestamp=now - 600)
+        self.history.append('bitcoin', 100.0, timestamp=now - 30)
+
+    def test_new_window_is_seeded_from_history(self):
+        index = WindowIndex([window_alarm('1', 'bitcoin', 5.0)], history=self.history)
+        # Geçmişteki 30 sn önceki 100 dip sayılır; 10 dk önceki 80 pencere dışında
+        self.assertEqual(triggered_ids(index.evaluate({'bitcoin': {'usd': 106.0}})), ['1'])
+        self.assertEqual(index.evaluate({'bitcoin': {'usd': 104.0}}), [])
+
+    def test_non_usd_window_is_not_seeded(self):
+        # Geçmiş USD tutulur; EUR penceresi boş başlar
+        index = WindowIndex([window_alarm('1', 'bitcoin', 5.0, currency='eur')],
+                            history=self.history)
+        self.assertEqual(index.evaluate({'bitcoin': {'eur': 106.0}}), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from fx_rates import FxRates
+from providers import StaticProvider
+
+
+class FxRatesTest(unittest.TestCase):
+    def test_convert(self):
+        fx = FxRates(StaticProvider(rates={'btc': 1.0, 'usd': 50000.0, 'eur': 45000.0}))
+        fx.ensure()
+        self.assertAlmostEqual(fx.convert(100.0, 'eur'), 90.0)
+        self.assertAlmostEqual(fx.convert(50000.0, 'btc'), 1.0)
+        self.assertIsNone(fx.convert(1.0, 'try'))
+
+    def test_ensure_backs_off_after_failure(self):
+        provider = StaticProvider(error=RuntimeError("429"))
+        fx = FxRates(provider)
+        with self.assertRaises(RuntimeError):
+            fx.ensure()
+        for _ in range(10):
+            fx.ensure()  # hata sonrası bekleme süresinde istek atılmaz
+        self.assertEqual(provider.calls, 1)
+        self.assertIsNone(fx.rate('eur'))
+
+        fx.failed_at -= 3600
+        provider.error = None
+        fx.ensure()
+        self.assertEqual(provider.calls, 2)
+        self.assertIsNotNone(fx.rate('eur'))
+
+    def test_ensure_leaves_fetching_to_background_refresh(self):
+        provider = StaticProvider(error=RuntimeError("down"))
+        fx = FxRates(provider)
+        fx.start_background_refresh()
+        for _ in range(10):
+            fx.ensure()
+        self.assertEqual(provider.calls, 1)
@@ -0,0 +1,49 @@
+import unittest
+
+from price_cache import PriceCache
+from providers import StaticProvider
+
+
+class FlakyProvider(StaticProvider):
+    """Her coin ayrı parça; failing içindeki coinlerin parçası hata verir"""
+
+    def __init__(self, prices, failing=()):
+        super().__init__(prices)
+        self.failing = set(failing)
+
+    def simple_price(self, ids, vs_currencies='usd', **kwargs):
+        if self.failing & set(ids):
+            raise RuntimeError("chunk failed")
+        return super().simple_price(ids, vs_currencies, **kwargs)
+
+    def simple_price_batched(self, ids, vs_currencies='usd', chunk_size=1, **kwargs):
+        return super().simple_price_batched(ids, vs_currencies, chunk_size=1, **kwargs)
+
+
+class PriceCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.provider = FlakyProvider({'bitcoin': {'usd': 100.0}, 'ethereum': {'usd': 10.0}})
+        self.cache = PriceCache(self.provider)
+
+    def test_partial_failure_is_reported(self):
+        self.provider.failing = {'ethereum'}
+        result = self.cache.get_prices(['bitcoin', 'ethereum', 'unknown'])
+        self.assertEqual(result, {'bitcoin': {'usd': 100.0}})
+        self.assertEqual(list(result.failed), ['ethereum'])
+
+    def test_total_failure_raises(self):
+        self.provider.failing = {'bitcoin', 'ethereum'}
+        with self.assertRaises(RuntimeError):
+            self.cache.get_prices(['bitcoin', 'ethereum'])
+
+    def test_failed_coin_is_fetched_again(self):
+        self.provider.failing = {'ethereum'}
+        self.cache.get_prices(['bitcoin', 'ethereum'])
+        self.provider.failing = set()
+        result = self.cache.get_prices(['bitcoin', 'ethereum'])
+        self.assertEqual(result['ethereum'], {'usd': 10.0})
+        self.assertEqual(result.failed, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
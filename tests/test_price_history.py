@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from price_history import PriceHistory, slot_key
+
+
+class PriceHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir, True)
+        self.path = os.path.join(self.workdir, 'history.bin')
+
+    def open(self, **kwargs):
+        history = PriceHistory(self.path, **kwargs)
+        self.addCleanup(history.close)
+        return history
+
+    def test_ring_buffer_keeps_latest(self):
+        history = self.open(capacity=4, max_coins=4)
+        for i in range(6):
+            history.append('bitcoin', 100.0 + i, timestamp=1000.0 + i)
+        timestamps, prices = history.series('bitcoin')
+        self.assertEqual(list(prices), [102.0, 103.0, 104.0, 105.0])
+        self.assertEqual(history.latest('bitcoin'), (1005.0, 105.0))
+        self.assertEqual(list(history.series('bitcoin', since=1004.0)[1]), [104.0, 105.0])
+
+    def test_full_directory_evicts_least_recently_written(self):
+        history = self.open(capacity=4, max_coins=3)
+        history.append('a', 1.0, timestamp=10.0)
+        history.append('b', 2.0, timestamp=20.0)
+        history.append('c', 3.0, timestamp=30.0)
+        history.append('a', 1.5, timestamp=40.0)
+        self.assertTrue(history.append('d', 4.0, timestamp=50.0))
+        self.assertEqual(sorted(history.coins()), ['a', 'c', 'd'])
+        self.assertEqual(list(history.series('d')[1]), [4.0])
+        self.assertIsNone(history.latest('b'))
+
+    def test_long_and_multibyte_ids_survive_reopen(self):
+        long_id = 'x' * 60
+        unicode_id = 'ğ' * 30  # 60 bayt; kesim bir karakteri bölmemeli
+        history = PriceHistory(self.path, capacity=4, max_coins=8)
+        history.append(long_id, 1.0, timestamp=1.0)
+        history.append(unicode_id, 2.0, timestamp=1.0)
+        history.close()
+
+        history = self.open()
+        self.assertEqual(history.latest(long_id), (1.0, 1.0))
+        self.assertEqual(history.latest(unicode_id), (1.0, 2.0))
+        history.append(long_id, 1.1, timestamp=2.0)
+        self.assertEqual(len(history.coins()), 2)
+        self.assertLessEqual(len(slot_key(unicode_id).encode('utf-8')), 48)
+
+    def test_min_spacing_skips_frequent_records(self):
+        history = self.open(capacity=8, max_coins=2)
+        history.record({'bitcoin': {'usd': 1.0}}, timestamp=100.0, min_spacing=10)
+        history.record({'bitcoin': {'usd': 2.0}}, timestamp=105.0, min_spacing=10)
+        history.record({'bitcoin': {'usd': 3.0}}, timestamp=111.0, min_spacing=10)
+        self.assertEqual(list(history.series('bitcoin')[1]), [1.0, 3.0])
+
+    def test_second_instance_gets_its_own_file(self):
+        first = self.open(capacity=4, max_coins=2)
+        second = self.open(capacity=4, max_coins=2)
+        self.assertEqual(first.path, self.path)
+        self.assertNotEqual(second.path, self.path)
+        first.append('bitcoin', 1.0, timestamp=1.0)
+        second.append('ethereum', 2.0, timestamp=1.0)
+        self.assertEqual(first.coins(), ['bitcoin'])
+        self.assertEqual(second.coins(), ['ethereum'])
+
+    def test_file_is_reused_after_close(self):
+        PriceHistory(self.path, capacity=4, max_coins=2).close()
+        self.assertEqual(self.open().path, self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from alarm_engine import AlarmEngine
+from alarm_store import JsonStore
+from price_history import PriceHistory
+from price_stream import PriceStream, StandInPriceServer
+from providers import StaticProvider
+
+
+TIMEOUT = 5
+
+
+def wait_for(condition, timeout=TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+def price_alarm(alarm_id, crypto_id, target, condition='above'):
+    return {
+        'id': alarm_id,
+        'crypto_id': crypto_id,
+        'crypto_name': crypto_id.title(),
+        'crypto_symbol': crypto_id[:3].upper(),
+        'condition': condition,
+        'target_price': target,
+        'created_at': '2024-01-01T00:00:00',
+        'triggered': False,
+    }
+
+
+class PriceStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInPriceServer().start()
+        self.addCleanup(self.server.stop)
+
+    def test_reconnect_before_socket_is_registered(self):
+        # reconnect() soket kaydedilmeden önce, ids() okunurken gelir
+        wanted = [frozenset()]
+        stream = None
+
+        def ids():
+            current = wanted[0]
+            if not current:
+                wanted[0] = frozenset({'bitcoin'})
+                stream.reconnect()
+            return current
+
+        stream = PriceStream(self.server.url, lambda price_data: None, ids=ids)
+        stream.start()
+        self.addCleanup(stream.stop)
+        self.assertTrue(wait_for(lambda: stream.connected and stream.subscribed == {'bitcoin'}))
+
+    def test_ticks_are_delivered(self):
+        ticks = []
+        stream = PriceStream(self.server.url, ticks.append, ids=lambda: ['bitcoin'])
+        stream.start()
+        self.addCleanup(stream.stop)
+        self.assertTrue(wait_for(lambda: self.server.client_count() == 1))
+        self.server.publish({'bitcoin': {'usd': 101.0}, 'ethereum': {'usd': 5.0}})
+        self.assertTrue(wait_for(lambda: ticks))
+        self.assertEqual(ticks[0], {'bitcoin': {'usd': 101.0}})
+
+
+class StreamAlarmTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInPriceServer().start()
+        self.addCleanup(self.server.stop)
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir, True)
+        self.provider = StaticProvider({'bitcoin': {'usd': 100.0}, 'ethereum': {'usd': 10.0}})
+        self.store = JsonStore(os.path.join(workdir, 'alarms.json'),
+                               os.path.join(workdir, 'watchlist.json'))
+        self.history = PriceHistory(os.path.join(workdir, 'history.bin'))
+        self.addCleanup(self.history.close)
+        self.triggered = []
+        self.fired = threading.Event()
+
+    def start_engine(self):
+        engine = AlarmEngine(store=self.store, provider=self.provider, sound=False,
+                             history=self.history, stream_url=self.server.url)
+
+        def on_trigger(triggered):
+            self.triggered.extend(triggered)
+            self.fired.set()
+
+        engine.add_trigger_listener(on_trigger)
+        engine.start()
+        self.addCleanup(engine.stop)
+        return engine
+
+    # Yoklamanın az önce yazdığı fiyat akış fiyatını aralık sınırına takmasın
+    @mock.patch('alarm_engine.STREAM_HISTORY_SPACING', 0)
+    def test_stream_tick_triggers_alarm(self):
+        self.store.insert_alarm(price_alarm('1', 'bitcoin', 150.0))
+        engine = self.start_engine()
+        self.assertTrue(wait_for(lambda: engine.stream.subscribed == {'bitcoin'}))
+
+        self.server.publish({'bitcoin': {'usd': 160.0}})
+        self.assertTrue(self.fired.wait(TIMEOUT))
+        alarm, price = self.triggered[0]
+        self.assertEqual((alarm['id'], price), ('1', 160.0))
+        self.assertTrue(engine.find_alarm('1')['triggered'])
+        self.assertTrue(self.store.load_alarms()[0]['triggered'])
+        self.assertEqual(self.history.latest('bitcoin')[1], 160.0)
+
+    def test_adding_alarm_subscribes_new_coin(self):
+        engine = self.start_engine()
+        self.assertTrue(wait_for(lambda: engine.stream.connected))
+        self.assertEqual(engine.stream.subscribed, frozenset())
+
+        engine.add_alarm(price_alarm('2', 'ethereum', 8.0, condition='below')).result(TIMEOUT)
+        self.assertTrue(wait_for(lambda: engine.stream.connected
+                                 and engine.stream.subscribed == {'ethereum'}))
+
+        self.server.publish({'ethereum': {'usd': 7.5}})
+        self.assertTrue(self.fired.wait(TIMEOUT))
+        self.assertEqual(self.triggered[0][0]['id'], '2')
+
+
+if __name__ == "__main__":
+    unittest.main()
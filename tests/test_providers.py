@@ -0,0 +1,57 @@
+import threading
+import time
+import unittest
+
+from providers import HEDGE_DEFAULT_DELAY, HedgedProvider, StaticProvider
+
+
+def coin_prices(count):
+    return {f"coin-{i}": {'usd': float(i + 1)} for i in range(count)}
+
+
+class HedgedBatchTest(unittest.TestCase):
+    def test_chunks_are_fetched_concurrently(self):
+        prices = coin_prices(40)
+        primary = StaticProvider(prices, delay=0.2, name='primary')
+        provider = HedgedProvider(primary, StaticProvider(prices, name='secondary'))
+        started = time.monotonic()
+        result = provider.simple_price_batched(list(prices), chunk_size=10)
+        elapsed = time.monotonic() - started
+        self.assertEqual(result.prices, prices)
+        self.assertEqual(result.failed, [])
+        self.assertLess(elapsed, 0.6)  # sırayla 4 x 0.2 s olurdu
+        self.assertEqual(provider.stats['hedged'], 0)
+
+    def test_slow_chunks_are_hedged_on_separate_workers(self):
+        prices = coin_prices(100)
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def stall():
+            release.wait(10)
+            return 0
+
+        # Birincilin tüm iş parçacıkları takılı kalır; hedge'ler yine de çalışmalı
+        primary = StaticProvider(prices, delay=stall, name='primary')
+        secondary = StaticProvider(prices, name='secondary')
+        provider = HedgedProvider(primary, secondary, workers=4)
+        started = time.monotonic()
+        result = provider.simple_price_batched(list(prices), chunk_size=10)
+        elapsed = time.monotonic() - started
+        self.assertEqual(result.prices, prices)
+        self.assertEqual(provider.stats['hedged'], 10)
+        self.assertEqual(provider.stats['secondary_wins'], 10)
+        self.assertLess(elapsed, HEDGE_DEFAULT_DELAY + 1.0)
+
+    def test_failed_chunk_is_reported(self):
+        prices = coin_prices(20)
+        primary = StaticProvider(prices, error=RuntimeError("down"), name='primary')
+        secondary = StaticProvider(prices, error=RuntimeError("down too"), name='secondary')
+        provider = HedgedProvider(primary, secondary)
+        result = provider.simple_price_batched(list(prices), chunk_size=10)
+        self.assertEqual(result.prices, {})
+        self.assertEqual([len(chunk) for chunk, _ in result.failed], [10, 10])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""VirtualList satır yerleşimi, gerçek customtkinter widget'larıyla.
+
+Pencere gizli (withdraw) açılır; satırların yeri ve yüksekliği
+place_info() / cget('height') ile okunur. Ekran yoksa atlanır.
+"""
+import tkinter
+import unittest
+
+
+class VirtualListTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            import customtkinter as ctk
+            from virtual_list import VirtualList
+            cls.root = ctk.CTk()
+        except (ImportError, tkinter.TclError) as e:
+            raise unittest.SkipTest(f"ekran yok: {e}")
+        cls.root.withdraw()
+        cls.root.geometry("400x300")
+        cls.ctk = ctk
+        cls.VirtualList = VirtualList
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.root.destroy()
+
+    def make_list(self, row_height=100):
+        self.rows = []
+
+        def create_row(parent):
+            row = {'frame': self.ctk.CTkFrame(parent), 'item': None}
+            self.rows.append(row)
+            return row
+
+        def bind_row(row, item):
+            row['item'] = item
+
+        vlist = self.VirtualList(self.root, create_row, bind_row, row_height=row_height)
+        vlist.pack(fill="both", expand=True)
+        self.addCleanup(vlist.destroy)
+        self.root.update_idletasks()
+        return vlist
+
+    def placed_rows(self):
+        """Yerleştirilmiş satırlar: (y, yükseklik, öğe), y'ye göre sıralı"""
+        return sorted((int(row['frame'].place_info()['y']), row['frame'].cget('height'), row['item'])
+                      for row in self.rows if row['frame'].winfo_manager() == 'place')
+
+    def test_rows_get_height_from_configure(self):
+        vlist = self.make_list()
+        vlist.set_items(range(50))
+        self.assertEqual(self.placed_rows()[:3], [(0, 90, 0), (100, 90, 1), (200, 90, 2)])
+        # Yalnızca görünen satırlar (ve tampon) için widget oluşturulur
+        self.assertLess(len(self.rows), 20)
+
+    def test_scroll_rebinds_visible_rows(self):
+        vlist = self.make_list()
+        vlist.set_items(range(50))
+        created = len(self.rows)
+        vlist.scroll_to(1000)
+        self.assertIn((0, 90, 10), self.placed_rows())
+        self.assertEqual(len(self.rows), created)
+        self.assertAlmostEqual(vlist.scrollbar.get()[0], 1000 / 5000)
+
+    def test_variable_heights(self):
+        vlist = self.make_list(row_height=lambda item: 50 if item % 2 else 100)
+        vlist.set_items(range(4))
+        self.assertEqual(self.placed_rows(), [(0, 90, 0), (100, 40, 1), (150, 90, 2), (250, 40, 3)])
+
+    def test_empty_list_hides_rows(self):
+        vlist = self.make_list()
+        vlist.set_items(range(5))
+        vlist.set_items([])
+        self.assertEqual(self.placed_rows(), [])
+
+    def test_message_replaces_rows(self):
+        vlist = self.make_list()
+        vlist.set_items(range(5))
+        message = vlist.show_message()
+        self.assertEqual(message.winfo_manager(), 'place')
+        self.assertEqual(self.placed_rows(), [])
+        vlist.clear_message()
+        vlist.set_items(range(2))
+        self.assertEqual([item for _, _, item in self.placed_rows()], [0, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
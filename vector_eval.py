@@ -0,0 +1,306 @@
+"""NumPy ile vektörel alarm değerlendirmesi (isteğe bağlı).
+
+Aktif alarmlar sütun dizileri olarak tutulur: coin index'i, eşik fiyatı
+ve yön (+1 üstüne çıkınca, -1 altına inince). Bir fiyat anlık görüntüsü
+coin index'ine göre tek bir diziye çevrilir ve tüm alarmlar tek bir
+karşılaştırmayla değerlendirilir:
+
+    yön * (fiyat[coin] - eşik) >= 0
+
+"Coin" burada (crypto_id, para birimi) çiftidir; aynı coinin EUR ve USD
+alarmları ayrı fiyat sütunlarına bakar. AlarmIndex ile aynı arayüzü
+sunar; motor evaluation_mode='vector' ile bunu kullanır. Bir alarmın
+birden çok eşiği varsa ('either' yüzde alarmları) her eşik ayrı bir
+satırdır. NumPy kurulu değilse HAVE_NUMPY
+False olur; NumPy yalnızca ilk VectorIndex oluşturulurken içe aktarılır.
+"""
+import importlib.util
+import threading
+
+from alarm_types import alarm_currency, alarm_thresholds
+
+# İsteğe bağlı bağımlılık; açılışı yavaşlatmaması için import ilk kullanımda
+HAVE_NUMPY = importlib.util.find_spec('numpy') is not None
+np = None
+
+
+def _load_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+
+
+DIRECTIONS = {'above': 1, 'below': -1}
+MIN_CAPACITY = 1024
+
+
+class VectorIndex:
+    """Aktif alarmların sütun dizileri; silinen satırlar maskelenir"""
+
+    def __init__(self, alarms=None):
+        if not HAVE_NUMPY:
+            raise ImportError("vektörel değerlendirme için numpy gerekli")
+        _load_numpy()
+        self._lock = threading.RLock()
+        # coin index <-> (crypto_id, currency) ve coin başına aktif alarm sayısı
+        # ('either' alarmının iki satırı tek alarm sayılır)
+        self._coin_ids = []
+        self._coin_index = {}
+        self._coin_counts = []
+        # crypto_id -> aktif alarm sayısı (tüm para birimleri); has_alarm için
+        self._crypto_counts = {}
+        # Alarmı kalmamış coin sütunları; çoğalınca sıkıştırmada atılır
+        self._empty_coins = 0
+        # satır -> alarm (silinmişse None), alarm_id -> [satırlar]
+        self._alarms = []
+        self._rows = {}
+        # _size: kullanılan satır sayısı, _live: bunlardan aktif olanlar
+        self._size = 0
+        self._live = 0
+        self._allocate(MIN_CAPACITY)
+        if alarms:
+            self.rebuild(alarms)
+
+    def _allocate(self, capacity):
+        self._coin = np.zeros(capacity, dtype=np.int32)
+        self._threshold = np.zeros(capacity, dtype=np.float64)
+        self._direction = np.zeros(capacity, dtype=np.int8)
+        self._active = np.zeros(capacity, dtype=bool)
+
+    def _grow(self, needed):
+        capacity = len(self._coin)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        old = (self._coin, self._threshold, self._direction, self._active)
+        self._allocate(capacity)
+        size = self._size
+        for new, previous in zip((self._coin, self._threshold, self._direction, self._active), old):
+            new[:size] = previous[:size]
+
+    def _coin_slot(self, alarm):
+        key = (alarm['crypto_id'], alarm_currency(alarm))
+        index = self._coin_index.get(key)
+        if index is None:
+            index = len(self._coin_ids)
+            self._coin_index[key] = index
+            self._coin_ids.append(key)
+            self._coin_counts.append(0)
+        elif not self._coin_counts[index]:
+            self._empty_coins -= 1
+        return index
+
+    def _count_alarm(self, coin, delta):
+        """Coin sütununun ve coin'in aktif alarm sayısını güncelle"""
+        self._coin_counts[coin] += delta
+        if not self._coin_counts[coin]:
+            self._empty_coins += 1
+        crypto_id = self._coin_ids[coin][0]
+        count = self._crypto_counts.get(crypto_id, 0) + delta
+        if count:
+            self._crypto_counts[crypto_id] = count
+        else:
+            del self._crypto_counts[crypto_id]
+
+    def rebuild(self, alarms):
+        """Tüm dizileri tek seferde yeniden oluştur"""
+        with self._lock:
+            self._coin_ids = []
+            self._coin_index = {}
+            self._coin_counts = []
+            self._crypto_counts = {}
+            self._empty_coins = 0
+            active = [a for a in alarms if not a.get('triggered', False)]
+            active = list({a['id']: a for a in active}.values())
+            row_alarms = []
+            coins = []
+            thresholds = []
+            directions = []
+            rows = {}
+            for alarm in active:
+                entries = alarm_thresholds(alarm)
+                if not entries:
+                    continue
+                coin = self._coin_slot(alarm)
+                self._count_alarm(coin, 1)
+                for condition, target in entries:
+                    rows.setdefault(alarm['id'], []).append(len(row_alarms))
+                    row_alarms.append(alarm)
+                    coins.append(coin)
+                    thresholds.append(target)
+                    directions.append(DIRECTIONS[condition])
+            size = len(row_alarms)
+            self._allocate(max(MIN_CAPACITY, size))
+            self._coin[:size] = coins
+            self._threshold[:size] = thresholds
+            self._direction[:size] = directions
+            self._active[:size] = True
+            self._alarms = row_alarms
+            self._rows = rows
+            self._size = size
+            self._live = size
+
+    def add(self, alarm):
+        with self._lock:
+            # Aynı id'li eski kayıt, yenisi tetiklenmiş olsa da çıkarılır
+            if alarm['id'] in self._rows:
+                self.remove(alarm['id'])
+            if alarm.get('triggered', False):
+                return
+            thresholds = alarm_thresholds(alarm)
+            if not thresholds:
+                return
+            self._grow(self._size + len(thresholds))
+            coin = self._coin_slot(alarm)
+            self._count_alarm(coin, 1)
+            rows = []
+            for condition, target in thresholds:
+                row = self._size
+                self._coin[row] = coin
+                self._threshold[row] = target
+                self._direction[row] = DIRECTIONS[condition]
+                self._active[row] = True
+                self._alarms.append(alarm)
+                rows.append(row)
+                self._size += 1
+                self._live += 1
+            self._rows[alarm['id']] = rows
+
+    def remove(self, alarm_id):
+        with self._lock:
+            rows = self._rows.pop(alarm_id, None)
+            if rows is None:
+                return
+            self._count_alarm(int(self._coin[rows[0]]), -1)
+            for row in rows:
+                self._active[row] = False
+                self._alarms[row] = None
+                self._live -= 1
+            # Satırların ya da coin sütunlarının yarısından çoğu boşsa sıkıştır
+            if ((self._size > MIN_CAPACITY and self._live < self._size // 2)
+                    or self._empty_coins > len(self._coin_ids) // 2):
+                self._compact()
+
+    def _compact(self):
+        keep = np.flatnonzero(self._active[:self._size])
+        size = len(keep)
+        for column in (self._coin, self._threshold, self._direction, self._active):
+            column[:size] = column[keep]
+            column[size:self._size] = 0
+        self._alarms = [self._alarms[row] for row in keep.tolist()]
+        self._rows = {}
+        for row, alarm in enumerate(self._alarms):
+            self._rows.setdefault(alarm['id'], []).append(row)
+        self._size = size
+        self._live = size
+        if self._empty_coins:
+            self._drop_empty_coins()
+
+    def _drop_empty_coins(self):
+        """Alarmı kalmayan coin sütunlarını at; satırların coin index'lerini yeniden eşle"""
+        keep = [index for index, count in enumerate(self._coin_counts) if count]
+        remap = np.full(len(self._coin_ids), -1, dtype=np.int32)
+        remap[keep] = np.arange(len(keep), dtype=np.int32)
+        self._coin[:self._size] = remap[self._coin[:self._size]]
+        self._coin_ids = [self._coin_ids[index] for index in keep]
+        self._coin_counts = [self._coin_counts[index] for index in keep]
+        self._coin_index = {key: index for index, key in enumerate(self._coin_ids)}
+        self._empty_coins = 0
+
+    def price_vector(self, price_data):
+        """{id: info} anlık görüntüsünü coin index'ine göre diziye çevir; eksikler NaN"""
+        prices = np.full(len(self._coin_ids), np.nan)
+        for index, (crypto_id, currency) in enumerate(self._coin_ids):
+            price = (price_data.get(crypto_id) or {}).get(currency)
+            if price:
+                prices[index] = price
+        return prices
+
+    def evaluate_indices(self, prices):
+        """Fiyat dizisiyle tetiklenen alarmların satır numaraları"""
+        size = self._size
+        coin = self._coin[:size]
+        # NaN fiyatlı coinlerde karşılaştırma False döner
+        crossed = (prices[coin] - self._threshold[:size]) * self._direction[:size] >= 0
+        return np.flatnonzero(crossed & self._active[:size])
+
+    def evaluate(self, price_data):
+        """Fiyat anlık görüntüsüyle tetiklenen (alarm, fiyat) çiftleri"""
+        with self._lock:
+            if not self._rows:
+                return []
+            prices = self.price_vector(price_data)
+            rows = self.evaluate_indices(prices)
+            triggered = []
+            seen = set()
+            for row in rows.tolist():
+                alarm = self._alarms[row]
+                if alarm['id'] not in seen:
+                    seen.add(alarm['id'])
+                    triggered.append((alarm, float(prices[self._coin[row]])))
+            return triggered
+
+    def evaluated_count(self, price_data):
+        """Fiyatı verilen coinlerdeki aktif alarm sayısı (evaluate ile aynı kapsam)"""
+        count = 0
+        with self._lock:
+            for crypto_id, info in price_data.items():
+                if not info:
+                    continue
+                for currency, price in info.items():
+                    coin = self._coin_index.get((crypto_id, currency))
+                    if coin is not None and price:
+                        count += self._coin_counts[coin]
+        return count
+
+    def nearest_distances(self, price_data):
+        """Coin başına en yakın geçilmemiş eşiğe göreli uzaklık, |ln(eşik / fiyat)|"""
+        with self._lock:
+            if not self._rows:
+                return {}
+            prices = self.price_vector(price_data)
+            size = self._size
+            coin = self._coin[:size]
+            row_prices = prices[coin]
+            threshold = self._threshold[:size]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                distance = np.abs(np.log(threshold / row_prices))
+                pending = (row_prices - threshold) * self._direction[:size] < 0
+            distance = np.where(pending & self._active[:size] & np.isfinite(distance), distance, np.inf)
+            best = np.full(len(self._coin_ids), np.inf)
+            np.minimum.at(best, coin, distance)
+            distances = {}
+            for index in np.flatnonzero(np.isfinite(best)).tolist():
+                crypto_id = self._coin_ids[index][0]
+                distance = float(best[index])
+                distances[crypto_id] = min(distance, distances.get(crypto_id, distance))
+            return distances
+
+    def crossed(self, crypto_id, price, currency='usd'):
+        """Verilen fiyatla tetiklenen alarmları döndür"""
+        with self._lock:
+            coin = self._coin_index.get((crypto_id, currency))
+            if coin is None or not self._coin_counts[coin]:
+                return []
+            prices = np.full(len(self._coin_ids), np.nan)
+            prices[coin] = price
+            rows = self.evaluate_indices(prices).tolist()
+            return list({self._alarms[row]['id']: self._alarms[row] for row in rows}.values())
+
+    def crypto_ids(self):
+        with self._lock:
+            return list(self._crypto_counts)
+
+    def currencies(self):
+        with self._lock:
+            return {currency for (_, currency), count in zip(self._coin_ids, self._coin_counts) if count}
+
+    def has_alarm(self, crypto_id):
+        with self._lock:
+            return crypto_id in self._crypto_counts
+
+    def __len__(self):
+        with self._lock:
+            return len(self._rows)
@@ -0,0 +1,153 @@
+"""Sanal kaydırmalı liste: yalnızca görünen satırlar için widget tutar.
+
+Satır widget'ları bir havuzda saklanır ve kaydırıldıkça farklı öğelere
+yeniden bağlanır. 10.000 öğelik bir liste de ekranda görünen birkaç
+düzine satır kadar widget oluşturur.
+"""
+import bisect
+
+import customtkinter as ctk
+
+
+SCROLL_UNIT = 40  # fare tekerleği adımı (piksel)
+
+
+class VirtualList(ctk.CTkFrame):
+    """Havuzlu satırlarla sanal liste.
+
+    create_row(parent) boş bir satır sözlüğü döndürür (en az 'frame'
+    anahtarıyla); bind_row(row, item) satırı verilen öğeye bağlar.
+    row_height sabit bir sayı ya da öğe başına yükseklik veren bir
+    fonksiyon olabilir.
+    """
+
+    def __init__(self, master, create_row, bind_row, row_height=100, gap=10, buffer=3, **kwargs):
+        super().__init__(master, **kwargs)
+        self.create_row = create_row
+        self.bind_row = bind_row
+        self.row_height = row_height
+        self.gap = gap
+        self.buffer = buffer
+
+        self.items = []
+        self._offsets = [0]  # her öğenin başlangıç y'si + toplam yükseklik
+        self._offset = 0
+        self._pool = []
+        self._message = None
+
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.viewport.bind("<Configure>", lambda event: self._layout())
+        self.bind_all("<MouseWheel>", self._on_mousewheel, add="+")
+        self.bind_all("<Button-4>", self._on_mousewheel, add="+")
+        self.bind_all("<Button-5>", self._on_mousewheel, add="+")
+
+    def _height_of(self, item):
+        if callable(self.row_height):
+            return self.row_height(item)
+        return self.row_height
+
+    def set_items(self, items):
+        """Listenin verisini değiştir; yalnızca görünen satırlar bağlanır"""
+        self.items = list(items)
+        offsets = [0]
+        for item in self.items:
+            offsets.append(offsets[-1] + self._height_of(item))
+        self._offsets = offsets
+        self._layout()
+
+    def refresh(self):
+        """Görünen satırları aynı öğelerle yeniden bağla"""
+        for row in self._pool:
+            row['_item'] = None
+        self._layout()
+
+    def show_message(self):
+        """Satırların yerine mesaj göstermek için boş bir frame döndür"""
+        self.clear_message()
+        self.set_items([])
+        self._message = ctk.CTkFrame(self.viewport, fg_color="transparent")
+        self._message.place(x=0, y=0, relwidth=1, relheight=1)
+        return self._message
+
+    def clear_message(self):
+        if self._message is not None:
+            self._message.destroy()
+            self._message = None
+
+    def scroll_to(self, offset):
+        self._offset = offset
+        self._layout()
+
+    def _layout(self):
+        height = self.viewport.winfo_height()
+        total = self._offsets[-1]
+        self._offset = max(0, min(self._offset, total - height))
+
+        if self.items:
+            first = bisect.bisect_right(self._offsets, self._offset) - 1
+            last = bisect.bisect_left(self._offsets, self._offset + height)
+            start = max(0, first - self.buffer)
+            end = min(len(self.items), last + self.buffer)
+        else:
+            start = end = 0
+
+        while len(self._pool) < end - start:
+            row = self.create_row(self.viewport)
+            row['_item'] = None
+            row['_height'] = None
+            # Yükseklik içerikten değil, configure(height=...) ile belirlenir
+            row['frame'].pack_propagate(False)
+            row['frame'].grid_propagate(False)
+            self._pool.append(row)
+
+        # index % havuz boyutu: bir satır kaydırınca yalnızca bir satır yeniden bağlanır
+        size = len(self._pool)
+        used = set()
+        for index in range(start, end):
+            row = self._pool[index % size]
+            used.add(index % size)
+            item = self.items[index]
+            if row['_item'] is not item:
+                self.bind_row(row, item)
+                row['_item'] = item
+            # CTk widget'ları place() ile boyut almaz; yükseklik configure ile verilir
+            row_height = self._offsets[index + 1] - self._offsets[index] - self.gap
+            if row['_height'] != row_height:
+                row['frame'].configure(height=row_height)
+                row['_height'] = row_height
+            row['frame'].place(x=0, y=self._offsets[index] - self._offset, relwidth=1)
+        for slot, row in enumerate(self._pool):
+            if slot not in used:
+                row['frame'].place_forget()
+                row['_item'] = None
+
+        if total > height > 0:
+            self.scrollbar.set(self._offset / total, (self._offset + height) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_scrollbar(self, action, *args):
+        total = self._offsets[-1]
+        height = self.viewport.winfo_height()
+        if action == "moveto":
+            self.scroll_to(float(args[0]) * total)
+        elif action == "scroll":
+            amount, what = int(args[0]), args[1]
+            step = height if what == "pages" else SCROLL_UNIT
+            self.scroll_to(self._offset + amount * step)
+
+    def _on_mousewheel(self, event):
+        widget = str(event.widget)
+        if widget != str(self) and not widget.startswith(str(self) + "."):
+            return
+        if event.num == 4:
+            delta = -1
+        elif event.num == 5:
+            delta = 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        self.scroll_to(self._offset + delta * SCROLL_UNIT)